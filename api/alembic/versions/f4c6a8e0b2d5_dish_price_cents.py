@@ -0,0 +1,35 @@
+"""dish price cents
+
+Revision ID: f4c6a8e0b2d5
+Revises: e2b8d4f6a1c3
+Create Date: 2026-10-19 18:02:47.310562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c6a8e0b2d5'
+down_revision: Union[str, Sequence[str], None] = 'e2b8d4f6a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('dish', sa.Column('price_cents', sa.BigInteger(), nullable=True))
+    # Numeric(10, 2) holds whole cents, so the conversion is exact.
+    op.execute("UPDATE dish SET price_cents = CAST(price * 100 AS BIGINT)")
+    op.alter_column('dish', 'price_cents', nullable=False)
+    op.drop_column('dish', 'price')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('dish', sa.Column('price', sa.Numeric(precision=10, scale=2), nullable=True))
+    op.execute("UPDATE dish SET price = CAST(price_cents AS NUMERIC(12, 2)) / 100")
+    op.alter_column('dish', 'price', nullable=False)
+    op.drop_column('dish', 'price_cents')
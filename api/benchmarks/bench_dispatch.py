@@ -0,0 +1,78 @@
+"""Time one dispatch round (batching + cost matrix + solver) in memory.
+
+The target is well under a second for 10k pending orders.
+
+    uv run --extra dispatch python benchmarks/bench_dispatch.py --orders 10000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from api.services.dispatch import AvailableCouriers, PendingDeliveries, plan_dispatch
+
+CENTER = np.array([55.75, 37.62])
+SPREAD_DEGREES = 0.3
+
+
+def synthetic_round(
+    orders: int,
+    restaurants: int,
+    couriers: int,
+    rng: np.random.Generator,
+) -> tuple[PendingDeliveries, AvailableCouriers]:
+    restaurant_positions = CENTER + rng.uniform(
+        -SPREAD_DEGREES, SPREAD_DEGREES, (restaurants, 2)
+    )
+    restaurant_ids = rng.zipf(1.3, orders) % restaurants
+    deliveries = PendingDeliveries(
+        user_ids=np.arange(orders),
+        restaurant_ids=restaurant_ids,
+        pickups=restaurant_positions[restaurant_ids],
+        dropoffs=restaurant_positions[restaurant_ids]
+        + rng.normal(0, 0.02, (orders, 2)),
+    )
+    available = AvailableCouriers(
+        courier_ids=np.arange(couriers),
+        positions=CENTER + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES, (couriers, 2)),
+    )
+    return deliveries, available
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--restaurants", type=int, default=2_000)
+    parser.add_argument("--couriers", type=int, default=2_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--solver", nargs="+", default=["greedy", "hungarian"])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    deliveries, couriers = synthetic_round(
+        args.orders, args.restaurants, args.couriers, rng
+    )
+    for solver in args.solver:
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            plan = plan_dispatch(
+                deliveries,
+                couriers,
+                max_batch_size=3,
+                max_drop_km=2,
+                max_pickup_km=10,
+                solver=solver,
+            )
+            timings.append(time.perf_counter() - started)
+        assigned = sum(len(user_ids) for _, user_ids in plan)
+        print(
+            f"{solver:9s} orders={args.orders} couriers={args.couriers}  "
+            f"best {min(timings) * 1000:7.1f} ms  "
+            f"assigned {assigned} orders to {len(plan)} couriers"
+        )
+
+
+if __name__ == "__main__":
+    main()
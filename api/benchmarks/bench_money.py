@@ -0,0 +1,116 @@
+"""Serializing a large cart and summing its total, Decimal vs integer cents.
+
+"decimal" mirrors the models as they were with ``Numeric(10, 2)`` prices;
+"cents" uses the current ones, which keep integer cents and only format
+decimal strings when writing JSON. No database is needed.
+
+    uv run python benchmarks/bench_money.py --items 10000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from api.models.order import OrderItemRead, OrderRead
+
+
+class DecimalItem(BaseModel):
+    restaurant_id: int
+    dish_id: int
+    quantity: int
+    name: str
+    description: str | None
+    price: Annotated[Decimal, Field(max_digits=10, decimal_places=2)]
+
+
+class DecimalOrder(BaseModel):
+    user_id: int
+    status: str
+    payment_method: str
+    created_at: datetime
+    items: list[DecimalItem]
+
+
+def cart_rows(items: int) -> list[dict]:
+    return [
+        {
+            "restaurant_id": 1,
+            "dish_id": i,
+            "quantity": random.randint(1, 5),
+            "name": f"dish {i}",
+            "description": None,
+            "price_cents": random.randint(50, 500_00),
+        }
+        for i in range(items)
+    ]
+
+
+def carts(rows: list[dict], decimal_rows: list[dict]) -> tuple[DecimalOrder, OrderRead]:
+    header = {
+        "user_id": 1,
+        "status": "pending",
+        "payment_method": "card",
+        "created_at": datetime.now(UTC),
+    }
+    decimal = DecimalOrder(
+        **header,
+        items=[DecimalItem.model_validate(row) for row in decimal_rows],
+    )
+    cents = OrderRead(
+        **header, items=[OrderItemRead.model_validate(row) for row in rows]
+    )
+    return decimal, cents
+
+
+def measure(run: Callable[[], object], repeat: int) -> float:
+    """Median milliseconds per call."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    rows = cart_rows(args.items)
+    decimal_rows = [{**row, "price": Decimal(row["price_cents"]) / 100} for row in rows]
+    decimal, cents = carts(rows, decimal_rows)
+    assert Decimal(cents.model_dump(mode="json")["total"]) == sum(  # noqa: S101
+        item.price * item.quantity for item in decimal.items
+    )
+
+    cases = {
+        "validate": (
+            lambda: [DecimalItem.model_validate(row) for row in decimal_rows],
+            lambda: [OrderItemRead.model_validate(row) for row in rows],
+        ),
+        "total": (
+            lambda: sum(item.price * item.quantity for item in decimal.items),
+            lambda: cents.total,
+        ),
+        "to json": (decimal.model_dump_json, cents.model_dump_json),
+    }
+    print(f"{'case':10s} {'decimal ms':>11s} {'cents ms':>9s}")
+    for name, (legacy, current) in cases.items():
+        print(
+            f"{name:10s} {measure(legacy, args.repeat):11.2f} "
+            f"{measure(current, args.repeat):9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
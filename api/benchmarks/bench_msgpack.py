@@ -0,0 +1,97 @@
+"""Payload size and encode time of large responses, JSON vs MessagePack.
+
+"msgpack direct" is what NegotiatedResponse and encode_response do: pack
+the models' JSON-mode dump. "msgpack" re-encodes the rendered JSON body
+instead, to show what the round trip would cost. Sizes are also shown
+after gzip, which the compression middleware applies on top. No database
+is needed.
+
+    uv run --extra msgpack python benchmarks/bench_msgpack.py
+"""
+
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+import msgpack
+from pydantic import TypeAdapter
+
+from api.models.restaurant import DishRead, MenuRead, RestaurantRead
+
+restaurant_list = TypeAdapter(list[RestaurantRead])
+
+
+def payloads(restaurants: int, dishes: int) -> dict[str, tuple[TypeAdapter, object]]:
+    listing = [
+        RestaurantRead(
+            restaurant_id=i,
+            name=f"Restaurant {i}",
+            description=f"Seeded restaurant {i}",
+            address=f"{i} Seed street",
+            phone=f"+7{random.randrange(10**10):010d}",
+            latitude=55.75 + random.uniform(-0.25, 0.25),
+            longitude=37.62 + random.uniform(-0.5, 0.5),
+        )
+        for i in range(restaurants)
+    ]
+    menu = MenuRead(
+        restaurant=listing[0],
+        dishes=[
+            DishRead(
+                dish_id=i,
+                restaurant_id=0,
+                name=f"Dish {i}",
+                description=f"Dish {i} of restaurant 0",
+                price=random.randint(10, 500) * 10,
+            )
+            for i in range(dishes)
+        ],
+    )
+    return {
+        "restaurants": (restaurant_list, listing),
+        "menu": (TypeAdapter(MenuRead), menu),
+    }
+
+
+def measure(run: Callable[[], bytes], repeat: int) -> tuple[float, bytes]:
+    """Median milliseconds per call and the encoded body."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--restaurants", type=int, default=10_000)
+    parser.add_argument("--dishes", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    print(f"{'payload':12s} {'format':15s} {'ms':>7s} {'KiB':>8s} {'gzip KiB':>9s}")
+    for name, (adapter, value) in payloads(args.restaurants, args.dishes).items():
+        encoded = adapter.dump_json(value)
+        formats = {
+            "json": lambda a=adapter, v=value: a.dump_json(v),
+            "msgpack": lambda e=encoded: msgpack.packb(json.loads(e)),
+            "msgpack direct": lambda a=adapter, v=value: msgpack.packb(
+                a.dump_python(v, mode="json")
+            ),
+        }
+        for label, encode in formats.items():
+            ms, body = measure(encode, args.repeat)
+            print(
+                f"{name:12s} {label:15s} {ms:7.2f} {len(body) / 1024:8.1f} "
+                f"{len(gzip.compress(body, 6)) / 1024:9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
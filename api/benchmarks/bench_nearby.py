@@ -0,0 +1,92 @@
+"""Latency of the nearest-restaurant query over a large catalogue.
+
+Needs a migrated database in DATABASE_URL. Seeds ``--restaurants`` rows
+scattered over a city-sized area, runs ``--queries`` random lookups and
+prints latency percentiles; the target is p95 under 10 ms at 100k rows.
+
+    uv run python benchmarks/bench_nearby.py --restaurants 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import delete, insert, text
+from sqlalchemy.orm import Session
+
+from api.db.database import get_engine, get_session_local
+from api.db.schemes import Restaurant
+from api.repositories.restaurant import RestaurantRepository
+from api.services.geo import encode_geohash
+from api.settings import get_settings
+
+NAME_PREFIX = "bench-nearby-"
+CENTER = (55.75, 37.62)
+SPREAD_DEGREES = 0.5
+
+
+def seed(db: Session, count: int, rng: random.Random) -> None:
+    db.execute(delete(Restaurant).where(Restaurant.name.startswith(NAME_PREFIX)))
+    rows = []
+    for i in range(count):
+        lat = CENTER[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+        lon = CENTER[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+        rows.append(
+            {
+                "name": f"{NAME_PREFIX}{i}",
+                "address": "-",
+                "phone": "-",
+                "latitude": lat,
+                "longitude": lon,
+                "geohash": encode_geohash(lat, lon),
+            }
+        )
+    for start in range(0, count, 10_000):
+        db.execute(insert(Restaurant), rows[start : start + 10_000])
+    db.commit()
+    db.execute(text("ANALYZE restaurant"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--restaurants", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--radius-km", type=float, default=2)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with get_session_local(get_engine(get_settings()))() as db:
+        seed(db, args.restaurants, rng)
+        repo = RestaurantRepository(db)
+
+        timings = []
+        found = 0
+        for _ in range(args.queries):
+            lat = CENTER[0] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+            lon = CENTER[1] + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+            started = time.perf_counter()
+            found += len(
+                repo.nearest_restaurants(lat, lon, args.radius_km, limit=args.limit)
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+            db.expunge_all()
+
+        db.execute(delete(Restaurant).where(Restaurant.name.startswith(NAME_PREFIX)))
+        db.commit()
+
+    quantiles = statistics.quantiles(timings, n=100)
+    print(
+        f"{args.restaurants} restaurants, radius {args.radius_km} km, "
+        f"k={args.limit}: avg {found / args.queries:.1f} results"
+    )
+    print(
+        f"p50 {quantiles[49]:.2f} ms  p95 {quantiles[94]:.2f} ms  "
+        f"p99 {quantiles[98]:.2f} ms  max {max(timings):.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
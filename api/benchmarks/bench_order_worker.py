@@ -0,0 +1,112 @@
+"""Orders per second processed by the SKIP LOCKED worker against worker count.
+
+Needs a migrated database in DATABASE_URL. Every run seeds ``--orders``
+queued orders, starts N worker processes and waits until the queue is
+drained; the total transition count proves no order was processed twice.
+
+    uv run python benchmarks/bench_order_worker.py --orders 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import multiprocessing as mp
+import threading
+import time
+
+from sqlalchemy import delete, func, insert, select
+
+from api.db.database import get_engine, get_session_local
+from api.db.schemes import Order, User
+from api.models.order import ORDER_TRANSITIONS, OrderStatus
+from api.settings import get_settings
+from api.worker import run_worker
+
+NAME_PREFIX = "bench-worker-"
+
+
+def _session_local():  # noqa: ANN202
+    return get_session_local(get_engine(get_settings()))
+
+
+def seed(orders: int) -> list[int]:
+    with _session_local()() as db:
+        db.execute(delete(User).where(User.name.startswith(NAME_PREFIX)))
+        user_ids = db.scalars(
+            insert(User).returning(User.user_id),
+            [
+                {
+                    "name": f"{NAME_PREFIX}{i}",
+                    "phone": "0",
+                    "address": "-",
+                    "password": "-",
+                }
+                for i in range(orders)
+            ],
+        ).all()
+        db.execute(
+            insert(Order),
+            [
+                {
+                    "user_id": user_id,
+                    "status": OrderStatus.QUEUED,
+                    "payment_method": "card",
+                }
+                for user_id in user_ids
+            ],
+        )
+        db.commit()
+    return list(user_ids)
+
+
+def _work(batch_size: int, results: mp.Queue) -> None:
+    stop = threading.Event()
+    results.put(run_worker(_session_local(), batch_size, 0.05, stop, once=True))
+
+
+def run(orders: int, workers: int, batch_size: int) -> None:
+    user_ids = seed(orders)
+    results: mp.Queue = mp.Queue()
+    processes = [
+        mp.Process(target=_work, args=(batch_size, results)) for _ in range(workers)
+    ]
+
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    transitions = sum(results.get() for _ in processes)
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    with _session_local()() as db:
+        delivering = db.scalar(
+            select(func.count())
+            .select_from(Order)
+            .where(
+                Order.user_id.in_(user_ids),
+                Order.status == OrderStatus.DELIVERING,
+            )
+        )
+        db.execute(delete(User).where(User.name.startswith(NAME_PREFIX)))
+        db.commit()
+
+    expected = orders * len(ORDER_TRANSITIONS)
+    print(
+        f"workers={workers:2d}  {transitions / elapsed:10.0f} transitions/s  "
+        f"{delivering / elapsed:9.0f} orders/s  "
+        f"transitions={transitions}/{expected}  delivering={delivering}/{orders}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    for workers in args.workers:
+        run(args.orders, workers, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""CPU and memory of the list reads, ORM entities vs Core rows.
+
+"orm" loads full entities into the session, as the repositories used to,
+and copies them into the response models; "rows" goes through the
+repositories, which select plain columns. Peak memory comes from
+tracemalloc, so absolute numbers are inflated but comparable.
+
+Needs a migrated database in DATABASE_URL.
+
+    uv run python benchmarks/bench_read_rows.py --rows 10000
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from pydantic import TypeAdapter
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from api.db.database import get_engine
+from api.db.schemes import Dish, Restaurant
+from api.models.restaurant import DishRead, RestaurantRead
+from api.repositories.restaurant import RestaurantRepository
+from api.settings import get_settings
+
+NAME = "bench-read-rows"
+
+restaurants = TypeAdapter(list[RestaurantRead])
+dishes = TypeAdapter(list[DishRead])
+
+
+def seed(db: Session, rows: int) -> int:
+    db.execute(delete(Restaurant).where(Restaurant.name == NAME))
+    restaurant = Restaurant(name=NAME, address="-", phone="-")
+    db.add(restaurant)
+    db.flush()
+    db.execute(
+        insert(Restaurant),
+        [{"name": NAME, "address": "-", "phone": "-"} for _ in range(rows - 1)],
+    )
+    db.execute(
+        insert(Dish),
+        [
+            {
+                "dish_id": i,
+                "restaurant_id": restaurant.restaurant_id,
+                "name": f"dish {i}",
+                "description": "-",
+                "price_cents": i % 1000 * 100,
+            }
+            for i in range(1, rows + 1)
+        ],
+    )
+    db.commit()
+    return restaurant.restaurant_id
+
+
+def paths(db: Session, restaurant_id: int) -> dict[str, dict[str, Callable]]:
+    repo = RestaurantRepository(db)
+    return {
+        "list_restaurants": {
+            "orm": lambda: [
+                RestaurantRead.model_validate(r) for r in db.query(Restaurant).all()
+            ],
+            "rows": lambda: restaurants.validate_python(repo.list_restaurants()),
+        },
+        "list_menu": {
+            "orm": lambda: [
+                DishRead.model_validate(d)
+                for d in db.query(Dish).filter(Dish.restaurant_id == restaurant_id)
+            ],
+            "rows": lambda: dishes.validate_python(repo.list_menu(restaurant_id)),
+        },
+    }
+
+
+def measure(db: Session, read: Callable, repeat: int) -> tuple[float, float]:
+    """Median milliseconds and peak MiB; the identity map is cleared each time."""
+    timings = []
+    for _ in range(repeat):
+        db.expunge_all()
+        started = time.perf_counter()
+        read()
+        timings.append(time.perf_counter() - started)
+
+    db.expunge_all()
+    tracemalloc.start()
+    read()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings) * 1000, peak / 2**20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with Session(get_engine(get_settings())) as db:
+        restaurant_id = seed(db, args.rows)
+        print(f"{'read':18s} {'path':5s} {'ms':>8s} {'peak MiB':>9s}")
+        for name, variants in paths(db, restaurant_id).items():
+            for path, read in variants.items():
+                ms, mib = measure(db, read, args.repeat)
+                print(f"{name:18s} {path:5s} {ms:8.1f} {mib:9.1f}")
+        db.execute(delete(Restaurant).where(Restaurant.name == NAME))
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Per-call overhead of the hot repository lookups, legacy Query vs cached.
+
+Needs a migrated database in DATABASE_URL. "legacy" rebuilds each lookup
+with the ``Query`` API on every call, as the repositories used to;
+"cached" goes through the repositories, which bind parameters into
+module-level statements or use ``Session.get``. Point DATABASE_URL at
+``postgresql+psycopg://`` and vary ``--prepare-threshold`` (``-1`` turns
+server-side prepares off) to see the driver-side effect as well.
+
+    uv run --extra psycopg python benchmarks/bench_statements.py --calls 5000
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from api.db.database import get_engine, get_session_local
+from api.db.schemes import Dish, Order, OrderDish, RefreshToken, Restaurant, User
+from api.repositories.order import OrderRepository
+from api.repositories.restaurant import RestaurantRepository
+from api.repositories.token import TokenRepository
+from api.repositories.user import UserRepository
+from api.settings import get_settings
+
+NAME = "bench-statements"
+TOKEN = f"{NAME}-token"
+
+
+def seed(db: Session) -> tuple[int, int, int]:
+    db.execute(delete(User).where(User.name == NAME))
+    db.execute(delete(Restaurant).where(Restaurant.name == NAME))
+    user = User(name=NAME, phone="-", address="-", password=NAME)
+    restaurant = Restaurant(name=NAME, address="-", phone="-")
+    db.add_all([user, restaurant])
+    db.flush()
+    dish = Dish(
+        dish_id=1, restaurant_id=restaurant.restaurant_id, name="-", price_cents=100
+    )
+    db.add_all(
+        [
+            dish,
+            Order(user_id=user.user_id, status="pending", payment_method="-"),
+            RefreshToken(
+                user_id=user.user_id,
+                token=TOKEN,
+                expires_at=datetime.now(UTC) + timedelta(days=1),
+            ),
+        ]
+    )
+    db.flush()
+    db.add(
+        OrderDish(
+            user_id=user.user_id,
+            restaurant_id=restaurant.restaurant_id,
+            dish_id=1,
+            quantity=1,
+        )
+    )
+    db.commit()
+    return user.user_id, restaurant.restaurant_id, dish.dish_id
+
+
+def legacy_lookups(
+    db: Session, user_id: int, restaurant_id: int, dish_id: int
+) -> dict[str, Callable[[], object]]:
+    return {
+        "get_current_order": lambda: (
+            db.query(Order).filter(Order.user_id == user_id).first()
+        ),
+        "get_dish": lambda: (
+            db.query(Dish)
+            .filter(Dish.restaurant_id == restaurant_id, Dish.dish_id == dish_id)
+            .first()
+        ),
+        "get_by_id": lambda: db.query(User).get(user_id),
+        "cart_line": lambda: (
+            db.query(OrderDish)
+            .filter_by(user_id=user_id, restaurant_id=restaurant_id, dish_id=dish_id)
+            .first()
+        ),
+        "is_refresh_token_valid": lambda: (
+            db.query(RefreshToken).filter_by(user_id=user_id, token=TOKEN).first()
+        ),
+    }
+
+
+def cached_lookups(
+    db: Session, user_id: int, restaurant_id: int, dish_id: int
+) -> dict[str, Callable[[], object]]:
+    orders = OrderRepository(db)
+    return {
+        "get_current_order": lambda: orders.get_current_order(user_id),
+        "get_dish": lambda: RestaurantRepository(db).get_dish(restaurant_id, dish_id),
+        "get_by_id": lambda: UserRepository(db).get_by_id(user_id),
+        "cart_line": lambda: orders.get_item(user_id, restaurant_id, dish_id),
+        "is_refresh_token_valid": lambda: TokenRepository(db).is_refresh_token_valid(
+            user_id, TOKEN
+        ),
+    }
+
+
+def measure(db: Session, lookup: Callable[[], object], calls: int) -> float:
+    """Median microseconds per call; the identity map is cleared every time."""
+    timings = []
+    for _ in range(calls):
+        db.expunge_all()
+        started = time.perf_counter()
+        lookup()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument(
+        "--prepare-threshold",
+        type=int,
+        help="override DB_PREPARE_THRESHOLD; -1 disables prepares",
+    )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    if args.prepare_threshold is not None:
+        threshold = None if args.prepare_threshold < 0 else args.prepare_threshold
+        settings = settings.model_copy(update={"db_prepare_threshold": threshold})
+    session_local = get_session_local(get_engine(settings))
+
+    with session_local() as db:
+        keys = seed(db)
+        legacy = legacy_lookups(db, *keys)
+        cached = cached_lookups(db, *keys)
+        print(f"{'lookup':24s} {'legacy us':>10s} {'cached us':>10s}")
+        for name, lookup in legacy.items():
+            measure(db, lookup, 100)
+            measure(db, cached[name], 100)
+            print(
+                f"{name:24s} {measure(db, lookup, args.calls):10.1f} "
+                f"{measure(db, cached[name], args.calls):10.1f}"
+            )
+        db.execute(delete(User).where(User.name == NAME))
+        db.execute(delete(Restaurant).where(Restaurant.name == NAME))
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
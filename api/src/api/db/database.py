@@ -1,25 +1,65 @@
 from collections.abc import Generator
+from functools import cache
 from typing import Annotated
 
-from fastapi import Depends
-from sqlalchemy import Engine, create_engine
+from fastapi import Depends, Request
+from sqlalchemy import Engine, create_engine, make_url
 from sqlalchemy.orm import Session, sessionmaker
 
+from api.middleware.db_sessions import track_session
 from api.settings import Settings, get_settings
 
 
+@cache
+def _create_engine(
+    database_url: str,
+    *,
+    prepare_threshold: int | None = None,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30,
+) -> Engine:
+    connect_args = {}
+    # psycopg 3 switches a statement to a server-side prepared one after it
+    # has run ``prepare_threshold`` times on a connection; psycopg2 can't.
+    if make_url(database_url).get_driver_name() == "psycopg":
+        connect_args["prepare_threshold"] = prepare_threshold
+    return create_engine(
+        database_url,
+        connect_args=connect_args,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+    )
+
+
+@cache
+def _create_session_local(engine: Engine) -> sessionmaker:
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+
 def get_engine(settings: Annotated[Settings, Depends(get_settings)]) -> Engine:
-    return create_engine(str(settings.database_url))
+    return _create_engine(
+        str(settings.database_url),
+        prepare_threshold=settings.db_prepare_threshold,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+    )
 
 
 def get_session_local(engine: Annotated[Engine, Depends(get_engine)]) -> sessionmaker:
-    return sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    return _create_session_local(engine)
 
 
 def get_db(
+    request: Request,
     session_local: Annotated[sessionmaker, Depends(get_session_local)],
 ) -> Generator[Session, None, None]:
+    # A Session checks a connection out only when its first statement runs;
+    # ReleaseSessionsMiddleware hands it back once the response starts.
     db = session_local()
+    track_session(request.scope, db)
 
     try:
         yield db
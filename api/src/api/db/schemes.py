@@ -1,16 +1,20 @@
 from datetime import UTC, datetime
 
 from sqlalchemy import (
+    BigInteger,
+    Boolean,
     Column,
     DateTime,
+    Float,
     ForeignKey,
     ForeignKeyConstraint,
+    Index,
     Integer,
-    Numeric,
     String,
     Text,
 )
 from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.sql import func
 
 Base = declarative_base()
 
@@ -23,6 +27,8 @@ class User(Base):
     phone = Column(String, nullable=False)
     address = Column(String, nullable=False)
     password = Column(String, nullable=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
     order = relationship(
         "Order",
         back_populates="user",
@@ -37,6 +43,7 @@ class User(Base):
         primaryjoin="User.user_id == OrderDish.user_id",
         foreign_keys="[OrderDish.user_id]",
         overlaps="items",
+        passive_deletes=True,
     )
     refresh_tokens = relationship(
         "RefreshToken",
@@ -54,17 +61,33 @@ class Restaurant(Base):
     description = Column(Text)
     address = Column(String, nullable=False)
     phone = Column(String, nullable=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    geohash = Column(String(12))
+
+    __table_args__ = (
+        Index(
+            "ix_restaurant_geohash",
+            "geohash",
+            postgresql_ops={"geohash": "varchar_pattern_ops"},
+        ),
+    )
 
     dish = relationship(
         "Dish",
         back_populates="restaurant",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
+    # Cart lines reference the restaurant only through the dish foreign key,
+    # so the database removes them and the ORM must never touch them.
     items = relationship(
         "OrderDish",
         back_populates="restaurant",
         primaryjoin="Restaurant.restaurant_id == OrderDish.restaurant_id",
         foreign_keys="[OrderDish.restaurant_id]",
         overlaps="items",
+        passive_deletes="all",
     )
 
 
@@ -79,7 +102,11 @@ class Dish(Base):
     )
     name = Column(String, nullable=False)
     description = Column(Text)
-    price = Column(Numeric(10, 2), nullable=False)
+    price_cents = Column(BigInteger, nullable=False)
+
+    # The primary key leads with dish_id; menus and feed previews scan one
+    # restaurant's dishes in dish order.
+    __table_args__ = (Index("ix_dish_menu", "restaurant_id", "dish_id"),)
 
     restaurant = relationship(
         "Restaurant",
@@ -94,6 +121,8 @@ class Dish(Base):
         ),
         foreign_keys="[OrderDish.dish_id, OrderDish.restaurant_id]",
         overlaps="items,restaurant",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
 
@@ -108,11 +137,35 @@ class Order(Base):
     status = Column(String, nullable=False)
     payment_method = Column(String, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+    # Naive UTC; the worker holds an order in each status for a while.
+    status_changed_at = Column(DateTime, nullable=False, server_default=func.now())
+    courier_id = Column(
+        Integer,
+        ForeignKey("courier.courier_id", ondelete="SET NULL"),
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_order_queue",
+            "status",
+            "created_at",
+            postgresql_where=status.in_(["queued", "preparing"]),
+        ),
+        Index(
+            "ix_order_dispatch",
+            "created_at",
+            postgresql_where=(status == "delivering") & courier_id.is_(None),
+        ),
+    )
 
     user = relationship(
         "User",
         back_populates="order",
     )
+    courier = relationship(
+        "Courier",
+        back_populates="orders",
+    )
     items = relationship(
         "OrderDish",
         back_populates="order",
@@ -122,6 +175,23 @@ class Order(Base):
     )
 
 
+class Courier(Base):
+    __tablename__ = "courier"
+
+    courier_id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    phone = Column(String, nullable=False)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    available = Column(Boolean, nullable=False, default=True)
+
+    orders = relationship(
+        "Order",
+        back_populates="courier",
+        passive_deletes=True,
+    )
+
+
 class OrderDish(Base):
     __tablename__ = "order_dish"
 
@@ -199,3 +269,52 @@ class RefreshToken(Base):
         primaryjoin="RefreshToken.user_id == User.user_id",
         foreign_keys="[RefreshToken.user_id]",
     )
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_key"
+
+    user_id = Column(
+        Integer,
+        ForeignKey("user.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # NULL until the first request finishes; other processes see it in flight.
+    status_code = Column(Integer)
+    body = Column(Text)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class CatalogueChange(Base):
+    """Append-only log of restaurant and dish writes, read by the change feed.
+
+    ``dish_id`` is NULL for restaurant changes. A restaurant ``delete``
+    also removes all of its dishes, which get no rows of their own.
+    """
+
+    __tablename__ = "catalogue_change"
+
+    change_id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+    )
+    restaurant_id = Column(Integer, nullable=False)
+    dish_id = Column(Integer)
+    operation = Column(String(6), nullable=False)
+    changed_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class RevokedToken(Base):
+    """Access tokens revoked before their ``exp``; every worker polls this."""
+
+    __tablename__ = "revoked_token"
+
+    revocation_id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+    )
+    jti = Column(String(64), nullable=False)
+    # The token's ``exp`` claim in epoch seconds; the row is useless after it.
+    expires_at = Column(BigInteger, nullable=False, index=True)
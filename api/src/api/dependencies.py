@@ -1,18 +1,34 @@
+from pathlib import Path
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from api.db.database import get_db
 from api.db.schemes import User
+from api.middleware.profiling import verify_profile_token
+from api.repositories.idempotency import IdempotencyRepository
 from api.repositories.order import OrderRepository
 from api.repositories.restaurant import RestaurantRepository
 from api.repositories.user import UserRepository
 from api.services.auth import verify_token
+from api.services.catalogue import CatalogueFiles, get_catalogue
+from api.services.idempotency import (
+    Idempotency,
+    IdempotencyCache,
+    get_idempotency_cache,
+    request_fingerprint,
+)
+from api.services.rate_limit import RateLimit
+from api.services.revocation import TokenDenylist, get_token_denylist
 from api.settings import Settings, get_settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+login_rate_limit = RateLimit("login", username_field="username")
+register_rate_limit = RateLimit("register", username_field="name")
 
 
 def get_user_repo(db: Annotated[Session, Depends(get_db)]) -> UserRepository:
@@ -25,14 +41,16 @@ def get_order_repo(db: Annotated[Session, Depends(get_db)]) -> OrderRepository:
 
 def get_restaurant_repo(
     db: Annotated[Session, Depends(get_db)],
+    catalogue: Annotated[CatalogueFiles | None, Depends(get_catalogue)],
 ) -> RestaurantRepository:
-    return RestaurantRepository(db)
+    return RestaurantRepository(db, catalogue)
 
 
 def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     user_repo: Annotated[UserRepository, Depends(get_user_repo)],
     settings: Annotated[Settings, Depends(get_settings)],
+    denylist: Annotated[TokenDenylist, Depends(get_token_denylist)],
 ) -> User:
     try:
         payload = verify_token(token, settings)
@@ -44,6 +62,15 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         ) from e
 
+    # Tokens issued before ``jti`` existed expire on their own shortly.
+    jti = payload.get("jti")
+    if jti and denylist.is_revoked(jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
     user = user_repo.get_by_id(user_id)
     if not user:
         raise HTTPException(
@@ -52,3 +79,42 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     return user
+
+
+def get_profile_dir(
+    settings: Annotated[Settings, Depends(get_settings)],
+    x_profile: Annotated[str | None, Header()] = None,
+) -> Path:
+    """Admin guard for stored profiles: the same signed header that requests one."""
+    if settings.profiling_dir is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Profiling is disabled")
+    secret = settings.profiling_secret
+    if not verify_profile_token(secret and secret.get_secret_value(), x_profile):
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Invalid profile signature")
+    return settings.profiling_dir
+
+
+def get_idempotency_repo(
+    db: Annotated[Session, Depends(get_db)],
+) -> IdempotencyRepository:
+    return IdempotencyRepository(db)
+
+
+async def get_idempotency(  # noqa: PLR0913
+    request: Request,
+    *,
+    current_user: Annotated[User, Depends(get_current_user)],
+    repo: Annotated[IdempotencyRepository, Depends(get_idempotency_repo)],
+    cache: Annotated[IdempotencyCache, Depends(get_idempotency_cache)],
+    settings: Annotated[Settings, Depends(get_settings)],
+    idempotency_key: Annotated[str | None, Header(min_length=1, max_length=255)] = None,
+) -> Idempotency:
+    return Idempotency(
+        cache=cache,
+        repo=repo,
+        user_id=current_user.user_id,
+        key=idempotency_key,
+        fingerprint=await request_fingerprint(request) if idempotency_key else "",
+        wait_seconds=settings.idempotency_wait_seconds,
+        lease_seconds=settings.idempotency_lease_seconds,
+    )
@@ -0,0 +1,98 @@
+import argparse
+import logging
+import signal
+import threading
+import time
+from types import FrameType
+
+from sqlalchemy.orm import sessionmaker
+
+from api.db.database import get_engine, get_session_local
+from api.repositories.courier import CourierRepository
+from api.services.dispatch import plan_dispatch
+from api.settings import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def dispatch_round(session_local: sessionmaker, settings: Settings) -> int:
+    """Assign waiting orders to free couriers; return how many orders got one."""
+    with session_local() as db:
+        repo = CourierRepository(db)
+        deliveries = repo.pending_deliveries(settings.dispatch_max_orders)
+        couriers = repo.available_couriers()
+        assignments = plan_dispatch(
+            deliveries,
+            couriers,
+            max_batch_size=settings.dispatch_batch_size,
+            max_drop_km=settings.dispatch_max_drop_km,
+            max_pickup_km=settings.dispatch_max_pickup_km,
+            solver=settings.dispatch_solver,
+        )
+        repo.assign(assignments)
+    return sum(len(user_ids) for _, user_ids in assignments)
+
+
+def record_delivery(session_local: sessionmaker, courier_id: int, user_id: int) -> None:
+    """Mark one order handed over by its courier; ValueError if it was not out."""
+    with session_local() as db:
+        CourierRepository(db).complete_delivery(courier_id, user_id)
+
+
+def run_dispatcher(
+    session_local: sessionmaker,
+    settings: Settings,
+    stop: threading.Event,
+    *,
+    once: bool = False,
+) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        assigned = dispatch_round(session_local, settings)
+        logger.info(
+            "Dispatched %d orders in %.1f ms",
+            assigned,
+            (time.perf_counter() - started) * 1000,
+        )
+        if once:
+            break
+        stop.wait(settings.dispatch_interval_seconds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Assign couriers to orders.")
+    parser.add_argument("--once", action="store_true", help="run a single round")
+    parser.add_argument(
+        "--delivered",
+        nargs=2,
+        type=int,
+        metavar=("COURIER_ID", "USER_ID"),
+        help="record that the courier handed the user's order over, then exit",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    session_local = get_session_local(get_engine(settings))
+    if args.delivered:
+        try:
+            record_delivery(session_local, *args.delivered)
+        except ValueError as e:
+            parser.error(str(e))
+        logger.info("Courier %d delivered the order of user %d", *args.delivered)
+        return
+
+    stop = threading.Event()
+
+    def _stop(signum: int, _frame: FrameType | None) -> None:
+        logger.info("Received signal %d, finishing current round", signum)
+        stop.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    run_dispatcher(session_local, settings, stop, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,75 @@
-import uvicorn
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 from api import __version__
-from api.routers import auth, order, restaurant, user
+from api.db.database import get_engine, get_session_local
+from api.middleware.admission import AdmissionControlMiddleware
+from api.middleware.compression import CompressionMiddleware
+from api.middleware.db_sessions import ReleaseSessionsMiddleware
+from api.middleware.negotiation import ContentNegotiationMiddleware
+from api.middleware.profiling import profiling_middleware
+from api.routers import auth, metrics, order, profiles, restaurant, user
+from api.services.order_events import OrderStatusListener, order_event_hub
+from api.services.revocation import DenylistSync, get_token_denylist
+from api.services.serialization import NegotiatedResponse
+from api.settings import get_settings
+from api.startup import size_threadpool, warm_up
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    settings = get_settings()
+    logger.info("Sync route threadpool sized to %d", size_threadpool(settings))
+    started = time.perf_counter()
+    await run_in_threadpool(warm_up, settings)
+    app.state.warm_up_seconds = time.perf_counter() - started
+    logger.info("Worker warmed up in %.1f ms", app.state.warm_up_seconds * 1000)
+
+    order_event_hub.bind(asyncio.get_running_loop())
+    listener = None
+    if settings.order_events_listen:
+        listener = OrderStatusListener(get_engine(settings), order_event_hub)
+        listener.start()
+    denylist_sync = None
+    if settings.token_denylist_sync:
+        denylist_sync = DenylistSync(
+            get_session_local(get_engine(settings)),
+            get_token_denylist(),
+            settings.token_denylist_poll_seconds,
+        )
+        denylist_sync.start()
 
-app = FastAPI(title="foojidoo", version=__version__)
+    yield
 
+    if listener is not None:
+        listener.stop()
+        await run_in_threadpool(listener.join)
+    if denylist_sync is not None:
+        denylist_sync.stop()
+        await run_in_threadpool(denylist_sync.join)
+
+
+app = FastAPI(
+    title="foojidoo",
+    version=__version__,
+    lifespan=lifespan,
+    default_response_class=NegotiatedResponse,
+)
+
+app.add_middleware(ReleaseSessionsMiddleware)
+app.add_middleware(AdmissionControlMiddleware)
+app.add_middleware(ContentNegotiationMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(profiling_middleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -16,12 +79,16 @@ app.add_middleware(
 )
 
 app.include_router(auth.router, prefix="/auth")
+app.include_router(metrics.router, prefix="/metrics")
 app.include_router(order.router, prefix="/order")
+app.include_router(profiles.router, prefix="/admin")
 app.include_router(restaurant.router, prefix="/restaurant")
 app.include_router(user.router, prefix="/user")
 
 
 def main() -> None:
+    import uvicorn  # noqa: PLC0415
+
     uvicorn.run(app, host="0.0.0.0", port=8080)  # noqa: S104
 
 
@@ -0,0 +1,114 @@
+import json
+from dataclasses import asdict, dataclass
+
+from starlette.datastructures import State
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.settings import Settings, get_settings
+
+# Path prefixes (after the router prefixes in api.main) per budget.
+ROUTE_CLASSES = {
+    "auth": ("/auth", "/user"),
+    "cart": ("/order",),
+    "catalogue": ("/restaurant",),
+}
+
+
+@dataclass
+class AdmissionStats:
+    limit: int
+    in_flight: int = 0
+    admitted: int = 0
+    shed: int = 0
+
+
+def admission_stats(state: State) -> dict[str, dict[str, int]]:
+    """Counters of the admission middleware registered on an app's ``state``."""
+    admission = getattr(state, "admission_control", None)
+    return admission.snapshot() if admission else {}
+
+
+def route_class(path: str) -> str | None:
+    for name, prefixes in ROUTE_CLASSES.items():
+        if path.startswith(prefixes):
+            return name
+    return None
+
+
+class AdmissionControlMiddleware:
+    """Cap in-flight requests per route class and shed the excess with 503.
+
+    Separate budgets keep a browse spike on the catalogue from starving
+    the cart and login. A slot is held until the response starts, so
+    long-lived streams (SSE) don't pin their budget. Rejections are
+    immediate: queueing would only move the wait into the threadpool.
+    Each instance keeps its own counters and registers itself on the
+    app's state for ``/metrics/admission``.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings | None = None) -> None:
+        settings = settings or get_settings()
+        self.app = app
+        limits = {
+            "auth": settings.admission_auth_limit,
+            "cart": settings.admission_cart_limit,
+            "catalogue": settings.admission_catalogue_limit,
+        }
+        self.stats = {
+            name: AdmissionStats(limit=limit) for name, limit in limits.items()
+        }
+        self.retry_after = str(settings.admission_retry_after_seconds)
+        self.registered = False
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        return {name: asdict(stats) for name, stats in self.stats.items()}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.registered and "app" in scope:
+            scope["app"].state.admission_control = self
+            self.registered = True
+        name = route_class(scope["path"]) if scope["type"] == "http" else None
+        if name is None or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        stats = self.stats[name]
+        if stats.in_flight >= stats.limit:
+            stats.shed += 1
+            await self._reject(send)
+            return
+
+        stats.in_flight += 1
+        stats.admitted += 1
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                stats.in_flight -= 1
+
+        async def send_and_release(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                release()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_release)
+        finally:
+            release()
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": "Server busy, retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", self.retry_after.encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,295 @@
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.settings import Settings, get_settings
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/msgpack",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+class StreamCompressor(Protocol):
+    def compress(self, chunk: bytes) -> bytes:
+        """Compress ``chunk`` and flush it so the client can decode it now."""
+        ...
+
+    def finish(self) -> bytes: ...
+
+
+class Codec(Protocol):
+    name: str
+
+    def compress(self, body: bytes) -> bytes: ...
+
+    def stream(self) -> StreamCompressor: ...
+
+
+class GzipCodec:
+    name = "gzip"
+
+    def __init__(self, level: int) -> None:
+        self.level = level
+
+    def compress(self, body: bytes) -> bytes:
+        return gzip.compress(body, self.level, mtime=0)
+
+    def stream(self) -> StreamCompressor:
+        return _ZlibStream(zlib.compressobj(self.level, zlib.DEFLATED, 31))
+
+
+class _ZlibStream:
+    def __init__(self, compressor: Any) -> None:  # noqa: ANN401
+        self.compressor = compressor
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self.compressor.compress(chunk) + self.compressor.flush(
+            zlib.Z_SYNC_FLUSH
+        )
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliCodec:
+    name = "br"
+
+    def __init__(self, quality: int) -> None:
+        import brotli  # noqa: PLC0415
+
+        self.brotli = brotli
+        self.quality = quality
+
+    def compress(self, body: bytes) -> bytes:
+        return self.brotli.compress(body, quality=self.quality)
+
+    def stream(self) -> StreamCompressor:
+        return _BrotliStream(self.brotli.Compressor(quality=self.quality))
+
+
+class _BrotliStream:
+    def __init__(self, compressor: Any) -> None:  # noqa: ANN401
+        self.compressor = compressor
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self.compressor.process(chunk) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdCodec:
+    name = "zstd"
+
+    def __init__(self, level: int) -> None:
+        import zstandard  # noqa: PLC0415
+
+        self.zstandard = zstandard
+        self.compressor = zstandard.ZstdCompressor(level=level)
+
+    def compress(self, body: bytes) -> bytes:
+        return self.compressor.compress(body)
+
+    def stream(self) -> StreamCompressor:
+        return _ZstdStream(self.compressor.compressobj(), self.zstandard)
+
+
+class _ZstdStream:
+    def __init__(self, compressor: Any, zstandard: Any) -> None:  # noqa: ANN401
+        self.compressor = compressor
+        self.flush_block = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self.compressor.compress(chunk) + self.compressor.flush(self.flush_block)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+def build_codecs(settings: Settings) -> list[Codec]:
+    """Codecs in server preference order; brotli and zstd are skipped if missing."""
+    factories = {
+        "br": lambda: BrotliCodec(settings.compression_brotli_quality),
+        "zstd": lambda: ZstdCodec(settings.compression_zstd_level),
+        "gzip": lambda: GzipCodec(settings.compression_gzip_level),
+    }
+    codecs: list[Codec] = []
+    for name in settings.compression_encodings:
+        try:
+            codecs.append(factories[name]())
+        except ImportError:
+            continue
+    return codecs
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for item in value.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        key, _, raw = params.strip().partition("=")
+        if key.strip() == "q":
+            try:
+                weight = float(raw)
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    return weights
+
+
+def negotiate(accept_encoding: str, codecs: Iterable[Codec]) -> Codec | None:
+    """Pick the client's highest weighted codec; ties go to server order."""
+    weights = parse_accept_encoding(accept_encoding)
+    wildcard = weights.get("*", 0.0)
+    best, best_weight = None, 0.0
+    for codec in codecs:
+        weight = weights.get(codec.name, wildcard)
+        if weight > best_weight:
+            best, best_weight = codec, weight
+    return best
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by encoding and ETag or body digest.
+
+    Identical large responses such as the restaurant list are compressed
+    once; later requests pay for a hash instead of a brotli pass.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compress(self, codec: Codec, body: bytes, etag: str | None) -> bytes:
+        if not self.max_entries:
+            return codec.compress(body)
+        tag = etag.encode() if etag else hashlib.blake2b(body, digest_size=16).digest()
+        key = (codec.name, tag)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                return compressed
+        compressed = codec.compress(body)
+        with self._lock:
+            self._entries[key] = compressed
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return compressed
+
+
+class CompressionMiddleware:
+    """Content-negotiated br/zstd/gzip compression.
+
+    Complete bodies under ``compression_min_size`` pass through untouched.
+    Streamed bodies (NDJSON, SSE) are compressed chunk by chunk with a
+    flush after each one, so events are never held back. Responses that
+    already carry a Content-Encoding are passed through as they are.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings | None = None) -> None:
+        settings = settings or get_settings()
+        self.app = app
+        self.minimum_size = settings.compression_min_size
+        self.codecs = build_codecs(settings)
+        self.cache = CompressedBodyCache(settings.compression_cache_entries)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codec = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.codecs)
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingSend(self, codec, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSend:
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        codec: Codec,
+        send: Send,
+    ) -> None:
+        self.middleware = middleware
+        self.codec = codec
+        self.send = send
+        self.start: Message | None = None
+        self.stream: StreamCompressor | None = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+        elif self.start is not None:
+            start, self.start = self.start, None
+            await self._first(start, message)
+        elif self.stream is not None and message["type"] == "http.response.body":
+            more_body = message.get("more_body", False)
+            chunk = self.stream.compress(message.get("body", b""))
+            if not more_body:
+                chunk += self.stream.finish()
+            await self.send(
+                {"type": "http.response.body", "body": chunk, "more_body": more_body}
+            )
+        else:
+            await self.send(message)
+
+    async def _first(self, start: Message, message: Message) -> None:
+        headers = MutableHeaders(raw=start["headers"])
+        if message["type"] != "http.response.body" or not _compressible(
+            start["status"], headers
+        ):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        body = message.get("body", b"")
+        if message.get("more_body", False):
+            self.stream = self.codec.stream()
+            del headers["Content-Length"]
+            headers["Content-Encoding"] = self.codec.name
+            await self.send(start)
+            await self.send(
+                {
+                    "type": "http.response.body",
+                    "body": self.stream.compress(body),
+                    "more_body": True,
+                }
+            )
+            return
+
+        if len(body) >= self.middleware.minimum_size:
+            body = self.middleware.cache.compress(self.codec, body, headers.get("etag"))
+            headers["Content-Encoding"] = self.codec.name
+            headers["Content-Length"] = str(len(body))
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": body})
+
+
+def _compressible(status_code: int, headers: MutableHeaders) -> bool:
+    return (
+        status_code >= 200  # noqa: PLR2004
+        and status_code not in {204, 304}
+        and "content-encoding" not in headers
+        and "no-transform" not in headers.get("cache-control", "")
+        and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+    )
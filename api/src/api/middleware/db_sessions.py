@@ -0,0 +1,49 @@
+from anyio import to_thread
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SESSIONS_SCOPE_KEY = "api.db_sessions"
+
+
+def _close_all(sessions: list[Session]) -> None:
+    while sessions:
+        sessions.pop().close()
+
+
+def track_session(scope: Scope, db: Session) -> None:
+    """Have :class:`ReleaseSessionsMiddleware` close ``db`` once the response starts."""
+    sessions = scope.get(SESSIONS_SCOPE_KEY)
+    if sessions is not None:
+        sessions.append(db)
+
+
+class ReleaseSessionsMiddleware:
+    """Return pooled connections as soon as the endpoint has produced its response.
+
+    FastAPI tears yield dependencies down only after the whole body has been
+    sent, so ``get_db`` alone would hold a connection (and an open
+    transaction) while a slow client downloads or a stream is consumed.
+    Sessions registered with :func:`track_session` are closed when the
+    response headers go out instead; a closed session can still be reused
+    and simply checks out a new connection. Closing rolls back and returns
+    the connection to the pool, which may block, so it runs in a worker
+    thread rather than on the event loop.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sessions: list[Session] = []
+        scope[SESSIONS_SCOPE_KEY] = sessions
+
+        async def send_and_release(message: Message) -> None:
+            if message["type"] == "http.response.start" and sessions:
+                await to_thread.run_sync(_close_all, sessions)
+            await send(message)
+
+        await self.app(scope, receive, send_and_release)
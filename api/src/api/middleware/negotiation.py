@@ -0,0 +1,117 @@
+import json
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.services.serialization import (
+    JSON_MEDIA_TYPE,
+    Serializer,
+    build_serializers,
+    media_type_of,
+    negotiate_format,
+    negotiated_serializer,
+)
+from api.settings import Settings, get_settings
+
+
+class ContentNegotiationMiddleware:
+    """Serve every JSON endpoint in the formats of the serializer registry.
+
+    Request bodies in a registered format are decoded and handed to the
+    app as JSON, so routes only ever see JSON. The format ``Accept``
+    prefers is published in ``negotiated_serializer`` for
+    :class:`NegotiatedResponse` and ``encode_response`` to encode model
+    dumps with directly; responses are never re-parsed here. Every
+    response in a registered format gets ``Vary: Accept``.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings | None = None) -> None:
+        self.app = app
+        self.settings = settings
+        self.serializers: dict[str, Serializer] | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self.serializers is None:
+            self.serializers = build_serializers(self.settings or get_settings())
+        if scope["type"] != "http" or len(self.serializers) == 1:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        body_format = self.serializers.get(
+            media_type_of(headers.get("content-type", ""))
+        )
+        if body_format is not None and body_format.media_type != JSON_MEDIA_TYPE:
+            body = await _read_body(receive)
+            try:
+                body = json.dumps(body_format.loads(body)).encode()
+            except (ValueError, TypeError):
+                await _malformed_body(send)
+                return
+            scope = _with_json_body(scope, len(body))
+            receive = _replay(body, receive)
+
+        token = negotiated_serializer.set(
+            negotiate_format(headers.get("accept", ""), self.serializers)
+        )
+        try:
+            await self.app(scope, receive, _VaryingSend(self.serializers, send))
+        finally:
+            negotiated_serializer.reset(token)
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _with_json_body(scope: Scope, length: int) -> Scope:
+    headers = MutableHeaders(scope={**scope, "headers": list(scope["headers"])})
+    headers["content-type"] = JSON_MEDIA_TYPE
+    headers["content-length"] = str(length)
+    return {**scope, "headers": headers.raw}
+
+
+def _replay(body: bytes, receive: Receive) -> Receive:
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+async def _malformed_body(send: Send) -> None:
+    body = b'{"detail":"Malformed request body"}'
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 400,
+            "headers": [
+                (b"content-type", JSON_MEDIA_TYPE.encode()),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class _VaryingSend:
+    def __init__(self, serializers: dict[str, Serializer], send: Send) -> None:
+        self.serializers = serializers
+        self.send = send
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            headers = MutableHeaders(raw=message["headers"])
+            if media_type_of(headers.get("content-type", "")) in self.serializers:
+                headers.add_vary_header("Accept")
+        await self.send(message)
@@ -0,0 +1,235 @@
+import argparse
+import hashlib
+import hmac
+import json
+import random
+import re
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any
+
+from anyio import to_thread
+from sqlalchemy import Engine, event
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.settings import Settings, get_settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_SUFFIX = ".speedscope.json"
+
+_statements: ContextVar[list[int] | None] = ContextVar("statements", default=None)
+
+
+def sign_profile_token(secret: str, expires_at: int) -> str:
+    """Header value that lets its holder profile requests until ``expires_at``."""
+    digest = hmac.new(secret.encode(), str(expires_at).encode(), hashlib.sha256)
+    return f"{expires_at}.{digest.hexdigest()}"
+
+
+def verify_profile_token(secret: str | None, token: str | None) -> bool:
+    if not secret or not token:
+        return False
+    expires_at, _, _ = token.partition(".")
+    if not expires_at.isdigit() or int(expires_at) < time.time():
+        return False
+    return hmac.compare_digest(token, sign_profile_token(secret, int(expires_at)))
+
+
+def _count_statement(*_args: Any) -> None:  # noqa: ANN401
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class _Sampler(threading.Thread):
+    """Samples every thread's stack and keeps those running the matched endpoint.
+
+    Sync routes run in the threadpool, out of reach of per-thread
+    profilers such as pyinstrument or cProfile, so stacks are taken from
+    ``sys._current_frames()`` instead. Concurrent requests to the same
+    route land in the same profile, which is what a regression hunt needs.
+    """
+
+    def __init__(self, scope: Scope, interval: float) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.scope = scope
+        self.interval = interval
+        self.frames: dict[tuple[str, str, int], int] = {}
+        self.samples: list[list[int]] = []
+        self.started_at = time.perf_counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            code = getattr(self.scope.get("endpoint"), "__code__", None)
+            if code is None:
+                continue
+            for thread_id, frame in sys._current_frames().items():  # noqa: SLF001
+                if thread_id != own_id:
+                    self._sample(frame, code)
+
+    def _sample(self, frame: Any, code: Any) -> None:  # noqa: ANN401
+        stack, matched = [], False
+        while frame is not None:
+            matched = matched or frame.f_code is code
+            key = (
+                frame.f_code.co_qualname,
+                frame.f_code.co_filename,
+                frame.f_code.co_firstlineno,
+            )
+            stack.append(self.frames.setdefault(key, len(self.frames)))
+            frame = frame.f_back
+        if matched:
+            stack.reverse()
+            self.samples.append(stack)
+
+    def stop(self) -> float:
+        self._stop_event.set()
+        self.join()
+        return time.perf_counter() - self.started_at
+
+    def speedscope(self, name: str, duration: float, metadata: dict) -> dict:
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "foojidoo",
+            "name": name,
+            "metadata": metadata,
+            "shared": {
+                "frames": [
+                    {"name": qualname, "file": file, "line": line}
+                    for qualname, file, line in self.frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": duration,
+                    "samples": self.samples,
+                    "weights": [self.interval] * len(self.samples),
+                }
+            ],
+        }
+
+
+class ProfilingMiddleware:
+    """Profile a request when it carries a valid signed header or is sampled.
+
+    Profiles are written as speedscope JSON tagged with the route, status,
+    duration and SQL statement count; only the newest ``max_files`` stay.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings, directory: Path) -> None:
+        self.app = app
+        self.directory = directory
+        self.secret = (
+            settings.profiling_secret.get_secret_value()
+            if settings.profiling_secret
+            else None
+        )
+        self.sample_rate = settings.profiling_sample_rate
+        self.interval = settings.profiling_interval_seconds
+        self.max_files = settings.profiling_max_files
+        event.listen(Engine, "before_cursor_execute", _count_statement)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 0
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        counter = [0]
+        token = _statements.set(counter)
+        sampler = _Sampler(scope, self.interval)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = sampler.stop()
+            _statements.reset(token)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            metadata = {
+                "method": scope["method"],
+                "route": route,
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "sql_statements": counter[0],
+                "samples": len(sampler.samples),
+                "created_at": time.time(),
+            }
+            await to_thread.run_sync(self._save, sampler, metadata)
+
+    def _wanted(self, scope: Scope) -> bool:
+        token = Headers(scope=scope).get(PROFILE_HEADER)
+        if token is not None:
+            return verify_profile_token(self.secret, token)
+        return self.sample_rate > 0 and random.random() < self.sample_rate  # noqa: S311
+
+    def _save(self, sampler: _Sampler, metadata: dict) -> None:
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", metadata["route"]).strip("-") or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{metadata['method']}-{slug}"
+        name = f"{name}-{random.getrandbits(32):08x}"
+        profile = sampler.speedscope(
+            f"{metadata['method']} {metadata['route']}",
+            metadata["duration_ms"] / 1000,
+            metadata,
+        )
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{name}{PROFILE_SUFFIX}").write_text(json.dumps(profile))
+        for old in list_profiles(self.directory)[self.max_files :]:
+            old.unlink(missing_ok=True)
+
+
+def list_profiles(directory: Path) -> list[Path]:
+    """Stored profiles, newest first."""
+    return sorted(
+        directory.glob(f"*{PROFILE_SUFFIX}"),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    )
+
+
+def profiling_middleware(app: ASGIApp, settings: Settings | None = None) -> ASGIApp:
+    """
+    Wrap ``app`` only when profiling is configured; otherwise the app is
+    returned as is, so a disabled profiler adds no layer and no overhead.
+    """
+    settings = settings or get_settings()
+    directory = settings.profiling_dir
+    if directory is None or not (
+        settings.profiling_secret or settings.profiling_sample_rate > 0
+    ):
+        return app
+    return ProfilingMiddleware(app, settings, directory)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=f"Print an {PROFILE_HEADER} header value for profiling requests."
+    )
+    parser.add_argument("--ttl", type=int, default=600, help="seconds it stays valid")
+    args = parser.parse_args()
+
+    secret = get_settings().profiling_secret
+    if secret is None:
+        parser.error("PROFILING_SECRET is not set")
+    token = sign_profile_token(secret.get_secret_value(), int(time.time()) + args.ttl)
+    print(f"{PROFILE_HEADER}: {token}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from decimal import Decimal, InvalidOperation
+from typing import Annotated
+
+from pydantic import (
+    AliasChoices,
+    BeforeValidator,
+    Field,
+    PlainSerializer,
+    WithJsonSchema,
+)
+
+# Prices are stored and summed as integer cents; the API speaks decimal
+# strings such as "12.50", exactly as it did with Numeric(10, 2).
+MAX_CENTS = 10**10 - 1
+_DECIMAL_JSON = WithJsonSchema(
+    {"type": "string", "pattern": r"^-?\d+(\.\d{1,2})?$", "examples": ["12.50"]}
+)
+
+
+def format_cents(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    units, rest = divmod(abs(cents), 100)
+    return f"{sign}{units}.{rest:02d}"
+
+
+def parse_cents(value: object) -> int:
+    """Turn ``"12.5"``, ``12.5`` or ``Decimal("12.50")`` into ``1250``."""
+    if isinstance(value, bool) or not isinstance(value, str | int | float | Decimal):
+        msg = "must be a decimal amount"
+        raise ValueError(msg)  # noqa: TRY004
+    try:
+        cents = Decimal(str(value)) * 100
+    except InvalidOperation as e:
+        msg = "must be a decimal amount"
+        raise ValueError(msg) from e
+    if not cents.is_finite() or cents % 1:
+        msg = "must have at most two decimal places"
+        raise ValueError(msg)
+    return int(cents)
+
+
+_AS_DECIMAL = PlainSerializer(format_cents, return_type=str, when_used="json")
+
+# Integer cents inside, decimal string in JSON output.
+Cents = Annotated[int, _AS_DECIMAL, _DECIMAL_JSON]
+
+# A client-supplied amount: decimal string or number in, integer cents out.
+Price = Annotated[
+    int,
+    BeforeValidator(parse_cents),
+    Field(ge=0, le=MAX_CENTS),
+    _AS_DECIMAL,
+    _DECIMAL_JSON,
+]
+
+# Dishes store ``price_cents``; read models expose it as ``price``.
+DishPrice = Annotated[
+    Cents, Field(validation_alias=AliasChoices("price", "price_cents"))
+]
@@ -1,8 +1,26 @@
 from datetime import datetime
-from decimal import Decimal
+from enum import StrEnum
 from typing import Annotated
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, computed_field
+
+from api.models.money import Cents, DishPrice
+
+
+class OrderStatus(StrEnum):
+    PENDING = "pending"
+    QUEUED = "queued"
+    PREPARING = "preparing"
+    DELIVERING = "delivering"
+    DELIVERED = "delivered"
+    CANCELLED = "cancelled"
+
+
+# Status changes applied by the order worker, one step per claim.
+ORDER_TRANSITIONS = {
+    OrderStatus.QUEUED: OrderStatus.PREPARING,
+    OrderStatus.PREPARING: OrderStatus.DELIVERING,
+}
 
 
 class OrderItemCreate(BaseModel):
@@ -11,6 +29,18 @@ class OrderItemCreate(BaseModel):
     quantity: Annotated[int, Field(gt=0)] = 1
 
 
+class CartLine(BaseModel):
+    restaurant_id: int
+    dish_id: int
+
+
+class CartBatch(BaseModel):
+    """Cart lines to add (quantities accumulate) and remove in one request."""
+
+    add: Annotated[list[OrderItemCreate], Field(max_length=100)] = []
+    remove: Annotated[list[CartLine], Field(max_length=100)] = []
+
+
 class OrderItemRead(BaseModel):
     restaurant_id: int
     dish_id: int
@@ -18,7 +48,7 @@ class OrderItemRead(BaseModel):
     name: str
     description: str | None
 
-    price: Annotated[Decimal, Field(max_digits=10, decimal_places=2)]
+    price: DishPrice
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -31,3 +61,12 @@ class OrderRead(BaseModel):
     items: list[OrderItemRead]
 
     model_config = ConfigDict(from_attributes=True)
+
+    @computed_field
+    @property
+    def total(self) -> Cents:
+        return sum(item.price * item.quantity for item in self.items)
+
+
+class OrderCheckout(BaseModel):
+    payment_method: Annotated[str, StringConstraints(min_length=1)]
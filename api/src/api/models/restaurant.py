@@ -1,29 +1,114 @@
-from decimal import Decimal
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Literal
 
 from pydantic import BaseModel, ConfigDict, Field, StringConstraints
 
+from api.models.money import DishPrice, Price
+
+Latitude = Annotated[float, Field(ge=-90, le=90)]
+Longitude = Annotated[float, Field(ge=-180, le=180)]
+
+DISH_BATCH_MAX = 100
+
 
 class DishRead(BaseModel):
     dish_id: int
     restaurant_id: int
     name: str
     description: str | None
-    price: Annotated[Decimal, Field(max_digits=10, decimal_places=2)]
+    price: DishPrice
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class DishKey(BaseModel):
+    restaurant_id: int
+    dish_id: int
+
+
+class DishBatch(BaseModel):
+    """Dishes to look up together, e.g. every line of a cart."""
+
+    keys: Annotated[list[DishKey], Field(min_length=1, max_length=DISH_BATCH_MAX)]
+
+
+class DishLookup(DishKey):
+    """One requested key; ``dish`` is null when no such dish exists."""
+
+    dish: DishRead | None
+
+
 class RestaurantRead(BaseModel):
     restaurant_id: int
     name: str
     description: str | None
     address: str
     phone: str
+    latitude: float | None = None
+    longitude: float | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class RestaurantNearbyRead(RestaurantRead):
+    distance_km: float
+
+
+class NearbyQuery(BaseModel):
+    latitude: Latitude
+    longitude: Longitude
+    radius_km: Annotated[float, Field(gt=0, le=100)] = 5
+    limit: Annotated[int, Field(ge=1, le=100)] = 20
+    offset: Annotated[int, Field(ge=0)] = 0
+
+
+class FeedQuery(BaseModel):
+    after: Annotated[
+        int, Field(ge=0, description="next_after of the previous page")
+    ] = 0
+    limit: Annotated[int, Field(ge=1, le=50)] = 20
+    dishes: Annotated[int, Field(ge=0, le=10, description="Dishes per restaurant")] = 3
+
+
+class FeedRestaurant(RestaurantRead):
+    dishes: list[DishRead]
+
+
+class FeedPage(BaseModel):
+    restaurants: list[FeedRestaurant]
+    next_after: int | None
+
+
+class ChangesQuery(BaseModel):
+    since: Annotated[
+        int | None,
+        Field(ge=0, description="next_since of the previous page; omit for the head"),
+    ] = None
+    limit: Annotated[int, Field(ge=1, le=1000)] = 500
+
+
+class CatalogueChangeRead(BaseModel):
+    """One catalogue write; ``dish_id`` is null for restaurant changes.
+
+    Deleting a restaurant deletes its dishes too. Upserts carry the
+    current restaurant or dish, so applying a page in order is enough.
+    """
+
+    change_id: int
+    operation: Literal["upsert", "delete"]
+    restaurant_id: int
+    dish_id: int | None
+    changed_at: datetime
+    restaurant: RestaurantRead | None = None
+    dish: DishRead | None = None
+
+
+class ChangePage(BaseModel):
+    changes: list[CatalogueChangeRead]
+    next_since: int
+    has_more: bool
+
+
 class MenuRead(BaseModel):
     restaurant: RestaurantRead
     dishes: list[DishRead]
@@ -34,9 +119,11 @@ class RestaurantCreate(BaseModel):
     description: str | None
     address: Annotated[str, StringConstraints(min_length=1)]
     phone: Annotated[str, StringConstraints(min_length=1)]
+    latitude: Latitude | None = None
+    longitude: Longitude | None = None
 
 
 class DishCreate(BaseModel):
     name: Annotated[str, StringConstraints(min_length=1)]
     description: str | None
-    price: Annotated[Decimal, Field(max_digits=10, decimal_places=2)]
+    price: Price
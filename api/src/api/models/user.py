@@ -2,12 +2,16 @@ from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, StringConstraints
 
+from api.models.restaurant import Latitude, Longitude
+
 
 class UserCreate(BaseModel):
     name: Annotated[str, StringConstraints(min_length=3)]
     password: Annotated[str, StringConstraints(min_length=6)]
     phone: str
     address: str
+    latitude: Latitude | None = None
+    longitude: Longitude | None = None
 
 
 class UserRead(BaseModel):
@@ -15,6 +19,8 @@ class UserRead(BaseModel):
     name: str
     phone: str
     address: str
+    latitude: float | None = None
+    longitude: float | None = None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -24,3 +30,5 @@ class UserUpdate(BaseModel):
     password: Annotated[str | None, StringConstraints(min_length=6)] = None
     phone: str | None = None
     address: str | None = None
+    latitude: Latitude | None = None
+    longitude: Longitude | None = None
@@ -0,0 +1,111 @@
+import numpy as np
+from sqlalchemy import exists, func, select, update
+from sqlalchemy.orm import Session
+
+from api.db.schemes import Courier, Order, OrderDish, Restaurant, User
+from api.models.order import OrderStatus
+from api.repositories.order import OrderRepository
+from api.services.dispatch import AvailableCouriers, PendingDeliveries
+
+
+class CourierRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def pending_deliveries(self, limit: int) -> PendingDeliveries:
+        """
+        Lock orders in "delivering" without a courier, skipping rows another
+        dispatcher holds. Orders are picked up at their lowest-id restaurant.
+        """
+        pickup = (
+            select(
+                OrderDish.user_id,
+                func.min(OrderDish.restaurant_id).label("restaurant_id"),
+            )
+            .group_by(OrderDish.user_id)
+            .subquery()
+        )
+        rows = self.db.execute(
+            select(
+                Order.user_id,
+                Restaurant.restaurant_id,
+                Restaurant.latitude,
+                Restaurant.longitude,
+                User.latitude,
+                User.longitude,
+            )
+            .join(pickup, pickup.c.user_id == Order.user_id)
+            .join(Restaurant, Restaurant.restaurant_id == pickup.c.restaurant_id)
+            .join(User, User.user_id == Order.user_id)
+            .where(
+                Order.status == OrderStatus.DELIVERING,
+                Order.courier_id.is_(None),
+                Restaurant.latitude.is_not(None),
+                User.latitude.is_not(None),
+            )
+            .order_by(Order.created_at)
+            .limit(limit)
+            .with_for_update(of=Order, skip_locked=True)
+        ).all()
+
+        data = np.array(rows, dtype=float).reshape(-1, 6)
+        return PendingDeliveries(
+            user_ids=data[:, 0].astype(np.int64),
+            restaurant_ids=data[:, 1].astype(np.int64),
+            pickups=data[:, 2:4],
+            dropoffs=data[:, 4:6],
+        )
+
+    def available_couriers(self) -> AvailableCouriers:
+        rows = self.db.execute(
+            select(Courier.courier_id, Courier.latitude, Courier.longitude)
+            .where(Courier.available.is_(True), Courier.latitude.is_not(None))
+            .with_for_update(skip_locked=True)
+        ).all()
+
+        data = np.array(rows, dtype=float).reshape(-1, 3)
+        return AvailableCouriers(
+            courier_ids=data[:, 0].astype(np.int64),
+            positions=data[:, 1:3],
+        )
+
+    def assign(self, assignments: list[tuple[int, list[int]]]) -> None:
+        """Write every courier assignment of a round in one transaction."""
+        if assignments:
+            self.db.execute(
+                update(Order),
+                [
+                    {"user_id": user_id, "courier_id": courier_id}
+                    for courier_id, user_ids in assignments
+                    for user_id in user_ids
+                ],
+            )
+            self.db.execute(
+                update(Courier)
+                .where(Courier.courier_id.in_([c for c, _ in assignments]))
+                .values(available=False)
+            )
+        self.db.commit()
+
+    def complete_delivery(self, courier_id: int, user_id: int) -> None:
+        """
+        Hand one of the courier's orders over; the order reopens as an
+        empty cart. The courier becomes available again once none of its
+        batch is still out for delivery.
+        """
+        if not OrderRepository(self.db).finish_delivery(user_id, courier_id):
+            self.db.rollback()
+            msg = "Order is not out for delivery with this courier."
+            raise ValueError(msg)
+        self.db.execute(
+            update(Courier)
+            .where(
+                Courier.courier_id == courier_id,
+                ~exists().where(
+                    Order.courier_id == courier_id,
+                    Order.status == OrderStatus.DELIVERING,
+                ),
+            )
+            .values(available=True)
+        )
+        self.db.commit()
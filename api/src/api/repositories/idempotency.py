@@ -0,0 +1,98 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from api.db.schemes import IdempotencyKey
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # ``expires_at`` is a naive UTC column; aware values would be shifted
+    # by the session time zone on the way in.
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo else value
+
+
+class IdempotencyRepository:
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def claim(
+        self,
+        user_id: int,
+        key: str,
+        fingerprint: str,
+        expires_at: datetime,
+    ) -> IdempotencyKey | None:
+        """
+        Record ``key`` as in flight until ``expires_at`` and return None, or
+        return the live row another request already stored under it. Expired
+        rows are reused, including in-flight ones whose lease ran out.
+        """
+        now = _naive_utc(datetime.now(UTC))
+        expires_at = _naive_utc(expires_at)
+        claimed = self.db.execute(
+            insert(IdempotencyKey)
+            .values(
+                user_id=user_id,
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=expires_at,
+            )
+            .on_conflict_do_update(
+                index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+                set_={
+                    "fingerprint": fingerprint,
+                    "status_code": None,
+                    "body": None,
+                    "expires_at": expires_at,
+                },
+                where=IdempotencyKey.expires_at <= now,
+            )
+            .returning(IdempotencyKey.user_id)
+        ).first()
+        self.db.commit()
+        if claimed:
+            return None
+        return self.db.get(IdempotencyKey, {"user_id": user_id, "key": key})
+
+    def complete(
+        self,
+        user_id: int,
+        key: str,
+        status_code: int,
+        body: str,
+        expires_at: datetime,
+    ) -> None:
+        """Store the response, kept for replay until ``expires_at``."""
+        self.db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(
+                status_code=status_code,
+                body=body,
+                expires_at=_naive_utc(expires_at),
+            )
+        )
+        self.db.commit()
+
+    def release(self, user_id: int, key: str) -> None:
+        """Forget a key whose request failed so the client can retry it."""
+        self.db.rollback()
+        self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None),
+            )
+        )
+        self.db.commit()
+
+    def purge_expired(self) -> int:
+        result = self.db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.expires_at <= _naive_utc(datetime.now(UTC))
+            )
+        )
+        self.db.commit()
+        return result.rowcount
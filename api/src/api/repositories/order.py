@@ -1,9 +1,76 @@
-from datetime import UTC, datetime
+from collections.abc import Mapping, Sequence
+from datetime import UTC, datetime, timedelta
 
+from sqlalchemy import (
+    Row,
+    and_,
+    bindparam,
+    delete,
+    exists,
+    or_,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from api.db.schemes import Order, OrderDish, User
+from api.db.schemes import Dish, Order, OrderDish, User
+from api.models.order import ORDER_TRANSITIONS, OrderStatus
+
+ORDER_STATUS_CHANNEL = "order_status"
+
+_NOTIFY_ORDER_STATUS = text(
+    "SELECT pg_notify(:channel, n.payload) "
+    "FROM unnest(CAST(:payloads AS text[])) AS n(payload)"
+)
+
+# Hot lookups are built once at import time so each call only binds
+# parameters and hits SQLAlchemy's compiled-statement cache.
+_CURRENT_ORDER = select(Order).where(Order.user_id == bindparam("user_id"))
+_CART_LINE = select(OrderDish).where(
+    OrderDish.user_id == bindparam("user_id"),
+    OrderDish.restaurant_id == bindparam("restaurant_id"),
+    OrderDish.dish_id == bindparam("dish_id"),
+)
+# Locks the order row so a concurrent checkout cannot slip in between the
+# status check and the cart write.
+_ORDER_STATUS = (
+    select(Order.status).where(Order.user_id == bindparam("user_id")).with_for_update()
+)
+_ORDER_ROW = select(
+    Order.user_id,
+    Order.status,
+    Order.payment_method,
+    Order.created_at,
+).where(Order.user_id == bindparam("user_id"))
+_CART_ROWS = (
+    select(
+        OrderDish.restaurant_id,
+        OrderDish.dish_id,
+        OrderDish.quantity,
+        Dish.name,
+        Dish.description,
+        Dish.price_cents,
+    )
+    .join(
+        Dish,
+        (Dish.restaurant_id == OrderDish.restaurant_id)
+        & (Dish.dish_id == OrderDish.dish_id),
+    )
+    .where(OrderDish.user_id == bindparam("user_id"))
+    .order_by(OrderDish.restaurant_id, OrderDish.dish_id)
+)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class OrderNotPendingError(Exception):
+    """The cart is read-only once the order has been checked out."""
 
 
 class OrderRepository:
@@ -12,12 +79,12 @@ class OrderRepository:
 
     def get_current_order(self, user_id: int) -> Order | None:
         """Fetch the single current order for a user, or None."""
-        return self.db.query(Order).filter(Order.user_id == user_id).first()
+        return self.db.scalars(_CURRENT_ORDER, {"user_id": user_id}).first()
 
     def create_order(
         self,
         user: User,
-        status: str = "pending",
+        status: str = OrderStatus.PENDING,
         payment_method: str = "not_selected",
     ) -> Order:
         """Create a new order if none exists for the user."""
@@ -41,6 +108,27 @@ class OrderRepository:
         self.db.refresh(order)
         return order
 
+    def _lock_pending_order(self, user_id: int) -> None:
+        status = self.db.scalar(_ORDER_STATUS, {"user_id": user_id})
+        if status is None:
+            msg = "Order does not exist."
+            raise ValueError(msg)
+        if status != OrderStatus.PENDING:
+            msg = f"Order is {status}; the cart can no longer be changed."
+            raise OrderNotPendingError(msg)
+
+    def get_item(
+        self,
+        user_id: int,
+        restaurant_id: int,
+        dish_id: int,
+    ) -> OrderDish | None:
+        """Fetch one line of the user's cart, or None."""
+        return self.db.scalars(
+            _CART_LINE,
+            {"user_id": user_id, "restaurant_id": restaurant_id, "dish_id": dish_id},
+        ).first()
+
     def add_item(
         self,
         user_id: int,
@@ -51,17 +139,11 @@ class OrderRepository:
         """
         Add a dish to the user's current order.
         If the dish is already present, increment its quantity.
+        Raises OrderNotPendingError once the order is checked out.
         """
-        order = self.get_current_order(user_id)
-        if not order:
-            msg = "Order does not exist."
-            raise ValueError(msg)
+        self._lock_pending_order(user_id)
 
-        item = (
-            self.db.query(OrderDish)
-            .filter_by(user_id=user_id, restaurant_id=restaurant_id, dish_id=dish_id)
-            .first()
-        )
+        item = self.get_item(user_id, restaurant_id, dish_id)
         if item:
             item.quantity += quantity
         else:
@@ -84,23 +166,179 @@ class OrderRepository:
         dish_id: int,
     ) -> None:
         """Remove a dish from the user's order completely."""
-        item = (
-            self.db.query(OrderDish)
-            .filter_by(user_id=user_id, restaurant_id=restaurant_id, dish_id=dish_id)
-            .first()
-        )
+        self._lock_pending_order(user_id)
+        item = self.get_item(user_id, restaurant_id, dish_id)
         if not item:
             msg = "Item not found in order."
             raise ValueError(msg)
         self.db.delete(item)
         self.db.commit()
 
-    def view_order(self, user_id: int) -> Order:
+    def apply_batch(
+        self,
+        user_id: int,
+        add: list[tuple[int, int, int]],
+        remove: list[tuple[int, int]],
+    ) -> None:
+        """
+        Add ``(restaurant_id, dish_id, quantity)`` lines and remove
+        ``(restaurant_id, dish_id)`` lines of the current order in one
+        transaction. Removals apply after additions.
+        """
+        self._lock_pending_order(user_id)
+
+        quantities: dict[tuple[int, int], int] = {}
+        for restaurant_id, dish_id, quantity in add:
+            key = (restaurant_id, dish_id)
+            quantities[key] = quantities.get(key, 0) + quantity
+        try:
+            if quantities:
+                stmt = insert(OrderDish).values(
+                    [
+                        {
+                            "user_id": user_id,
+                            "restaurant_id": restaurant_id,
+                            "dish_id": dish_id,
+                            "quantity": quantity,
+                        }
+                        for (restaurant_id, dish_id), quantity in quantities.items()
+                    ]
+                )
+                self.db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=["user_id", "restaurant_id", "dish_id"],
+                        set_={"quantity": OrderDish.quantity + stmt.excluded.quantity},
+                    )
+                )
+            if remove:
+                self.db.execute(
+                    delete(OrderDish).where(
+                        OrderDish.user_id == user_id,
+                        tuple_(OrderDish.restaurant_id, OrderDish.dish_id).in_(remove),
+                    )
+                )
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            msg = "Dish not found."
+            raise LookupError(msg) from e
+
+    def view_order(self, user_id: int) -> tuple[Row, Sequence[Row]]:
         """
-        Return the order along with its items and related dish info.
+        Return the order and its items joined with dish info, as read-only
+        rows: two queries and no ORM objects however large the cart is.
         """
-        order = self.get_current_order(user_id)
+        order = self.db.execute(_ORDER_ROW, {"user_id": user_id}).first()
         if not order:
             msg = "Order does not exist."
             raise ValueError(msg)
+        return order, self.db.execute(_CART_ROWS, {"user_id": user_id}).all()
+
+    def checkout(self, user_id: int, payment_method: str) -> Order:
+        """Move a non-empty pending cart to the queue for the order worker."""
+        order = self.db.scalars(
+            update(Order)
+            .where(
+                Order.user_id == user_id,
+                Order.status == OrderStatus.PENDING,
+                exists().where(OrderDish.user_id == user_id),
+            )
+            .values(
+                status=OrderStatus.QUEUED,
+                payment_method=payment_method,
+                created_at=datetime.now(UTC),
+                status_changed_at=_utcnow(),
+            )
+            .returning(Order)
+        ).first()
+        if not order:
+            msg = "Cart is empty or already checked out."
+            raise ValueError(msg)
+        self.notify_status([(order.user_id, order.status)])
+        self.db.commit()
         return order
+
+    def advance_orders(
+        self,
+        batch_size: int,
+        min_seconds: Mapping[str, float] | None = None,
+    ) -> list[tuple[int, str]]:
+        """
+        Claim up to ``batch_size`` orders other workers have not locked and
+        that have spent ``min_seconds[status]`` in their status, apply one
+        status transition to each and commit them together.
+        """
+        now = _utcnow()
+        min_seconds = min_seconds or {}
+        due = or_(
+            *(
+                and_(
+                    Order.status == status,
+                    Order.status_changed_at
+                    <= now - timedelta(seconds=min_seconds.get(status, 0)),
+                )
+                for status in ORDER_TRANSITIONS
+            )
+        )
+        claimed = self.db.execute(
+            select(Order.user_id, Order.status)
+            .where(due)
+            .order_by(Order.created_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not claimed:
+            self.db.rollback()
+            return []
+
+        advanced = [
+            (user_id, ORDER_TRANSITIONS[OrderStatus(status)])
+            for user_id, status in claimed
+        ]
+        self.db.execute(
+            update(Order),
+            [
+                {"user_id": user_id, "status": status, "status_changed_at": now}
+                for user_id, status in advanced
+            ],
+        )
+        self.notify_status(advanced)
+        self.db.commit()
+        return advanced
+
+    def finish_delivery(self, user_id: int, courier_id: int) -> bool:
+        """
+        Close a delivered order: the row goes back to an empty pending cart
+        so the user can order again. Returns False unless the order was out
+        for delivery with ``courier_id``. The caller commits.
+        """
+        reopened = self.db.scalars(
+            update(Order)
+            .where(
+                Order.user_id == user_id,
+                Order.courier_id == courier_id,
+                Order.status == OrderStatus.DELIVERING,
+            )
+            .values(
+                status=OrderStatus.PENDING,
+                payment_method="not_selected",
+                courier_id=None,
+                status_changed_at=_utcnow(),
+            )
+            .returning(Order.user_id)
+        ).first()
+        if reopened is None:
+            return False
+        self.db.execute(delete(OrderDish).where(OrderDish.user_id == user_id))
+        self.notify_status([(user_id, OrderStatus.DELIVERED)])
+        return True
+
+    def notify_status(self, changes: list[tuple[int, str]]) -> None:
+        """Queue one NOTIFY per ``(user_id, status)``; Postgres sends them on commit."""
+        self.db.execute(
+            _NOTIFY_ORDER_STATUS,
+            {
+                "channel": ORDER_STATUS_CHANNEL,
+                "payloads": [f"{user_id}:{status}" for user_id, status in changes],
+            },
+        )
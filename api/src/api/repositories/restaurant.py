@@ -1,34 +1,230 @@
-from decimal import Decimal
+from collections.abc import Sequence
+from functools import cache
+from typing import TYPE_CHECKING
 
-from sqlalchemy import func
+from sqlalchemy import (
+    Row,
+    Select,
+    bindparam,
+    delete,
+    func,
+    or_,
+    select,
+    true,
+    tuple_,
+)
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.orm import Session
 
-from api.db.schemes import Dish, Restaurant
+from api.db.schemes import CatalogueChange, Dish, Restaurant
+from api.services.geo import EARTH_RADIUS_KM, covering_cells, encode_geohash
+from api.services.single_flight import SingleFlight, load_coalesced
+
+if TYPE_CHECKING:
+    from api.services.catalogue import CatalogueFiles
+
+# Concurrent identical reads (e.g. a popular menu right after a deploy)
+# share one query instead of stampeding Postgres.
+_reads = SingleFlight("restaurant_reads")
+
+# List reads select plain columns: rows skip the identity map and
+# attribute instrumentation, and response models read them as attributes.
+# The column maps are keyed by read-model field name, so a sparse
+# ``?fields=`` projection selects only what it will serialize.
+_RESTAURANT_COLUMNS = {
+    "restaurant_id": Restaurant.restaurant_id,
+    "name": Restaurant.name,
+    "description": Restaurant.description,
+    "address": Restaurant.address,
+    "phone": Restaurant.phone,
+    "latitude": Restaurant.latitude,
+    "longitude": Restaurant.longitude,
+}
+_DISH_COLUMNS = {
+    "dish_id": Dish.dish_id,
+    "restaurant_id": Dish.restaurant_id,
+    "name": Dish.name,
+    "description": Dish.description,
+    "price": Dish.price_cents,
+}
+
+
+@cache
+def _restaurant_rows(fields: tuple[str, ...]) -> Select:
+    return select(*(_RESTAURANT_COLUMNS[f] for f in fields)).order_by(
+        Restaurant.restaurant_id
+    )
+
+
+@cache
+def _menu_rows(fields: tuple[str, ...]) -> Select:
+    return (
+        select(*(_DISH_COLUMNS[f] for f in fields))
+        .where(Dish.restaurant_id == bindparam("restaurant_id"))
+        .order_by(Dish.dish_id)
+    )
+
+
+@cache
+def _dish_row(fields: tuple[str, ...]) -> Select:
+    return select(*(_DISH_COLUMNS[f] for f in fields)).where(
+        Dish.restaurant_id == bindparam("restaurant_id"),
+        Dish.dish_id == bindparam("dish_id"),
+    )
+
+
+_RESTAURANT_ROWS = _restaurant_rows(tuple(_RESTAURANT_COLUMNS))
+_MENU_ROWS = _menu_rows(tuple(_DISH_COLUMNS))
+# An expanding bind keeps one cached statement for every batch size.
+_DISH_BATCH = (
+    select(*_DISH_COLUMNS.values())
+    .where(
+        tuple_(Dish.restaurant_id, Dish.dish_id).in_(bindparam("keys", expanding=True))
+    )
+    .order_by(Dish.restaurant_id, Dish.dish_id)
+)
+
+# Home feed: a keyset page of restaurants, each laterally joined to its
+# first dishes in menu order, so the page is one index-driven query.
+_FEED_PAGE = (
+    select(*_RESTAURANT_COLUMNS.values())
+    .where(Restaurant.restaurant_id > bindparam("after"))
+    .order_by(Restaurant.restaurant_id)
+    .limit(bindparam("limit"))
+    .subquery("page")
+)
+_FEED_DISHES = (
+    select(
+        Dish.dish_id,
+        Dish.name.label("dish_name"),
+        Dish.description.label("dish_description"),
+        Dish.price_cents,
+    )
+    .where(Dish.restaurant_id == _FEED_PAGE.c.restaurant_id)
+    .order_by(Dish.dish_id)
+    .limit(bindparam("dishes"))
+    .lateral("top_dishes")
+)
+_FEED_ROWS = (
+    select(*_FEED_PAGE.c, *_FEED_DISHES.c)
+    .select_from(_FEED_PAGE.outerjoin(_FEED_DISHES, true()))
+    .order_by(_FEED_PAGE.c.restaurant_id, _FEED_DISHES.c.dish_id)
+)
+
+_RESTAURANTS_BY_ID = _RESTAURANT_ROWS.where(
+    Restaurant.restaurant_id.in_(bindparam("ids", expanding=True))
+)
+_CHANGES = (
+    select(
+        CatalogueChange.change_id,
+        CatalogueChange.restaurant_id,
+        CatalogueChange.dish_id,
+        CatalogueChange.operation,
+        CatalogueChange.changed_at,
+    )
+    .where(CatalogueChange.change_id > bindparam("since"))
+    .order_by(CatalogueChange.change_id)
+    .limit(bindparam("limit"))
+)
+# Appends to the change log are serialized with a transaction-level
+# advisory lock, so change_id order is commit order and a reader that has
+# seen change N can never miss a later commit with a smaller id.
+_CHANGE_LOG_LOCK = 0x6361_7461
 
 
 class RestaurantRepository:
-    def __init__(self, db: Session) -> None:
+    def __init__(self, db: Session, catalogue: "CatalogueFiles | None" = None) -> None:
         self.db = db
+        self.catalogue = catalogue
 
-    def list_restaurants(self) -> list[Restaurant]:
-        """Return all restaurants."""
-        return self.db.query(Restaurant).all()
+    def list_restaurants(self, fields: tuple[str, ...] | None = None) -> Sequence[Row]:
+        """Return all restaurants as read-only rows, optionally only ``fields``."""
+        stmt = _restaurant_rows(fields) if fields else _RESTAURANT_ROWS
+        return load_coalesced(
+            _reads,
+            ("list_restaurants", fields),
+            lambda: self.db.execute(stmt).all(),
+        )
+
+    def home_feed(self, after: int, limit: int, dishes: int) -> Sequence[Row]:
+        """
+        Restaurants with ``restaurant_id > after``, at most ``limit`` of them,
+        one row per (restaurant, dish) for their first ``dishes`` dishes.
+        A restaurant without dishes yields one row with null dish columns.
+        """
+        return load_coalesced(
+            _reads,
+            ("home_feed", after, limit, dishes),
+            lambda: self.db.execute(
+                _FEED_ROWS, {"after": after, "limit": limit, "dishes": dishes}
+            ).all(),
+        )
 
     def get_restaurant(self, restaurant_id: int) -> Restaurant | None:
         """Fetch a single restaurant by its ID."""
-        return (
-            self.db.query(Restaurant)
-            .filter(Restaurant.restaurant_id == restaurant_id)
-            .first()
+        return self.db.get(Restaurant, restaurant_id)
+
+    def nearest_restaurants(
+        self,
+        latitude: float,
+        longitude: float,
+        radius_km: float,
+        *,
+        limit: int,
+        offset: int = 0,
+    ) -> Sequence[Row]:
+        """
+        Return restaurant rows with ``distance_km`` within ``radius_km``,
+        ordered by distance.
+        Candidates come from a geohash prefix scan over ``ix_restaurant_geohash``.
+        """
+        lat = func.radians(Restaurant.latitude)
+        d_lat = func.radians(Restaurant.latitude - latitude)
+        d_lon = func.radians(Restaurant.longitude - longitude)
+        distance = (
+            2
+            * EARTH_RADIUS_KM
+            * func.asin(
+                func.sqrt(
+                    # Rounding can push antipodal points just past 1.
+                    func.least(
+                        1,
+                        func.power(func.sin(d_lat / 2), 2)
+                        + func.cos(lat)
+                        * func.cos(func.radians(latitude))
+                        * func.power(func.sin(d_lon / 2), 2),
+                    )
+                )
+            )
+        ).label("distance_km")
+
+        stmt = select(*_RESTAURANT_COLUMNS.values(), distance).where(
+            Restaurant.geohash.is_not(None)
+        )
+        cells = covering_cells(latitude, longitude, radius_km)
+        if cells:
+            stmt = stmt.where(or_(*(Restaurant.geohash.like(f"{c}%") for c in cells)))
+        stmt = (
+            stmt.where(distance <= radius_km)
+            .order_by(distance, Restaurant.restaurant_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return load_coalesced(
+            _reads,
+            ("nearest_restaurants", latitude, longitude, radius_km, limit, offset),
+            lambda: self.db.execute(stmt).all(),
         )
 
-    def create_restaurant(
+    def create_restaurant(  # noqa: PLR0913
         self,
         name: str,
         description: str,
         address: str,
         phone: str,
+        *,
+        latitude: float | None = None,
+        longitude: float | None = None,
     ) -> Restaurant:
         """Create a new restaurant."""
         restaurant = Restaurant(
@@ -36,24 +232,52 @@ class RestaurantRepository:
             description=description,
             address=address,
             phone=phone,
+            latitude=latitude,
+            longitude=longitude,
+            geohash=(
+                encode_geohash(latitude, longitude)
+                if latitude is not None and longitude is not None
+                else None
+            ),
         )
         self.db.add(restaurant)
+        self.db.flush()
+        self._log_change(restaurant.restaurant_id, None, "upsert")
         self.db.commit()
         self.db.refresh(restaurant)
+        if self.catalogue:
+            self.catalogue.refresh(self, restaurant.restaurant_id, index=True)
         return restaurant
 
     def delete_restaurant(self, restaurant_id: int) -> None:
-        """Delete a restaurant (and cascade-delete its dishes)."""
-        restaurant = self.get_restaurant(restaurant_id)
-        if not restaurant:
+        """
+        Delete a restaurant with one statement; its dishes and cart lines go
+        through the ON DELETE CASCADE foreign keys.
+        """
+        result = self.db.execute(
+            delete(Restaurant).where(Restaurant.restaurant_id == restaurant_id)
+        )
+        if not result.rowcount:
+            self.db.rollback()
             msg = f"Restaurant {restaurant_id} not found"
             raise NoResultFound(msg)
-        self.db.delete(restaurant)
+        self._log_change(restaurant_id, None, "delete")
         self.db.commit()
+        if self.catalogue:
+            self.catalogue.refresh(self, restaurant_id, index=True)
 
-    def list_menu(self, restaurant_id: int) -> list[Dish]:
-        """Return all dishes for a restaurant."""
-        return self.db.query(Dish).filter(Dish.restaurant_id == restaurant_id).all()
+    def list_menu(
+        self,
+        restaurant_id: int,
+        fields: tuple[str, ...] | None = None,
+    ) -> Sequence[Row]:
+        """Return the menu dishes as read-only rows, optionally just ``fields``."""
+        stmt = _menu_rows(fields) if fields else _MENU_ROWS
+        return load_coalesced(
+            _reads,
+            ("list_menu", restaurant_id, fields),
+            lambda: self.db.execute(stmt, {"restaurant_id": restaurant_id}).all(),
+        )
 
     def get_dish(
         self,
@@ -61,13 +285,37 @@ class RestaurantRepository:
         dish_id: int,
     ) -> Dish | None:
         """Fetch a single Dish by its composite key."""
-        return (
-            self.db.query(Dish)
-            .filter(
-                Dish.restaurant_id == restaurant_id,
-                Dish.dish_id == dish_id,
-            )
-            .first()
+        return self.db.get(Dish, {"dish_id": dish_id, "restaurant_id": restaurant_id})
+
+    def get_dish_row(
+        self,
+        restaurant_id: int,
+        dish_id: int,
+        fields: tuple[str, ...],
+    ) -> Row | None:
+        """Fetch only ``fields`` of a single Dish as a read-only row."""
+        return load_coalesced(
+            _reads,
+            ("get_dish_row", restaurant_id, dish_id, fields),
+            lambda: self.db.execute(
+                _dish_row(fields),
+                {"restaurant_id": restaurant_id, "dish_id": dish_id},
+            ).first(),
+        )
+
+    def get_dishes(self, keys: Sequence[tuple[int, int]]) -> Sequence[Row]:
+        """
+        Fetch many dishes by ``(restaurant_id, dish_id)`` in one
+        ``WHERE (restaurant_id, dish_id) IN (...)`` query. Rows come back in
+        primary-key order and unknown keys are simply absent.
+        """
+        keys = tuple(dict.fromkeys(keys))
+        if not keys:
+            return []
+        return load_coalesced(
+            _reads,
+            ("get_dishes", keys),
+            lambda: self.db.execute(_DISH_BATCH, {"keys": list(keys)}).all(),
         )
 
     def create_dish(
@@ -75,7 +323,7 @@ class RestaurantRepository:
         restaurant_id: int,
         name: str,
         description: str,
-        price: Decimal,
+        price_cents: int,
     ) -> Dish:
         """Create a new Dish in a given restaurant."""
         if not self.get_restaurant(restaurant_id):
@@ -95,20 +343,69 @@ class RestaurantRepository:
             restaurant_id=restaurant_id,
             name=name,
             description=description,
-            price=price,
+            price_cents=price_cents,
         )
 
         self.db.add(dish)
+        self._log_change(restaurant_id, new_id, "upsert")
         self.db.commit()
         self.db.refresh(dish)
+        if self.catalogue:
+            self.catalogue.refresh(self, restaurant_id)
 
         return dish
 
     def delete_dish(self, restaurant_id: int, dish_id: int) -> None:
-        """Delete a Dish by its composite key."""
-        dish = self.get_dish(restaurant_id, dish_id)
-        if not dish:
+        """Delete a Dish by its composite key; cart lines cascade in the DB."""
+        result = self.db.execute(
+            delete(Dish).where(
+                Dish.restaurant_id == restaurant_id,
+                Dish.dish_id == dish_id,
+            )
+        )
+        if not result.rowcount:
+            self.db.rollback()
             msg = f"Dish {dish_id} in restaurant {restaurant_id} not found"
             raise NoResultFound(msg)
-        self.db.delete(dish)
+        self._log_change(restaurant_id, dish_id, "delete")
         self.db.commit()
+        if self.catalogue:
+            self.catalogue.refresh(self, restaurant_id)
+
+    def list_changes(self, since: int, limit: int) -> Sequence[Row]:
+        """Up to ``limit`` change-log rows with ``change_id > since``, oldest first."""
+        return load_coalesced(
+            _reads,
+            ("list_changes", since, limit),
+            lambda: self.db.execute(_CHANGES, {"since": since, "limit": limit}).all(),
+        )
+
+    def latest_change(self) -> int:
+        """The newest ``change_id``, 0 while the log is empty."""
+        return self.db.scalar(
+            select(func.coalesce(func.max(CatalogueChange.change_id), 0))
+        )
+
+    def get_restaurants(self, restaurant_ids: Sequence[int]) -> Sequence[Row]:
+        """Fetch many restaurants as read-only rows; unknown IDs are absent."""
+        ids = list(dict.fromkeys(restaurant_ids))
+        if not ids:
+            return []
+        return self.db.execute(_RESTAURANTS_BY_ID, {"ids": ids}).all()
+
+    def _log_change(
+        self,
+        restaurant_id: int,
+        dish_id: int | None,
+        operation: str,
+    ) -> None:
+        """Append to the change log inside the caller's transaction."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(select(func.pg_advisory_xact_lock(_CHANGE_LOG_LOCK)))
+        self.db.add(
+            CatalogueChange(
+                restaurant_id=restaurant_id,
+                dish_id=dish_id,
+                operation=operation,
+            )
+        )
@@ -1,8 +1,28 @@
+import time
+from collections.abc import Sequence
 from datetime import UTC, datetime
 
+from sqlalchemy import Row, bindparam, delete, func, select
 from sqlalchemy.orm import Session
 
-from api.db.schemes import RefreshToken
+from api.db.schemes import RefreshToken, RevokedToken
+
+_REFRESH_TOKEN_EXPIRY = select(RefreshToken.expires_at).where(
+    RefreshToken.user_id == bindparam("user_id"),
+    RefreshToken.token == bindparam("token"),
+)
+
+_REVOCATIONS = (
+    select(RevokedToken.revocation_id, RevokedToken.jti, RevokedToken.expires_at)
+    .where(
+        RevokedToken.revocation_id > bindparam("after"),
+        RevokedToken.expires_at > bindparam("now"),
+    )
+    .order_by(RevokedToken.revocation_id)
+)
+# Serializes revocations so revocation_id order is commit order; pollers
+# reading past their last seen ID then never skip a late commit.
+_REVOCATION_LOCK = 0x6A74_6921
 
 
 class TokenRepository:
@@ -15,9 +35,27 @@ class TokenRepository:
         self.db.commit()
 
     def is_refresh_token_valid(self, user_id: int, token: str) -> bool:
-        rt = self.db.query(RefreshToken).filter_by(user_id=user_id, token=token).first()
-        return bool(rt and rt.expires_at > datetime.now(UTC))
+        expires_at = self.db.scalar(
+            _REFRESH_TOKEN_EXPIRY, {"user_id": user_id, "token": token}
+        )
+        return bool(expires_at and expires_at > datetime.now(UTC))
 
     def revoke_refresh_token(self, user_id: int, token: str) -> None:
         (self.db.query(RefreshToken).filter_by(user_id=user_id, token=token).delete())
         self.db.commit()
+
+    def revoke_access_token(self, jti: str, expires_at: int) -> None:
+        """Deny an access token until its ``exp``; rows already expired are purged."""
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(select(func.pg_advisory_xact_lock(_REVOCATION_LOCK)))
+        self.db.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= int(time.time()))
+        )
+        self.db.add(RevokedToken(jti=jti, expires_at=expires_at))
+        self.db.commit()
+
+    def revocations_since(self, revocation_id: int) -> Sequence[Row]:
+        """Unexpired revocations with a larger ``revocation_id``, oldest first."""
+        return self.db.execute(
+            _REVOCATIONS, {"after": revocation_id, "now": int(time.time())}
+        ).all()
@@ -1,9 +1,30 @@
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from functools import cache
+from typing import TYPE_CHECKING
+
+from sqlalchemy import bindparam, delete, select
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from api.db.schemes import User
+from api.services.passwords import build_pwd_context
+from api.services.single_flight import SingleFlight, load_coalesced
+from api.settings import get_settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+_USER_BY_NAME = select(User).where(User.name == bindparam("name"))
+_USER_ROW = select(User.__table__).where(User.user_id == bindparam("user_id"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Every authenticated request looks its user up; bursts from one client
+# (or one shared service account) collapse into a single query. The shared
+# value is a Core row; each caller builds its own entity from it.
+_user_lookups = SingleFlight("user_lookups")
+
+
+@cache
+def get_pwd_context() -> "CryptContext":
+    """Build the password context on first use, keeping passlib off the import path."""
+    return build_pwd_context(get_settings())
 
 
 class UserRepository:
@@ -11,24 +32,49 @@ class UserRepository:
         self.db = db
 
     def get_by_username(self, username: str) -> User | None:
-        return self.db.query(User).filter(User.name == username).first()
+        return self.db.scalars(_USER_BY_NAME, {"name": username}).first()
 
     def get_by_id(self, user_id: int) -> User | None:
-        return self.db.query(User).get(user_id)
+        row = load_coalesced(
+            _user_lookups,
+            user_id,
+            lambda: self.db.execute(_USER_ROW, {"user_id": user_id}).mappings().first(),
+        )
+        if row is None:
+            return None
+        user = User(**row)
+        make_transient_to_detached(user)
+        return self.db.merge(user, load=False)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+        return get_pwd_context().verify(plain_password, hashed_password)
+
+    def rehash_password_if_needed(self, user: User, plain_password: str) -> None:
+        """Re-hash a just-verified password stored with an outdated scheme or cost."""
+        if get_pwd_context().needs_update(user.password):
+            user.password = get_pwd_context().hash(plain_password)
+            self.db.commit()
 
-    def create_user(
+    def create_user(  # noqa: PLR0913
         self,
         username: str,
         password: str,
         phone: str,
         address: str,
+        *,
+        latitude: float | None = None,
+        longitude: float | None = None,
     ) -> User:
-        hashed = pwd_context.hash(password)
+        hashed = get_pwd_context().hash(password)
 
-        user = User(name=username, password=hashed, phone=phone, address=address)
+        user = User(
+            name=username,
+            password=hashed,
+            phone=phone,
+            address=address,
+            latitude=latitude,
+            longitude=longitude,
+        )
 
         self.db.add(user)
         self.db.commit()
@@ -36,7 +82,7 @@ class UserRepository:
 
         return user
 
-    def update_user(self, user: User, **fields: str | bytes) -> User:
+    def update_user(self, user: User, **fields: str | float | None) -> User:
         for attr, val in fields.items():
             if val is None:
                 continue
@@ -44,12 +90,13 @@ class UserRepository:
             setattr(
                 user,
                 attr,
-                pwd_context.hash(val) if attr == "password" else val,
+                get_pwd_context().hash(val) if attr == "password" else val,
             )
         self.db.commit()
         self.db.refresh(user)
         return user
 
     def delete_user(self, user: User) -> None:
-        self.db.delete(user)
+        """Delete the user row; order, cart and tokens cascade in the DB."""
+        self.db.execute(delete(User).where(User.user_id == user.user_id))
         self.db.commit()
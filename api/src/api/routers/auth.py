@@ -5,9 +5,11 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from api.db.database import get_db
+from api.dependencies import login_rate_limit, optional_oauth2_scheme
 from api.repositories.token import TokenRepository
 from api.repositories.user import UserRepository
-from api.services.auth import create_tokens, verify_token
+from api.services.auth import access_token_claims, create_tokens, verify_token
+from api.services.revocation import TokenDenylist, get_token_denylist
 from api.settings import Settings, get_settings
 from pydantic import BaseModel
 
@@ -18,7 +20,7 @@ class RefreshRequest(BaseModel):
     refresh_token: str
 
 
-@router.post("/login")
+@router.post("/login", dependencies=[Depends(login_rate_limit)])
 def login(
     form: Annotated[OAuth2PasswordRequestForm, Depends()],
     db: Annotated[Session, Depends(get_db)],
@@ -29,6 +31,7 @@ def login(
 
     if not user or not user_repo.verify_password(form.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    user_repo.rehash_password_if_needed(user, form.password)
 
     access_token, refresh_token, rt_expiry = create_tokens(user.user_id, settings)
     TokenRepository(db).add_refresh_token(user.user_id, refresh_token, rt_expiry)
@@ -74,6 +77,8 @@ def logout(
     payload: RefreshRequest,
     db: Annotated[Session, Depends(get_db)],
     settings: Annotated[Settings, Depends(get_settings)],
+    denylist: Annotated[TokenDenylist, Depends(get_token_denylist)],
+    access_token: Annotated[str | None, Depends(optional_oauth2_scheme)] = None,
 ) -> dict[str, Any]:
     try:
         token_payload = verify_token(payload.refresh_token, settings)
@@ -81,5 +86,12 @@ def logout(
     except Exception as e:
         raise HTTPException(status_code=401, detail="Invalid token") from e
 
-    TokenRepository(db).revoke_refresh_token(user_id, payload.refresh_token)
+    token_repo = TokenRepository(db)
+    token_repo.revoke_refresh_token(user_id, payload.refresh_token)
+
+    # The bearer token, if sent, is denied until it would have expired.
+    claims = access_token and access_token_claims(access_token, settings)
+    if claims and claims.get("jti") and claims["sub"] == str(user_id):
+        token_repo.revoke_access_token(claims["jti"], claims["exp"])
+        denylist.add(claims["jti"], claims["exp"])
     return {"detail": "Success logout"}
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Request
+
+from api.middleware.admission import admission_stats
+from api.services.single_flight import single_flight_stats
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get(
+    "/single-flight",
+    summary="Calls, loads and coalesced calls per single-flight group",
+)
+def get_single_flight_stats() -> dict[str, dict[str, int]]:
+    return single_flight_stats()
+
+
+@router.get(
+    "/admission",
+    summary="Limit, in-flight, admitted and shed requests per route class",
+)
+def get_admission_stats(request: Request) -> dict[str, dict[str, int]]:
+    return admission_stats(request.app.state)
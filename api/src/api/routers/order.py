@@ -1,26 +1,61 @@
+import json
+from collections.abc import AsyncIterator, Callable
 from typing import Annotated
 from datetime import UTC, datetime
+from functools import partial
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from anyio import to_thread
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
-from api.db.schemes import User
-from api.dependencies import get_current_user, get_order_repo, get_restaurant_repo
-from api.models.order import OrderItemCreate, OrderItemRead, OrderRead
-from api.repositories.order import OrderRepository
+from api.db.schemes import Order, User
+from api.dependencies import (
+    get_current_user,
+    get_idempotency,
+    get_order_repo,
+    get_restaurant_repo,
+)
+from api.models.order import (
+    CartBatch,
+    OrderCheckout,
+    OrderItemCreate,
+    OrderItemRead,
+    OrderRead,
+)
+from api.repositories.order import OrderNotPendingError, OrderRepository
 from api.repositories.restaurant import RestaurantRepository
+from api.services.idempotency import Idempotency
+from api.services.order_events import OrderEventHub, get_order_event_hub
+from api.settings import Settings, get_settings
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
+_order_items = TypeAdapter(list[OrderItemRead])
+
 
 @router.post(
     "/items",
     summary="Add a dish to the current order",
+    response_model=OrderItemRead,
 )
 def add_dish_to_order(
     payload: OrderItemCreate,
     current_user: Annotated[User, Depends(get_current_user)],
     order_repo: Annotated[OrderRepository, Depends(get_order_repo)],
     restaurant_repo: Annotated[RestaurantRepository, Depends(get_restaurant_repo)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
+) -> OrderItemRead | Response:
+    return idempotency.run(
+        lambda: _add_dish(payload, current_user, order_repo, restaurant_repo)
+    )
+
+
+def _add_dish(
+    payload: OrderItemCreate,
+    current_user: User,
+    order_repo: OrderRepository,
+    restaurant_repo: RestaurantRepository,
 ) -> OrderItemRead:
     dish = restaurant_repo.get_dish(payload.restaurant_id, payload.dish_id)
     if not dish:
@@ -37,6 +72,8 @@ def add_dish_to_order(
             dish_id=payload.dish_id,
             quantity=payload.quantity,
         )
+    except OrderNotPendingError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
@@ -46,7 +83,7 @@ def add_dish_to_order(
         quantity=item.quantity,
         name=dish.name,
         description=dish.description,
-        price=dish.price,
+        price=dish.price_cents,
     )
 
 
@@ -58,11 +95,123 @@ def view_current_order(
     current_user: Annotated[User, Depends(get_current_user)],
     order_repo: Annotated[OrderRepository, Depends(get_order_repo)],
 ) -> OrderRead:
+    return _order_view(order_repo, current_user.user_id)
+
+
+@router.post(
+    "/items/batch",
+    summary="Add and remove several dishes at once; returns the updated order",
+    response_model=OrderRead,
+)
+def update_order_items(
+    payload: CartBatch,
+    current_user: Annotated[User, Depends(get_current_user)],
+    order_repo: Annotated[OrderRepository, Depends(get_order_repo)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
+) -> OrderRead | Response:
+    def _update() -> OrderRead:
+        order_repo.create_order(current_user)
+        try:
+            order_repo.apply_batch(
+                current_user.user_id,
+                add=[(i.restaurant_id, i.dish_id, i.quantity) for i in payload.add],
+                remove=[(line.restaurant_id, line.dish_id) for line in payload.remove],
+            )
+        except OrderNotPendingError as e:
+            raise HTTPException(status_code=409, detail=str(e)) from e
+        except LookupError as e:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Dish not found",
+            ) from e
+        return _order_view(order_repo, current_user.user_id)
+
+    return idempotency.run(_update)
+
+
+@router.post(
+    "/checkout",
+    summary="Check out the current order",
+    response_model=OrderRead,
+)
+def checkout(
+    payload: OrderCheckout,
+    current_user: Annotated[User, Depends(get_current_user)],
+    order_repo: Annotated[OrderRepository, Depends(get_order_repo)],
+    idempotency: Annotated[Idempotency, Depends(get_idempotency)],
+) -> OrderRead | Response:
+    def _checkout() -> OrderRead:
+        try:
+            order = order_repo.checkout(current_user.user_id, payload.payment_method)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e)) from e
+        return _order_read(order)
+
+    return idempotency.run(_checkout)
+
+
+@router.get(
+    "/events",
+    summary="Stream status changes of the current order (Server-Sent Events)",
+    response_class=StreamingResponse,
+)
+def stream_order_events(
+    current_user: Annotated[User, Depends(get_current_user)],
+    order_repo: Annotated[OrderRepository, Depends(get_order_repo)],
+    hub: Annotated[OrderEventHub, Depends(get_order_event_hub)],
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> StreamingResponse:
+    return StreamingResponse(
+        _order_events(
+            hub,
+            current_user.user_id,
+            partial(_read_status, order_repo, current_user.user_id),
+            settings.order_events_heartbeat_seconds,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete(
+    "/items/{restaurant_id}/{dish_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Remove a dish from the current order",
+)
+def remove_dish_from_order(
+    restaurant_id: int,
+    dish_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    order_repo: Annotated[OrderRepository, Depends(get_order_repo)],
+) -> None:
+    try:
+        order_repo.remove_item(
+            user_id=current_user.user_id,
+            restaurant_id=restaurant_id,
+            dish_id=dish_id,
+        )
+    except OrderNotPendingError as e:
+        raise HTTPException(status_code=409, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail="Item not found in order") from e
+
+
+def _order_view(order_repo: OrderRepository, user_id: int) -> OrderRead:
     try:
-        order = order_repo.view_order(current_user.user_id)
+        order, items = order_repo.view_order(user_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail="Order not found") from e
 
+    return OrderRead(
+        user_id=order.user_id,
+        status=order.status,
+        payment_method=order.payment_method,
+        created_at=order.created_at,
+        items=_order_items.validate_python(items, from_attributes=True),
+    )
+
+
+def _order_read(order: Order) -> OrderRead:
     items = []
     for it in order.items:
         dish = it.dish
@@ -73,7 +222,7 @@ def view_current_order(
                 quantity=it.quantity,
                 name=dish.name,
                 description=dish.description,
-                price=dish.price,
+                price=dish.price_cents,
             )
         )
 
@@ -90,22 +239,29 @@ def view_current_order(
     )
 
 
-@router.delete(
-    "/items/{restaurant_id}/{dish_id}",
-    status_code=status.HTTP_204_NO_CONTENT,
-    summary="Remove a dish from the current order",
-)
-def remove_dish_from_order(
-    restaurant_id: int,
-    dish_id: int,
-    current_user: Annotated[User, Depends(get_current_user)],
-    order_repo: Annotated[OrderRepository, Depends(get_order_repo)],
-) -> None:
+def _sse(status: str | None) -> str:
+    return f"event: status\ndata: {json.dumps({'status': status})}\n\n"
+
+
+def _read_status(order_repo: OrderRepository, user_id: int) -> str | None:
     try:
-        order_repo.remove_item(
-            user_id=current_user.user_id,
-            restaurant_id=restaurant_id,
-            dish_id=dish_id,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail="Item not found in order") from e
+        order = order_repo.get_current_order(user_id)
+        return order.status if order else None
+    finally:
+        # The stream outlives the request; hand the connection back now.
+        order_repo.db.close()
+
+
+async def _order_events(
+    hub: OrderEventHub,
+    user_id: int,
+    read_status: Callable[[], str | None],
+    heartbeat_seconds: float,
+) -> AsyncIterator[str]:
+    # Subscribe before reading, so a change committed in between is queued
+    # on the subscription instead of lost.
+    with hub.subscribe(user_id) as subscription:
+        yield _sse(await to_thread.run_sync(read_status))
+        while True:
+            next_status = await subscription.next(heartbeat_seconds)
+            yield ": heartbeat\n\n" if next_status is None else _sse(next_status)
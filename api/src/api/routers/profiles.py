@@ -0,0 +1,39 @@
+import json
+from pathlib import Path
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from api.dependencies import get_profile_dir
+from api.middleware.profiling import PROFILE_SUFFIX, list_profiles
+
+router = APIRouter(prefix="/profiles", tags=["profiles"])
+
+
+@router.get("/", summary="Stored request profiles, newest first")
+def get_profiles(
+    directory: Annotated[Path, Depends(get_profile_dir)],
+) -> list[dict[str, Any]]:
+    profiles = []
+    for path in list_profiles(directory) if directory.is_dir() else []:
+        try:
+            metadata = json.loads(path.read_text())["metadata"]
+        except (OSError, ValueError, KeyError):
+            continue
+        profiles.append({"name": path.name.removesuffix(PROFILE_SUFFIX), **metadata})
+    return profiles
+
+
+@router.get(
+    "/{name}",
+    summary="Profile in speedscope format, open it at https://www.speedscope.app",
+)
+def get_profile(
+    name: str,
+    directory: Annotated[Path, Depends(get_profile_dir)],
+) -> FileResponse:
+    path = directory / f"{name}{PROFILE_SUFFIX}"
+    if "/" in name or name.startswith(".") or not path.is_file():
+        raise HTTPException(status.HTTP_404_NOT_FOUND, "Profile not found")
+    return FileResponse(path, media_type="application/json")
@@ -1,29 +1,146 @@
-from typing import Annotated
+import hashlib
+from typing import Annotated, TypeGuard
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import FileResponse
+from pydantic import TypeAdapter
 from sqlalchemy.exc import NoResultFound
 
 from api.dependencies import get_restaurant_repo
 from api.models.restaurant import (
+    ChangePage,
+    ChangesQuery,
+    DishBatch,
     DishCreate,
+    DishLookup,
     DishRead,
+    FeedPage,
+    FeedQuery,
     MenuRead,
+    NearbyQuery,
     RestaurantCreate,
+    RestaurantNearbyRead,
     RestaurantRead,
 )
 from api.repositories.restaurant import RestaurantRepository
+from api.services.catalogue import (
+    CatalogueFiles,
+    build_changes,
+    build_feed,
+    build_menu,
+    get_catalogue,
+    lookup_dishes,
+    restaurant_list,
+)
+from api.services.fieldsets import (
+    dish_fields,
+    encode_menu_projection,
+    encode_projection,
+    restaurant_fields,
+)
+from api.services.serialization import encode_response, negotiated_serializer
+from api.settings import Settings, get_settings
 
 router = APIRouter(prefix="/restaurants", tags=["restaurants"])
 
+_feed_page = TypeAdapter(FeedPage)
+
+
+def _serve_files(
+    catalogue: CatalogueFiles | None,
+) -> TypeGuard[CatalogueFiles]:
+    # Catalogue files are JSON; other formats are encoded from the models.
+    return catalogue is not None and negotiated_serializer.get() is None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an ``If-None-Match`` list."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag.removeprefix("W/") for tag in tags)
+
 
 @router.get(
     "/",
     summary="List with all restaurants",
+    response_model=list[RestaurantRead],
 )
 def list_restaurants(
     repo: Annotated[RestaurantRepository, Depends(get_restaurant_repo)],
-) -> list[RestaurantRead]:
-    return [RestaurantRead.model_validate(r) for r in repo.list_restaurants()]
+    catalogue: Annotated[CatalogueFiles | None, Depends(get_catalogue)],
+    fields: Annotated[tuple[str, ...] | None, Depends(restaurant_fields)],
+) -> list[RestaurantRead] | Response:
+    if fields:
+        return encode_projection(
+            RestaurantRead, fields, repo.list_restaurants(fields), many=True
+        )
+    if _serve_files(catalogue) and catalogue.ensure_index(repo):
+        return FileResponse(catalogue.index_path, media_type="application/json")
+    return restaurant_list.validate_python(repo.list_restaurants())
+
+
+@router.get(
+    "/feed",
+    summary="Home feed: a page of restaurants with their first dishes",
+    response_model=FeedPage,
+)
+def get_feed(
+    query: Annotated[FeedQuery, Query()],
+    request: Request,
+    repo: Annotated[RestaurantRepository, Depends(get_restaurant_repo)],
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> Response:
+    response = encode_response(
+        _feed_page, build_feed(repo, query.after, query.limit, query.dishes)
+    )
+    # Hashing the encoded body gives each format its own validator.
+    etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.feed_max_age_seconds}",
+    }
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return response
+
+
+@router.get(
+    "/changes",
+    summary="Catalogue changes after a cursor, oldest first",
+)
+def list_changes(
+    query: Annotated[ChangesQuery, Query()],
+    repo: Annotated[RestaurantRepository, Depends(get_restaurant_repo)],
+) -> ChangePage:
+    return build_changes(repo, query.since, query.limit)
+
+
+@router.get(
+    "/nearby",
+    summary="Nearest restaurants within a radius, closest first",
+)
+def list_nearby_restaurants(
+    query: Annotated[NearbyQuery, Query()],
+    repo: Annotated[RestaurantRepository, Depends(get_restaurant_repo)],
+) -> list[RestaurantNearbyRead]:
+    return [
+        RestaurantNearbyRead.model_validate(row)
+        for row in repo.nearest_restaurants(
+            query.latitude,
+            query.longitude,
+            query.radius_km,
+            limit=query.limit,
+            offset=query.offset,
+        )
+    ]
 
 
 @router.post(
@@ -40,6 +157,8 @@ def create_restaurant(
         description=payload.description or "",
         address=payload.address,
         phone=payload.phone,
+        latitude=payload.latitude,
+        longitude=payload.longitude,
     )
 
 
@@ -64,36 +183,79 @@ def delete_restaurant(
 @router.get(
     "/{restaurant_id}/menu",
     summary="Restaurants menu (List with dishes)",
+    response_model=MenuRead,
 )
 def get_menu(
     restaurant_id: int,
     repo: Annotated[RestaurantRepository, Depends(get_restaurant_repo)],
-) -> MenuRead:
+    catalogue: Annotated[CatalogueFiles | None, Depends(get_catalogue)],
+    fields: Annotated[tuple[str, ...] | None, Depends(dish_fields)],
+) -> MenuRead | Response:
+    if fields:
+        return _menu_projection(repo, restaurant_id, fields)
+    if _serve_files(catalogue) and catalogue.ensure_menu(repo, restaurant_id):
+        return FileResponse(
+            catalogue.menu_path(restaurant_id), media_type="application/json"
+        )
+
+    menu = build_menu(repo, restaurant_id)
+    if not menu:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Uknown restaurant",
+        )
+    return menu
+
+
+def _menu_projection(
+    repo: RestaurantRepository,
+    restaurant_id: int,
+    fields: tuple[str, ...],
+) -> Response:
     restaurant = repo.get_restaurant(restaurant_id)
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Uknown restaurant",
         )
+    return encode_menu_projection(
+        restaurant, repo.list_menu(restaurant_id, fields), fields
+    )
 
-    dishes = [DishRead.model_validate(d) for d in repo.list_menu(restaurant_id)]
 
-    return MenuRead(
-        restaurant=restaurant,
-        dishes=dishes,
-    )
+@router.post(
+    "/dishes/batch",
+    summary="Look up several dishes by key; misses come back with a null dish",
+)
+def get_dishes(
+    payload: DishBatch,
+    repo: Annotated[RestaurantRepository, Depends(get_restaurant_repo)],
+    catalogue: Annotated[CatalogueFiles | None, Depends(get_catalogue)],
+) -> list[DishLookup]:
+    keys = [(key.restaurant_id, key.dish_id) for key in payload.keys]
+    found = lookup_dishes(repo, catalogue, keys)
+    return [
+        DishLookup(restaurant_id=rid, dish_id=did, dish=found.get((rid, did)))
+        for rid, did in keys
+    ]
 
 
 @router.get(
     "/{restaurant_id}/dishes/{dish_id}",
     summary="Dish details",
+    response_model=DishRead,
 )
 def get_dish(
     restaurant_id: int,
     dish_id: int,
     repo: Annotated[RestaurantRepository, Depends(get_restaurant_repo)],
-) -> DishRead:
-    dish = repo.get_dish(restaurant_id, dish_id)
+    fields: Annotated[tuple[str, ...] | None, Depends(dish_fields)],
+) -> DishRead | Response:
+    dish = (
+        repo.get_dish_row(restaurant_id, dish_id, fields)
+        if fields
+        else repo.get_dish(restaurant_id, dish_id)
+    )
 
     if not dish:
         raise HTTPException(
@@ -101,6 +263,8 @@ def get_dish(
             detail="Uknown dish",
         )
 
+    if fields:
+        return encode_projection(DishRead, fields, dish)
     return DishRead.model_validate(dish)
 
 
@@ -124,7 +288,7 @@ def create_dish(
         restaurant_id=restaurant_id,
         name=payload.name,
         description=payload.description or "",
-        price=payload.price,
+        price_cents=payload.price,
     )
 
 
@@ -3,7 +3,12 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from api.db.schemes import User
-from api.dependencies import get_current_user, get_order_repo, get_user_repo
+from api.dependencies import (
+    get_current_user,
+    get_order_repo,
+    get_user_repo,
+    register_rate_limit,
+)
 from api.models.user import UserCreate, UserRead, UserUpdate
 from api.repositories.order import OrderRepository
 from api.repositories.user import UserRepository
@@ -15,6 +20,7 @@ router = APIRouter(prefix="/users", tags=["users"])
     "/",
     status_code=status.HTTP_201_CREATED,
     summary="Register new user",
+    dependencies=[Depends(register_rate_limit)],
 )
 def create_user(
     payload: UserCreate,
@@ -32,6 +38,8 @@ def create_user(
         password=payload.password,
         phone=payload.phone,
         address=payload.address,
+        latitude=payload.latitude,
+        longitude=payload.longitude,
     )
 
     _ = order_repo.create_order(user)
@@ -0,0 +1,491 @@
+import argparse
+import io
+import itertools
+import logging
+import math
+import random
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime, timedelta
+from functools import cache, lru_cache
+from typing import Any
+
+from sqlalchemy import Connection, Engine, create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.pool import NullPool
+
+from api.db.database import get_engine
+from api.services.geo import encode_geohash
+from api.services.passwords import build_pwd_context
+from api.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Seeded data sits around one city so geo queries find realistic neighbours.
+CITY_CENTER = (55.75, 37.62)
+CITY_SPREAD_DEGREES = 0.25
+
+ORDER_STATUSES = ("pending", "queued", "preparing", "delivering", "delivered")
+ORDER_STATUS_WEIGHTS = (70, 10, 8, 7, 5)
+
+COLUMNS = {
+    "user": (
+        "user_id",
+        "name",
+        "phone",
+        "address",
+        "password",
+        "latitude",
+        "longitude",
+    ),
+    "restaurant": (
+        "restaurant_id",
+        "name",
+        "description",
+        "address",
+        "phone",
+        "latitude",
+        "longitude",
+        "geohash",
+    ),
+    "dish": ("dish_id", "restaurant_id", "name", "description", "price_cents"),
+    "order": ("user_id", "status", "payment_method", "created_at"),
+    "order_dish": ("dish_id", "restaurant_id", "user_id", "quantity"),
+    "refresh_tokens": ("id", "user_id", "token", "expires_at"),
+}
+SEEDED_TABLES = tuple(COLUMNS)
+
+Rows = dict[str, list[tuple]]
+
+
+@dataclass(frozen=True, slots=True)
+class SeedPlan:
+    """What to generate.
+
+    Every entity draws from its own RNG stream keyed by the seed and its
+    index, so the rows don't depend on chunking or worker count. Password
+    hashes are the exception: bcrypt salts them randomly.
+    """
+
+    seed: int
+    users: int
+    restaurants: int
+    menu_mean: float
+    menu_max: int
+    cart_share: float
+    cart_lines_mean: float
+    zipf_s: float
+    tokens_per_user: int
+    password_hashes: tuple[str, ...]
+    epoch: datetime
+    user_base: int = 0
+    restaurant_base: int = 0
+    token_base: int = 0
+
+
+def _rng(plan: SeedPlan, *key: object) -> random.Random:
+    return random.Random(":".join(map(str, (plan.seed, *key))))  # noqa: S311
+
+
+def _point(rng: random.Random) -> tuple[float, float]:
+    return (
+        round(CITY_CENTER[0] + rng.uniform(-1, 1) * CITY_SPREAD_DEGREES, 6),
+        round(CITY_CENTER[1] + rng.uniform(-1, 1) * CITY_SPREAD_DEGREES * 2, 6),
+    )
+
+
+@cache
+def zipf_cum_weights(n: int, s: float) -> list[float]:
+    """Cumulative weights of ranks ``0..n-1`` with ``P(k) ~ 1 / (k + 1) ** s``."""
+    return list(itertools.accumulate(1 / k**s for k in range(1, n + 1)))
+
+
+@lru_cache(maxsize=1 << 16)
+def menu_size(plan: SeedPlan, restaurant: int) -> int:
+    """Log-normal menu size with mean ``menu_mean``, clamped to ``menu_max``."""
+    sigma = 0.6
+    mu = math.log(plan.menu_mean) - sigma**2 / 2
+    size = round(_rng(plan, "menu", restaurant).lognormvariate(mu, sigma))
+    return min(max(size, 1), plan.menu_max)
+
+
+def restaurant_rows(plan: SeedPlan, start: int, stop: int) -> Rows:
+    """Restaurants ``start..stop-1`` (0-based) and their menus."""
+    rows: Rows = {"restaurant": [], "dish": []}
+    for index in range(start, stop):
+        rng = _rng(plan, "restaurant", index)
+        restaurant_id = plan.restaurant_base + index + 1
+        latitude, longitude = _point(rng)
+        rows["restaurant"].append(
+            (
+                restaurant_id,
+                f"Restaurant {restaurant_id}",
+                f"Seeded restaurant {restaurant_id}",
+                f"{rng.randint(1, 300)} Seed street",
+                f"+7{rng.randrange(10**10):010d}",
+                latitude,
+                longitude,
+                encode_geohash(latitude, longitude),
+            )
+        )
+        rows["dish"].extend(
+            (
+                dish_id,
+                restaurant_id,
+                f"Dish {dish_id}",
+                f"Dish {dish_id} of restaurant {restaurant_id}",
+                rng.randint(10, 500) * 10,
+            )
+            for dish_id in range(1, menu_size(plan, index) + 1)
+        )
+    return rows
+
+
+def _cart(plan: SeedPlan, rng: random.Random) -> list[tuple[int, int, int]]:
+    """One restaurant's ``(restaurant_id, dish_id, quantity)`` lines, Zipf-skewed."""
+    restaurant = rng.choices(
+        range(plan.restaurants),
+        cum_weights=zipf_cum_weights(plan.restaurants, plan.zipf_s),
+    )[0]
+    menu = menu_size(plan, restaurant)
+    wanted = min(
+        menu, 1 + int(rng.expovariate(1 / max(plan.cart_lines_mean - 1, 1e-9)))
+    )
+    dishes = rng.choices(
+        range(1, menu + 1),
+        cum_weights=zipf_cum_weights(menu, plan.zipf_s),
+        k=wanted * 4,
+    )
+    restaurant_id = plan.restaurant_base + restaurant + 1
+    return [
+        (restaurant_id, dish_id, rng.randint(1, 3))
+        for dish_id in list(dict.fromkeys(dishes))[:wanted]
+    ]
+
+
+def customer_rows(plan: SeedPlan, start: int, stop: int) -> Rows:
+    """Users ``start..stop-1`` (0-based) with their carts and refresh tokens."""
+    rows: Rows = {"user": [], "order": [], "order_dish": [], "refresh_tokens": []}
+    for index in range(start, stop):
+        rng = _rng(plan, "user", index)
+        user_id = plan.user_base + index + 1
+        rows["user"].append(
+            (
+                user_id,
+                f"user{user_id}",
+                f"+7{rng.randrange(10**10):010d}",
+                f"{rng.randint(1, 300)} Seed avenue",
+                plan.password_hashes[index % len(plan.password_hashes)],
+                *_point(rng),
+            )
+        )
+        for token in range(plan.tokens_per_user):
+            rows["refresh_tokens"].append(
+                (
+                    plan.token_base + index * plan.tokens_per_user + token + 1,
+                    user_id,
+                    f"seed-{plan.seed}-{user_id}-{rng.getrandbits(64):016x}",
+                    plan.epoch + timedelta(seconds=rng.randint(3600, 30 * 86400)),
+                )
+            )
+        if rng.random() >= plan.cart_share:
+            continue
+        rows["order"].append(
+            (
+                user_id,
+                rng.choices(ORDER_STATUSES, ORDER_STATUS_WEIGHTS)[0],
+                rng.choice(("card", "cash", "not_selected")),
+                plan.epoch - timedelta(seconds=rng.randint(0, 7 * 86400)),
+            )
+        )
+        rows["order_dish"].extend(
+            (dish_id, restaurant_id, user_id, quantity)
+            for restaurant_id, dish_id, quantity in _cart(plan, rng)
+        )
+    return rows
+
+
+def _copy_value(value: Any) -> str:  # noqa: ANN401
+    if value is None:
+        return r"\N"
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_text(rows: Iterable[Sequence[Any]]) -> str:
+    """Rows in PostgreSQL's ``COPY ... FROM STDIN`` text format."""
+    return "".join(
+        "\t".join(_copy_value(value) for value in row) + "\n" for row in rows
+    )
+
+
+def _copy(dbapi_connection: Any, table: str, rows: list[tuple]) -> None:  # noqa: ANN401
+    columns = ", ".join(COLUMNS[table])
+    sql = f'COPY "{table}" ({columns}) FROM STDIN'
+    data = copy_text(rows)
+    with dbapi_connection.cursor() as cursor:
+        if hasattr(cursor, "copy"):
+            with cursor.copy(sql) as copy:
+                copy.write(data)
+        else:
+            # psycopg2
+            cursor.copy_expert(sql, io.StringIO(data))
+
+
+@cache
+def _loader_engine(database_url: str) -> Engine:
+    return create_engine(database_url, poolclass=NullPool)
+
+
+def load_chunk(
+    database_url: str, plan: SeedPlan, kind: str, start: int, stop: int
+) -> int:
+    """Generate one chunk and COPY it in a single transaction; return rows loaded."""
+    rows = (restaurant_rows if kind == "restaurants" else customer_rows)(
+        plan, start, stop
+    )
+    dbapi_connection = _loader_engine(database_url).raw_connection()
+    try:
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute("SET synchronous_commit TO off")
+        for table, table_rows in rows.items():
+            if table_rows:
+                _copy(dbapi_connection, table, table_rows)
+        dbapi_connection.commit()
+    finally:
+        dbapi_connection.close()
+    return sum(len(table_rows) for table_rows in rows.values())
+
+
+def _drop_secondary_ddl(conn: Connection) -> tuple[list[str], list[str]]:
+    """
+    Drop foreign keys and secondary indexes of the seeded tables, returning
+    the statements that recreate them. Primary keys and unique constraints
+    stay; the load relies on them being consistent anyway.
+    """
+    tables = [f'public."{table}"' for table in SEEDED_TABLES]
+    foreign_keys = conn.execute(
+        text(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) "
+            "FROM pg_constraint "
+            "WHERE contype = 'f' AND conrelid = ANY(CAST(:tables AS regclass[]))"
+        ),
+        {"tables": tables},
+    ).all()
+    indexes = conn.execute(
+        text(
+            "SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid) "
+            "FROM pg_index i "
+            "WHERE i.indrelid = ANY(CAST(:tables AS regclass[])) "
+            "AND NOT i.indisprimary "
+            "AND NOT EXISTS "
+            "(SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)"
+        ),
+        {"tables": tables},
+    ).all()
+    for table, name, _ in foreign_keys:
+        conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    for name, _ in indexes:
+        conn.execute(text(f"DROP INDEX {name}"))
+    return (
+        [
+            f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'
+            for table, name, definition in foreign_keys
+        ],
+        [definition for _, definition in indexes],
+    )
+
+
+def _next_ids(conn: Connection) -> dict[str, int]:
+    return dict(
+        conn.execute(
+            text(
+                "SELECT 'user', coalesce(max(user_id), 0) FROM \"user\" "
+                "UNION ALL SELECT 'restaurant', coalesce(max(restaurant_id), 0) "
+                "FROM restaurant "
+                "UNION ALL SELECT 'token', coalesce(max(id), 0) FROM refresh_tokens"
+            )
+        ).all()
+    )
+
+
+def _chunks(total: int, size: int) -> list[tuple[int, int]]:
+    return [(start, min(start + size, total)) for start in range(0, total, size)]
+
+
+def _restore_secondary_ddl(
+    engine: Engine,
+    foreign_keys: list[str],
+    indexes: list[str],
+    workers: int,
+) -> list[str]:
+    """
+    Rebuild the indexes in parallel, then the foreign keys, each statement
+    on its own; returns those that failed.
+    """
+    database_url = engine.url.render_as_string(hide_password=False)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            statement: pool.submit(_execute, database_url, statement)
+            for statement in indexes
+        }
+        failed = [s for s, future in futures.items() if future.exception()]
+    for statement in foreign_keys:
+        try:
+            _execute(database_url, statement)
+        except SQLAlchemyError:
+            failed.append(statement)
+    return failed
+
+
+def seed_database(
+    engine: Engine,
+    plan: SeedPlan,
+    *,
+    workers: int,
+    chunk_size: int,
+) -> int:
+    """
+    Load ``plan`` with parallel COPY chunks. Foreign keys and secondary
+    indexes are dropped first and rebuilt once all rows are in, which is
+    far cheaper than maintaining them row by row. They are rebuilt even if
+    the load fails; statements that cannot be applied are logged.
+    """
+    database_url = engine.url.render_as_string(hide_password=False)
+    with engine.begin() as conn:
+        ids = _next_ids(conn)
+        plan = replace(
+            plan,
+            user_base=ids["user"],
+            restaurant_base=ids["restaurant"],
+            token_base=ids["token"],
+        )
+        foreign_keys, indexes = _drop_secondary_ddl(conn)
+
+    try:
+        started = time.perf_counter()
+        jobs = [("restaurants", *c) for c in _chunks(plan.restaurants, chunk_size)]
+        jobs += [("customers", *c) for c in _chunks(plan.users, chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(load_chunk, database_url, plan, *job) for job in jobs
+            ]
+            loaded = sum(future.result() for future in futures)
+        logger.info("Copied %d rows in %.1f s", loaded, time.perf_counter() - started)
+    finally:
+        started = time.perf_counter()
+        failed = _restore_secondary_ddl(engine, foreign_keys, indexes, workers)
+        if failed:
+            logger.error(
+                "Could not restore %d indexes and foreign keys; apply by hand:\n%s",
+                len(failed),
+                ";\n".join(failed),
+            )
+    if failed:
+        msg = f"{len(failed)} indexes and foreign keys were not restored"
+        raise RuntimeError(msg)
+
+    with engine.begin() as conn:
+        for table, column in (
+            ("user", "user_id"),
+            ("restaurant", "restaurant_id"),
+            ("refresh_tokens", "id"),
+        ):
+            sequence = f"pg_get_serial_sequence('\"{table}\"', '{column}')"
+            latest = f'SELECT max({column}) FROM "{table}"'  # noqa: S608
+            conn.execute(text(f"SELECT setval({sequence}, ({latest}))"))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(
+            text("ANALYZE " + ", ".join(f'"{table}"' for table in SEEDED_TABLES))
+        )
+    logger.info(
+        "Rebuilt %d indexes and %d foreign keys in %.1f s",
+        len(indexes),
+        len(foreign_keys),
+        time.perf_counter() - started,
+    )
+    return loaded
+
+
+def _execute(database_url: str, statement: str) -> None:
+    with _loader_engine(database_url).begin() as conn:
+        conn.execute(text(statement))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Fill the database with synthetic users, menus and carts."
+    )
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--restaurants", type=int, default=20_000)
+    parser.add_argument("--menu-mean", type=float, default=60, help="dishes per menu")
+    parser.add_argument("--menu-max", type=int, default=400)
+    parser.add_argument(
+        "--cart-share", type=float, default=0.5, help="users with an order"
+    )
+    parser.add_argument("--cart-lines-mean", type=float, default=3)
+    parser.add_argument(
+        "--zipf", type=float, default=1.1, help="restaurant and dish popularity skew"
+    )
+    parser.add_argument("--tokens-per-user", type=int, default=1)
+    parser.add_argument(
+        "--passwords",
+        type=int,
+        default=8,
+        help="distinct passwords, hashed once; user N gets seed-password-{N %% K}",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="empty the seeded tables (and everything referencing them) first",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    engine = get_engine(settings)
+    if args.truncate:
+        with engine.begin() as conn:
+            tables = ", ".join(f'"{table}"' for table in SEEDED_TABLES)
+            conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+
+    pwd_context = build_pwd_context(settings)
+    plan = SeedPlan(
+        seed=args.seed,
+        users=args.users,
+        restaurants=args.restaurants,
+        menu_mean=args.menu_mean,
+        menu_max=args.menu_max,
+        cart_share=args.cart_share,
+        cart_lines_mean=args.cart_lines_mean,
+        zipf_s=args.zipf,
+        tokens_per_user=args.tokens_per_user,
+        password_hashes=tuple(
+            pwd_context.hash(f"seed-password-{n}") for n in range(args.passwords)
+        ),
+        # Midnight UTC, so runs on the same day produce identical rows.
+        epoch=datetime.now(UTC).replace(
+            hour=0, minute=0, second=0, microsecond=0, tzinfo=None
+        ),
+    )
+    started = time.perf_counter()
+    loaded = seed_database(
+        engine, plan, workers=args.workers, chunk_size=args.chunk_size
+    )
+    logger.info("Seeded %d rows in %.1f s", loaded, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
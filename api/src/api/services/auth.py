@@ -1,8 +1,8 @@
+import secrets
 from datetime import UTC, datetime, timedelta
 from typing import Annotated
 
 from fastapi import Depends
-from jose import jwt
 
 from api.settings import Settings, get_settings
 
@@ -11,10 +11,13 @@ def create_tokens(
     user_id: int,
     settings: Annotated[Settings, Depends(get_settings)],
 ) -> tuple[str, str, datetime]:
+    from jose import jwt  # noqa: PLC0415
+
     now = datetime.now(UTC)
     access_payload = {
         "sub": str(user_id),
         "exp": now + timedelta(minutes=settings.access_token_expire_minutes),
+        "jti": secrets.token_urlsafe(16),
     }
     access_token = jwt.encode(
         access_payload,
@@ -23,7 +26,11 @@ def create_tokens(
     )
 
     expire_rt = now + timedelta(days=settings.refresh_token_expire_days)
-    refresh_payload = {"sub": str(user_id), "exp": expire_rt}
+    refresh_payload = {
+        "sub": str(user_id),
+        "exp": expire_rt,
+        "jti": secrets.token_urlsafe(16),
+    }
     refresh_token = jwt.encode(
         refresh_payload,
         settings.token_secret_key.get_secret_value(),
@@ -37,8 +44,20 @@ def verify_token(
     token: str,
     settings: Annotated[Settings, Depends(get_settings)],
 ) -> dict:
+    from jose import jwt  # noqa: PLC0415
+
     return jwt.decode(
         token,
         settings.token_secret_key.get_secret_value(),
         algorithms=[settings.token_algorithm],
     )
+
+
+def access_token_claims(token: str, settings: Settings) -> dict | None:
+    """Claims of a valid token, ``None`` if it is malformed or expired."""
+    from jose import JWTError  # noqa: PLC0415
+
+    try:
+        return verify_token(token, settings)
+    except JWTError:
+        return None
@@ -0,0 +1,329 @@
+import argparse
+import json
+import logging
+import tempfile
+import time
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated, Any
+
+from fastapi import Depends
+from pydantic import TypeAdapter
+
+from api.models.money import parse_cents
+from api.models.restaurant import (
+    CatalogueChangeRead,
+    ChangePage,
+    DishRead,
+    FeedPage,
+    MenuRead,
+    RestaurantRead,
+)
+from api.services.single_flight import SingleFlight
+from api.settings import Settings, get_settings
+
+if TYPE_CHECKING:
+    from api.repositories.restaurant import RestaurantRepository
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever RestaurantRead or MenuRead change shape, so files rendered
+# by an older release are never served.
+CATALOGUE_FORMAT = 1
+
+restaurant_list = TypeAdapter(list[RestaurantRead])
+_dish_list = TypeAdapter(list[DishRead])
+
+# Concurrent readers of one stale file wait for a single re-render.
+_renders = SingleFlight("catalogue_renders")
+
+
+def build_menu(repo: "RestaurantRepository", restaurant_id: int) -> MenuRead | None:
+    restaurant = repo.get_restaurant(restaurant_id)
+    if not restaurant:
+        return None
+    return MenuRead(
+        restaurant=restaurant,
+        dishes=_dish_list.validate_python(repo.list_menu(restaurant_id)),
+    )
+
+
+def build_feed(
+    repo: "RestaurantRepository",
+    after: int,
+    limit: int,
+    dishes: int,
+) -> FeedPage:
+    """Group the feed's (restaurant, dish) rows into one page of restaurants."""
+    # One extra restaurant tells whether another page exists.
+    page: dict[int, dict[str, Any]] = {}
+    for row in repo.home_feed(after, limit + 1, dishes):
+        entry = page.get(row.restaurant_id)
+        if entry is None:
+            entry = page[row.restaurant_id] = {
+                name: getattr(row, name) for name in RestaurantRead.model_fields
+            }
+            entry["dishes"] = []
+        if row.dish_id is not None:
+            entry["dishes"].append(
+                {
+                    "dish_id": row.dish_id,
+                    "restaurant_id": row.restaurant_id,
+                    "name": row.dish_name,
+                    "description": row.dish_description,
+                    "price": row.price_cents,
+                }
+            )
+    restaurants = list(page.values())
+    return FeedPage(
+        restaurants=restaurants[:limit],
+        next_after=restaurants[limit - 1]["restaurant_id"]
+        if len(restaurants) > limit
+        else None,
+    )
+
+
+def build_changes(
+    repo: "RestaurantRepository",
+    since: int | None,
+    limit: int,
+) -> ChangePage:
+    """
+    Changes after ``since``, collapsed to the newest one per restaurant or
+    dish within the page. Without ``since`` only the head cursor is
+    returned: record it, download the catalogue, then sync from it.
+    """
+    if since is None:
+        return ChangePage(changes=[], next_since=repo.latest_change(), has_more=False)
+
+    rows = repo.list_changes(since, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    newest = {(row.restaurant_id, row.dish_id): row for row in rows}
+    upserts = [row for row in newest.values() if row.operation == "upsert"]
+    restaurants = {
+        r.restaurant_id: r
+        for r in repo.get_restaurants(
+            [row.restaurant_id for row in upserts if row.dish_id is None]
+        )
+    }
+    dishes = {
+        (d.restaurant_id, d.dish_id): d
+        for d in repo.get_dishes(
+            [(row.restaurant_id, row.dish_id) for row in upserts if row.dish_id]
+        )
+    }
+
+    changes = []
+    for row in sorted(newest.values(), key=lambda row: row.change_id):
+        restaurant = dish = None
+        if row.operation == "upsert":
+            if row.dish_id is None:
+                restaurant = restaurants.get(row.restaurant_id)
+            else:
+                dish = dishes.get((row.restaurant_id, row.dish_id))
+            if restaurant is None and dish is None:
+                # Deleted since; its tombstone comes later in the log.
+                continue
+        changes.append(
+            CatalogueChangeRead(
+                change_id=row.change_id,
+                operation=row.operation,
+                restaurant_id=row.restaurant_id,
+                dish_id=row.dish_id,
+                changed_at=row.changed_at,
+                restaurant=restaurant and RestaurantRead.model_validate(restaurant),
+                dish=dish and DishRead.model_validate(dish),
+            )
+        )
+    return ChangePage(
+        changes=changes,
+        next_since=rows[-1].change_id if rows else since,
+        has_more=has_more,
+    )
+
+
+def lookup_dishes(
+    repo: "RestaurantRepository",
+    catalogue: "CatalogueFiles | None",
+    keys: Sequence[tuple[int, int]],
+) -> dict[tuple[int, int], DishRead]:
+    """
+    Resolve dish keys from fresh menu files first; only restaurants without
+    one go to the database, all in a single query. Missing keys are absent.
+    """
+    found: dict[tuple[int, int], DishRead] = {}
+    pending = list(dict.fromkeys(keys))
+    if catalogue:
+        menus = {rid: catalogue.read_dishes(rid) for rid, _ in pending}
+        for key in pending:
+            dishes = menus[key[0]]
+            if dishes is not None and key[1] in dishes:
+                found[key] = dishes[key[1]]
+        pending = [key for key in pending if menus[key[0]] is None]
+    if pending:
+        for dish in _dish_list.validate_python(repo.get_dishes(pending)):
+            found[dish.restaurant_id, dish.dish_id] = dish
+    return found
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write to a temporary file next to ``path`` and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent,
+        prefix=f".{path.name}.",
+        suffix=".tmp",
+        delete=False,
+    ) as tmp:
+        tmp.write(data)
+        tmp.flush()
+    try:
+        Path(tmp.name).replace(path)
+    except BaseException:
+        Path(tmp.name).unlink(missing_ok=True)
+        raise
+
+
+class CatalogueFiles:
+    """Pre-rendered restaurant index and menus on local disk.
+
+    Readers only ever see complete files because every write goes through
+    a rename. A file older than ``max_age_seconds`` counts as stale, which
+    bounds how long changes made elsewhere (another host, a manual SQL
+    fix) can go unnoticed; the next read re-renders it.
+    """
+
+    def __init__(self, directory: Path, max_age_seconds: float) -> None:
+        self.root = directory / f"v{CATALOGUE_FORMAT}"
+        self.max_age_seconds = max_age_seconds
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "restaurants.json"
+
+    def menu_path(self, restaurant_id: int) -> Path:
+        return self.root / "menus" / f"{restaurant_id}.json"
+
+    def fresh(self, path: Path) -> bool:
+        try:
+            modified = path.stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - modified < self.max_age_seconds
+
+    def ensure_index(self, repo: "RestaurantRepository") -> bool:
+        """Re-render a stale or missing index; False if there is still none."""
+        return self._ensure(self.index_path, lambda: self.render_index(repo))
+
+    def ensure_menu(self, repo: "RestaurantRepository", restaurant_id: int) -> bool:
+        """Re-render a stale or missing menu; False for unknown restaurants."""
+        return self._ensure(
+            self.menu_path(restaurant_id),
+            lambda: self.render_menu(repo, restaurant_id),
+        )
+
+    def _ensure(self, path: Path, render: Callable[[], None]) -> bool:
+        if self.fresh(path):
+            return True
+        try:
+            _renders.do(path, render)
+        except OSError:
+            logger.warning("Could not re-render %s", path, exc_info=True)
+            return False
+        return self.fresh(path)
+
+    def read_dishes(self, restaurant_id: int) -> dict[int, DishRead] | None:
+        """Dishes of a fresh menu file by ``dish_id``; ``None`` if there is none."""
+        path = self.menu_path(restaurant_id)
+        if not self.fresh(path):
+            return None
+        try:
+            menu = json.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        return {
+            dish["dish_id"]: DishRead.model_validate(
+                {**dish, "price": parse_cents(dish["price"])}
+            )
+            for dish in menu["dishes"]
+        }
+
+    def render_index(self, repo: "RestaurantRepository") -> None:
+        restaurants = restaurant_list.validate_python(repo.list_restaurants())
+        _write_atomic(self.index_path, restaurant_list.dump_json(restaurants))
+
+    def render_menu(self, repo: "RestaurantRepository", restaurant_id: int) -> None:
+        menu = build_menu(repo, restaurant_id)
+        if menu is None:
+            self.menu_path(restaurant_id).unlink(missing_ok=True)
+            return
+        _write_atomic(self.menu_path(restaurant_id), menu.model_dump_json().encode())
+
+    def render_all(self, repo: "RestaurantRepository") -> int:
+        restaurants = restaurant_list.validate_python(repo.list_restaurants())
+        _write_atomic(self.index_path, restaurant_list.dump_json(restaurants))
+        for restaurant in restaurants:
+            self.render_menu(repo, restaurant.restaurant_id)
+        return len(restaurants)
+
+    def refresh(
+        self,
+        repo: "RestaurantRepository",
+        restaurant_id: int,
+        *,
+        index: bool = False,
+    ) -> None:
+        """
+        Re-render after a write. On failure the affected files are removed,
+        so readers fall back to the database instead of serving old data.
+        """
+        try:
+            self.render_menu(repo, restaurant_id)
+            if index:
+                self.render_index(repo)
+        except OSError:
+            logger.warning("Could not refresh catalogue files", exc_info=True)
+            self.menu_path(restaurant_id).unlink(missing_ok=True)
+            if index:
+                self.index_path.unlink(missing_ok=True)
+
+
+def get_catalogue(
+    settings: Annotated[Settings, Depends(get_settings)],
+) -> CatalogueFiles | None:
+    if settings.catalogue_dir is None:
+        return None
+    return CatalogueFiles(settings.catalogue_dir, settings.catalogue_max_age_seconds)
+
+
+def main() -> None:
+    from api.db.database import get_engine, get_session_local  # noqa: PLC0415
+    from api.repositories.restaurant import RestaurantRepository  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(
+        description="Pre-render the restaurant index and every menu to disk."
+    )
+    parser.add_argument("--dir", type=Path, help="defaults to CATALOGUE_DIR")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+    directory = args.dir or settings.catalogue_dir
+    if directory is None:
+        parser.error("set CATALOGUE_DIR or pass --dir")
+
+    catalogue = CatalogueFiles(directory, settings.catalogue_max_age_seconds)
+    started = time.perf_counter()
+    with get_session_local(get_engine(settings))() as db:
+        count = catalogue.render_all(RestaurantRepository(db))
+    logger.info(
+        "Rendered %d menus to %s in %.1f s",
+        count,
+        catalogue.root,
+        time.perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    main()
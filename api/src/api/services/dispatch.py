@@ -0,0 +1,180 @@
+import math
+from dataclasses import dataclass
+from typing import Literal
+
+import numpy as np
+
+from api.services.geo import EARTH_RADIUS_KM
+
+Solver = Literal["greedy", "hungarian"]
+
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+@dataclass(frozen=True, slots=True)
+class PendingDeliveries:
+    """Orders waiting for a courier, one row per order, oldest first."""
+
+    user_ids: np.ndarray
+    restaurant_ids: np.ndarray
+    pickups: np.ndarray
+    dropoffs: np.ndarray
+
+
+@dataclass(frozen=True, slots=True)
+class AvailableCouriers:
+    courier_ids: np.ndarray
+    positions: np.ndarray
+
+
+def haversine_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distances in km between every row of ``a`` and of ``b`` (lat, lon degrees)."""
+    a = np.radians(a)
+    b = np.radians(b)
+    d_lat = b[None, :, 0] - a[:, None, 0]
+    d_lon = b[None, :, 1] - a[:, None, 1]
+    h = (
+        np.sin(d_lat / 2) ** 2
+        + np.cos(a[:, None, 0]) * np.cos(b[None, :, 0]) * np.sin(d_lon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+def _group_starts(keys: np.ndarray) -> np.ndarray:
+    """Mark the first row of every run of equal (sorted) keys."""
+    starts = np.ones(len(keys), dtype=bool)
+    if keys.ndim == 1:
+        starts[1:] = keys[1:] != keys[:-1]
+    else:
+        starts[1:] = (keys[1:] != keys[:-1]).any(axis=1)
+    return starts
+
+
+def _rank_in_group(starts: np.ndarray) -> np.ndarray:
+    positions = np.arange(len(starts))
+    return positions - np.maximum.accumulate(np.where(starts, positions, 0))
+
+
+def batch_deliveries(
+    deliveries: PendingDeliveries,
+    max_batch_size: int,
+    max_drop_km: float,
+) -> list[np.ndarray]:
+    """
+    Group orders from the same restaurant whose drop-offs share a grid cell
+    small enough that any two of them are within ``max_drop_km``; returns
+    row indices per batch, oldest orders first.
+    """
+    cell_degrees = max_drop_km / math.sqrt(2) / _KM_PER_DEGREE
+    lat_cell = np.floor(deliveries.dropoffs[:, 0] / cell_degrees)
+    lon_cell = np.floor(
+        deliveries.dropoffs[:, 1]
+        * np.cos(np.radians(deliveries.dropoffs[:, 0]))
+        / cell_degrees
+    )
+    order = np.lexsort(
+        (np.arange(len(lat_cell)), lon_cell, lat_cell, deliveries.restaurant_ids)
+    )
+    keys = np.column_stack((deliveries.restaurant_ids, lat_cell, lon_cell))[order]
+
+    cell_starts = _group_starts(keys)
+    batch_starts = cell_starts | (_rank_in_group(cell_starts) % max_batch_size == 0)
+    return np.split(order, np.flatnonzero(batch_starts)[1:])
+
+
+def _solve_greedy(
+    cost: np.ndarray,
+    capacity: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Each round every free courier proposes to its nearest pickup and each
+    pickup accepts its ``capacity`` nearest proposers, all in array operations.
+    """
+    cost = cost.copy()
+    capacity = capacity.copy()
+    cost[:, capacity == 0] = np.inf
+    all_rows = np.arange(cost.shape[0])
+    rows_taken, cols_taken = [], []
+    while True:
+        best_col = cost.argmin(axis=1)
+        best_cost = cost[all_rows, best_col]
+        proposing = np.flatnonzero(np.isfinite(best_cost))
+        if not proposing.size:
+            break
+
+        proposing = proposing[np.lexsort((best_cost[proposing], best_col[proposing]))]
+        cols = best_col[proposing]
+        accepted = _rank_in_group(_group_starts(cols)) < capacity[cols]
+        rows, cols = proposing[accepted], cols[accepted]
+
+        rows_taken.append(rows)
+        cols_taken.append(cols)
+        capacity -= np.bincount(cols, minlength=len(capacity))
+        cost[rows, :] = np.inf
+        cost[:, capacity == 0] = np.inf
+
+    if not rows_taken:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    return np.concatenate(rows_taken), np.concatenate(cols_taken)
+
+
+def _solve_hungarian(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    from scipy.optimize import linear_sum_assignment  # noqa: PLC0415
+
+    finite = np.isfinite(cost)
+    penalty = cost[finite].max(initial=0) * cost.shape[0] + 1
+    rows, cols = linear_sum_assignment(np.where(finite, cost, penalty))
+    keep = finite[rows, cols]
+    return rows[keep], cols[keep]
+
+
+def plan_dispatch(  # noqa: PLR0913
+    deliveries: PendingDeliveries,
+    couriers: AvailableCouriers,
+    *,
+    max_batch_size: int,
+    max_drop_km: float,
+    max_pickup_km: float,
+    solver: Solver = "greedy",
+) -> list[tuple[int, list[int]]]:
+    """Return ``(courier_id, [order user_id, ...])`` assignments for one round."""
+    if not len(deliveries.user_ids) or not len(couriers.courier_ids):
+        return []
+
+    batches = batch_deliveries(deliveries, max_batch_size, max_drop_km)
+    first_rows = np.array([batch[0] for batch in batches])
+    restaurants, first_batch, batch_restaurant = np.unique(
+        deliveries.restaurant_ids[first_rows],
+        return_index=True,
+        return_inverse=True,
+    )
+    # Every batch of a restaurant shares its pickup point, so the cost
+    # matrix only needs one column per restaurant.
+    cost = haversine_matrix(
+        couriers.positions,
+        deliveries.pickups[first_rows[first_batch]],
+    )
+    cost[cost > max_pickup_km] = np.inf
+
+    if solver == "hungarian":
+        rows, batch_ids = _solve_hungarian(cost[:, batch_restaurant])
+    else:
+        rows, cols = _solve_greedy(
+            cost,
+            np.bincount(batch_restaurant, minlength=len(restaurants)),
+        )
+        # Hand out each restaurant's batches in order, oldest first.
+        by_restaurant = np.argsort(batch_restaurant, kind="stable")
+        offsets = np.searchsorted(batch_restaurant[by_restaurant], cols)
+        order = np.lexsort((np.arange(len(cols)), cols))
+        slot = np.empty(len(cols), dtype=int)
+        slot[order] = _rank_in_group(_group_starts(cols[order]))
+        batch_ids = by_restaurant[offsets + slot]
+
+    return [
+        (
+            int(couriers.courier_ids[row]),
+            deliveries.user_ids[batches[batch_id]].tolist(),
+        )
+        for row, batch_id in zip(rows, batch_ids, strict=True)
+    ]
@@ -0,0 +1,111 @@
+from functools import cache
+from typing import Annotated, Any
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from api.models.restaurant import DishRead, RestaurantRead
+from api.services.serialization import encode_response
+
+
+class FieldSet:
+    """Dependency parsing ``?fields=a,b`` against the fields of a read model.
+
+    Returns ``None`` when the parameter is absent, i.e. the full model.
+    Otherwise the names come back deduplicated and in model order, so
+    ``name,restaurant_id`` and ``restaurant_id,name`` share cache entries.
+    """
+
+    def __init__(self, model: type[BaseModel]) -> None:
+        self.model = model
+
+    async def __call__(
+        self,
+        fields: Annotated[
+            str | None,
+            Query(
+                description="Comma-separated subset of fields to return",
+                examples=["restaurant_id,name"],
+            ),
+        ] = None,
+    ) -> tuple[str, ...] | None:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",")} - {""}
+        allowed = self.model.model_fields
+        unknown = sorted(requested - allowed.keys())
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=(
+                    f"Unknown fields: {', '.join(unknown) or '(none given)'}; "
+                    f"allowed: {', '.join(allowed)}"
+                ),
+            )
+        return tuple(name for name in allowed if name in requested)
+
+
+restaurant_fields = FieldSet(RestaurantRead)
+dish_fields = FieldSet(DishRead)
+
+
+@cache
+def projection(model: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    """A copy of ``model`` with only ``fields``, keeping aliases and serializers."""
+    definitions: dict[str, Any] = {
+        name: (model.model_fields[name].annotation, model.model_fields[name])
+        for name in fields
+    }
+    return create_model(
+        f"{model.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **definitions,
+    )
+
+
+@cache
+def projection_adapter(
+    model: type[BaseModel],
+    fields: tuple[str, ...],
+    *,
+    many: bool = False,
+) -> TypeAdapter[Any]:
+    partial = projection(model, fields)
+    return TypeAdapter(list[partial] if many else partial)  # type: ignore[reportInvalidTypeForm]
+
+
+def encode_projection(
+    model: type[BaseModel],
+    fields: tuple[str, ...],
+    value: Any,  # noqa: ANN401
+    *,
+    many: bool = False,
+) -> Response:
+    """Encode rows or ORM objects with only ``fields`` of ``model``."""
+    adapter = projection_adapter(model, fields, many=many)
+    return encode_response(
+        adapter, adapter.validate_python(value, from_attributes=True)
+    )
+
+
+@cache
+def _menu_adapter(fields: tuple[str, ...]) -> TypeAdapter[Any]:
+    return TypeAdapter(
+        create_model(
+            "MenuReadFields",
+            __config__=ConfigDict(from_attributes=True),
+            restaurant=(RestaurantRead, ...),
+            dishes=(list[projection(DishRead, fields)], ...),  # type: ignore[reportInvalidTypeForm]
+        )
+    )
+
+
+def encode_menu_projection(
+    restaurant: Any,  # noqa: ANN401
+    dishes: Any,  # noqa: ANN401
+    fields: tuple[str, ...],
+) -> Response:
+    """Encode a menu whose dishes carry only ``fields``."""
+    adapter = _menu_adapter(fields)
+    menu = {"restaurant": restaurant, "dishes": dishes}
+    return encode_response(adapter, adapter.validate_python(menu, from_attributes=True))
@@ -0,0 +1,99 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_PRECISION = 9
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+# Upper bound on the prefixes of one covering_cells() filter.
+_MAX_CELLS = 27
+
+
+def encode_geohash(
+    latitude: float,
+    longitude: float,
+    precision: int = GEOHASH_PRECISION,
+) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, span = (longitude, lon_range) if even else (latitude, lat_range)
+        mid = (span[0] + span[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            span[0] = mid
+        else:
+            span[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:  # noqa: PLR2004
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def cell_size_degrees(precision: int) -> tuple[float, float]:
+    """Return ``(height, width)`` of a geohash cell in degrees."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180 / 2**lat_bits, 360 / 2**lon_bits
+
+
+def covering_cells(latitude: float, longitude: float, radius_km: float) -> list[str]:
+    """
+    Return geohash prefixes whose cells together cover the circle, or an
+    empty list when the circle is too large for a prefix filter to help.
+
+    The precision is the finest one whose cells are at least ``radius_km``
+    tall and whose cover needs at most ``_MAX_CELLS`` prefixes: three rows
+    of cells, as many columns as the circle spans. Towards the poles the
+    circle spans more longitude, and all of it once it reaches a pole.
+    """
+    ratio = math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi / 2)) / max(
+        math.cos(math.radians(latitude)), 1e-12
+    )
+    d_lon = math.degrees(math.asin(ratio)) if ratio < 1 else 180
+
+    precision = columns = 0
+    for candidate in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size_degrees(candidate)
+        if height * _KM_PER_DEGREE < radius_km:
+            break
+        span = min(2 * math.ceil(d_lon / width) + 1, round(360 / width))
+        if 3 * span > _MAX_CELLS:
+            break
+        precision, columns = candidate, span
+    if precision == 0:
+        return []
+
+    height, width = cell_size_degrees(precision)
+    if columns == round(360 / width):
+        # Every column: walk them from the antimeridian.
+        lons = [-180 + width * (i + 0.5) for i in range(columns)]
+    else:
+        half = columns // 2
+        lons = [longitude + width * i for i in range(-half, half + 1)]
+    cells = set()
+    for d_lat in (-height, 0, height):
+        lat = min(max(latitude + d_lat, -90), 90)
+        for lon in lons:
+            cells.add(encode_geohash(lat, (lon + 180) % 360 - 180, precision))
+    return sorted(cells)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    a = (
+        math.sin(d_lat / 2) ** 2
+        + math.cos(math.radians(lat1))
+        * math.cos(math.radians(lat2))
+        * math.sin(d_lon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from functools import cache
+
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel
+
+from api.repositories.idempotency import IdempotencyRepository
+from api.services.serialization import NegotiatedResponse, negotiated_serializer
+from api.settings import get_settings
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+@dataclass(frozen=True, slots=True)
+class StoredResponse:
+    fingerprint: str
+    status_code: int
+    body: str
+    expires_at: float
+
+
+class IdempotencyCache:
+    """Finished responses in a bounded LRU plus the keys in flight in this process.
+
+    Lookups that hit here never touch the database; concurrent requests with
+    the same key wait on the first one's event instead of running twice.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_keys: int = 100_000,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_keys = max_keys
+        self._responses: OrderedDict[tuple[int, str], StoredResponse] = OrderedDict()
+        self._in_flight: dict[tuple[int, str], threading.Event] = {}
+        self._next_purge = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[int, str]) -> StoredResponse | None:
+        with self._lock:
+            stored = self._responses.get(key)
+            if stored is None:
+                return None
+            if stored.expires_at <= time.time():
+                del self._responses[key]
+                return None
+            self._responses.move_to_end(key)
+            return stored
+
+    def put(self, key: tuple[int, str], stored: StoredResponse) -> None:
+        with self._lock:
+            self._responses[key] = stored
+            self._responses.move_to_end(key)
+            if len(self._responses) > self.max_keys:
+                self._responses.popitem(last=False)
+
+    def begin(self, key: tuple[int, str]) -> threading.Event | None:
+        """Mark ``key`` in flight, or return the event of the request that owns it."""
+        with self._lock:
+            if key in self._in_flight:
+                return self._in_flight[key]
+            self._in_flight[key] = threading.Event()
+            return None
+
+    def finish(self, key: tuple[int, str]) -> None:
+        with self._lock:
+            self._in_flight.pop(key).set()
+
+    def purge_due(self) -> bool:
+        """True at most once per TTL, so expired rows are deleted now and then."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_purge:
+                return False
+            self._next_purge = now + self.ttl_seconds
+            return True
+
+
+@cache
+def get_idempotency_cache() -> IdempotencyCache:
+    settings = get_settings()
+    return IdempotencyCache(
+        ttl_seconds=settings.idempotency_ttl_seconds,
+        max_keys=settings.idempotency_max_keys,
+    )
+
+
+async def request_fingerprint(request: Request) -> str:
+    """Hash of method, path and body; a key reused for another request is rejected."""
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    digest.update(await request.body())
+    return digest.hexdigest()
+
+
+class Idempotency:
+    """Runs a mutating endpoint at most once per ``Idempotency-Key``.
+
+    The key is claimed in the database before the endpoint runs, so other
+    workers answer 409 while it is in flight; the serialized response is
+    stored on success and replayed verbatim, without touching the cart.
+    The claim is a short lease, so a worker that dies mid-request blocks
+    the key for ``lease_seconds`` rather than the whole TTL.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        cache: IdempotencyCache,
+        repo: IdempotencyRepository,
+        *,
+        user_id: int,
+        key: str | None,
+        fingerprint: str,
+        wait_seconds: float,
+        lease_seconds: float,
+    ) -> None:
+        self.cache = cache
+        self.repo = repo
+        self.user_id = user_id
+        self.key = key
+        self.fingerprint = fingerprint
+        self.wait_seconds = wait_seconds
+        self.lease_seconds = lease_seconds
+
+    def run[T: BaseModel](self, handler: Callable[[], T]) -> T | Response:
+        if self.key is None:
+            return handler()
+
+        cache_key = (self.user_id, self.key)
+        while True:
+            stored = self.cache.get(cache_key)
+            if stored is not None:
+                return self._replay(stored)
+            in_flight = self.cache.begin(cache_key)
+            if in_flight is None:
+                break
+            if not in_flight.wait(self.wait_seconds):
+                raise _in_progress()
+
+        try:
+            return self._run_claimed(cache_key, handler)
+        finally:
+            self.cache.finish(cache_key)
+
+    def _run_claimed[T: BaseModel](
+        self,
+        cache_key: tuple[int, str],
+        handler: Callable[[], T],
+    ) -> T | Response:
+        now = datetime.now(UTC)
+        if self.cache.purge_due():
+            self.repo.purge_expired()
+        row = self.repo.claim(
+            self.user_id,
+            cache_key[1],
+            self.fingerprint,
+            now + timedelta(seconds=self.lease_seconds),
+        )
+        if row is not None:
+            if row.status_code is None:
+                raise _in_progress()
+            stored = StoredResponse(
+                fingerprint=row.fingerprint,
+                status_code=row.status_code,
+                body=row.body or "",
+                expires_at=row.expires_at.replace(tzinfo=UTC).timestamp(),
+            )
+            self.cache.put(cache_key, stored)
+            return self._replay(stored)
+
+        expires_at = now + timedelta(seconds=self.cache.ttl_seconds)
+        try:
+            result = handler()
+            stored = StoredResponse(
+                fingerprint=self.fingerprint,
+                status_code=status.HTTP_200_OK,
+                body=result.model_dump_json(),
+                expires_at=expires_at.timestamp(),
+            )
+            self.repo.complete(
+                self.user_id,
+                cache_key[1],
+                stored.status_code,
+                stored.body,
+                expires_at,
+            )
+        except BaseException:
+            self.repo.release(self.user_id, cache_key[1])
+            raise
+        self.cache.put(cache_key, stored)
+        return result
+
+    def _replay(self, stored: StoredResponse) -> Response:
+        if stored.fingerprint != self.fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        headers = {REPLAYED_HEADER: "true"}
+        if negotiated_serializer.get() is not None:
+            # Stored bodies are JSON text; other formats re-encode on replay.
+            return NegotiatedResponse(
+                json.loads(stored.body), stored.status_code, headers
+            )
+        return Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers=headers,
+        )
+
+
+def _in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still in progress",
+        headers={"Retry-After": "1"},
+    )
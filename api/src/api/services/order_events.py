@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import select
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from sqlalchemy import Engine
+
+from api.repositories.order import ORDER_STATUS_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """The latest status seen by one connection; older updates are overwritten."""
+
+    __slots__ = ("_event", "status")
+
+    def __init__(self) -> None:
+        self.status: str | None = None
+        self._event = asyncio.Event()
+
+    def push(self, status: str) -> None:
+        self.status = status
+        self._event.set()
+
+    async def next(self, wait_seconds: float) -> str | None:
+        """Wait for the next status, or return None after ``wait_seconds``."""
+        try:
+            await asyncio.wait_for(self._event.wait(), wait_seconds)
+        except TimeoutError:
+            return None
+        self._event.clear()
+        return self.status
+
+
+class OrderEventHub:
+    """Fans order status changes out to every subscribed connection.
+
+    Subscriptions live on the event loop; ``publish`` may be called from any
+    thread, e.g. the NOTIFY listener.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    @contextmanager
+    def subscribe(self, user_id: int) -> Iterator[Subscription]:
+        subscription = Subscription()
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def publish(self, user_id: int, status: str) -> None:
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._deliver, user_id, status)
+
+    def _deliver(self, user_id: int, status: str) -> None:
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription.push(status)
+
+
+class OrderStatusListener(threading.Thread):
+    """Relays ``LISTEN order_status`` notifications into an :class:`OrderEventHub`.
+
+    One database connection per worker serves every SSE client; it is
+    re-established with backoff if it drops.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        hub: OrderEventHub,
+        poll_seconds: float = 5,
+    ) -> None:
+        super().__init__(name="order-status-listener", daemon=True)
+        self.engine = engine
+        self.hub = hub
+        self.poll_seconds = poll_seconds
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+                backoff = 1.0
+            except self.engine.dialect.loaded_dbapi.Error:
+                logger.warning("Order status listener disconnected", exc_info=True)
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def _listen(self) -> None:
+        cargs, cparams = self.engine.dialect.create_connect_args(self.engine.url)
+        conn = self.engine.dialect.connect(*cargs, **cparams)
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {ORDER_STATUS_CHANNEL}")
+            while not self._stop_event.is_set():
+                for payload in self._wait_for_payloads(conn):
+                    self._relay(payload)
+        finally:
+            conn.close()
+
+    def _relay(self, payload: str) -> None:
+        user_id, _, status = payload.partition(":")
+        try:
+            self.hub.publish(int(user_id), status)
+        except ValueError:
+            logger.warning("Ignoring malformed order status payload %r", payload)
+
+    def _wait_for_payloads(self, conn: Any) -> list[str]:  # noqa: ANN401
+        if not hasattr(conn, "poll"):
+            # psycopg 3 exposes notifications as a generator instead.
+            notifies = conn.notifies(timeout=self.poll_seconds, stop_after=1)
+            return [notify.payload for notify in notifies]
+
+        readable, _, _ = select.select([conn], [], [], self.poll_seconds)
+        if not readable:
+            return []
+        conn.poll()
+        payloads = [notify.payload for notify in conn.notifies]
+        conn.notifies.clear()
+        return payloads
+
+
+order_event_hub = OrderEventHub()
+
+
+def get_order_event_hub() -> OrderEventHub:
+    return order_event_hub
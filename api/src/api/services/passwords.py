@@ -0,0 +1,104 @@
+import argparse
+import time
+from typing import TYPE_CHECKING
+
+from api.settings import Settings, get_settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+BCRYPT_ROUNDS_RANGE = range(4, 32)
+
+
+def build_pwd_context(settings: Settings) -> "CryptContext":
+    """
+    Hash new passwords with ``settings.hashing_scheme``. The other scheme
+    stays verifiable but deprecated, and hashes below the configured cost
+    need an update, so ``needs_update`` drives rehash-on-login.
+    """
+    from passlib.context import CryptContext  # noqa: PLC0415
+
+    schemes = ["bcrypt", "argon2"]
+    schemes.sort(key=lambda scheme: scheme != settings.hashing_scheme)
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        bcrypt__rounds=settings.bcrypt_rounds,
+        bcrypt__min_rounds=settings.bcrypt_rounds,
+        argon2__type="ID",
+        argon2__memory_cost=settings.argon2_memory_cost,
+        argon2__time_cost=settings.argon2_time_cost,
+        argon2__parallelism=settings.argon2_parallelism,
+    )
+
+
+def time_hash(context: "CryptContext", samples: int = 3) -> float:
+    """Median seconds one hash (and thus one login) costs with ``context``."""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash("calibration-password")
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_bcrypt(settings: Settings, target_seconds: float) -> tuple[int, float]:
+    """Highest rounds whose hash time stays within ``target_seconds``."""
+    rounds, seconds = BCRYPT_ROUNDS_RANGE.start, 0.0
+    for candidate in BCRYPT_ROUNDS_RANGE:
+        trial = settings.model_copy(
+            update={"hashing_scheme": "bcrypt", "bcrypt_rounds": candidate}
+        )
+        elapsed = time_hash(build_pwd_context(trial))
+        if elapsed > target_seconds:
+            break
+        rounds, seconds = candidate, elapsed
+        # Each extra round doubles the cost; stop before a run gets slow.
+        if elapsed * 2 > target_seconds:
+            break
+    return rounds, seconds
+
+
+def calibrate_argon2(settings: Settings, target_seconds: float) -> tuple[int, float]:
+    """Highest time cost at the configured memory that fits ``target_seconds``."""
+    time_cost, seconds = 1, 0.0
+    for candidate in range(1, 65):
+        trial = settings.model_copy(
+            update={"hashing_scheme": "argon2", "argon2_time_cost": candidate}
+        )
+        elapsed = time_hash(build_pwd_context(trial))
+        if elapsed > target_seconds:
+            break
+        time_cost, seconds = candidate, elapsed
+    return time_cost, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Suggest hashing parameters that meet a login latency target."
+    )
+    parser.add_argument("--target-ms", type=float, default=250)
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"])
+    args = parser.parse_args()
+
+    settings = get_settings()
+    scheme = args.scheme or settings.hashing_scheme
+    target_seconds = args.target_ms / 1000
+    current = time_hash(build_pwd_context(settings))
+    print(f"current {settings.hashing_scheme}: {current * 1000:.0f} ms per hash")  # noqa: T201
+
+    if scheme == "bcrypt":
+        rounds, seconds = calibrate_bcrypt(settings, target_seconds)
+        suggestion = f"HASHING_SCHEME=bcrypt BCRYPT_ROUNDS={rounds}"
+    else:
+        time_cost, seconds = calibrate_argon2(settings, target_seconds)
+        suggestion = (
+            f"HASHING_SCHEME=argon2 ARGON2_TIME_COST={time_cost} "
+            f"ARGON2_MEMORY_COST={settings.argon2_memory_cost} "
+            f"ARGON2_PARALLELISM={settings.argon2_parallelism}"
+        )
+    print(f"{suggestion}  # {seconds * 1000:.0f} ms per hash")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
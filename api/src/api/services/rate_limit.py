@@ -0,0 +1,172 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import cache
+from typing import Annotated, Any, Protocol
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+from api.settings import get_settings
+
+
+class RateLimitBackend(Protocol):
+    def hit(self, key: str) -> float:
+        """Consume one request for ``key``; return seconds to wait, 0 if allowed."""
+        ...
+
+
+class MemoryRateLimiter:
+    """Token buckets kept as ``(tokens, updated_at)`` tuples in a bounded LRU.
+
+    Buckets refill continuously, so the limit behaves like a sliding window
+    of ``window_seconds``. When ``max_keys`` is exceeded the least recently
+    used bucket is dropped, which bounds memory under key-spraying attacks.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window_seconds: float,
+        max_keys: int = 100_000,
+    ) -> None:
+        self.capacity = float(limit)
+        self.refill_rate = limit / window_seconds
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / self.refill_rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+# Checks the weighted count and increments only when the hit is admitted,
+# atomically, so rejected requests never count against the window.
+_SLIDING_WINDOW_HIT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[2]) + current + 1 > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('INCR', KEYS[1])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class RedisRateLimiter:
+    """Sliding-window counter shared by every worker through Redis.
+
+    Each key keeps one counter per fixed window; the previous window is
+    weighted by how much of it still overlaps the sliding window. A Lua
+    script checks and increments in one round trip, and only admitted
+    hits are counted, like the in-memory buckets.
+    """
+
+    def __init__(
+        self,
+        client: Any,  # noqa: ANN401
+        limit: int,
+        window_seconds: float,
+        prefix: str = "ratelimit:",
+    ) -> None:
+        self.client = client
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.prefix = prefix
+        self._hit = client.register_script(_SLIDING_WINDOW_HIT)
+
+    def hit(self, key: str) -> float:
+        now = time.time()
+        window = int(now // self.window_seconds)
+        elapsed = now - window * self.window_seconds
+        # The hash tag keeps both windows of a key in one cluster slot.
+        current_key = f"{self.prefix}{{{key}}}:{window}"
+        previous_key = f"{self.prefix}{{{key}}}:{window - 1}"
+
+        overlap = 1 - elapsed / self.window_seconds
+        admitted = self._hit(
+            keys=[current_key, previous_key],
+            args=[self.limit, repr(overlap), int(self.window_seconds * 2000)],
+        )
+        if admitted:
+            return 0.0
+        return self.window_seconds - elapsed
+
+
+@cache
+def get_rate_limit_backend() -> RateLimitBackend:
+    settings = get_settings()
+    if settings.rate_limit_redis_url is None:
+        return MemoryRateLimiter(
+            limit=settings.auth_rate_limit,
+            window_seconds=settings.auth_rate_limit_window_seconds,
+            max_keys=settings.rate_limit_max_keys,
+        )
+
+    import redis  # noqa: PLC0415
+
+    return RedisRateLimiter(
+        client=redis.Redis.from_url(settings.rate_limit_redis_url),
+        limit=settings.auth_rate_limit,
+        window_seconds=settings.auth_rate_limit_window_seconds,
+    )
+
+
+async def _read_username(request: Request, field: str) -> str | None:
+    if request.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = await request.json()
+        except ValueError:
+            return None
+        value = body.get(field) if isinstance(body, dict) else None
+    else:
+        value = (await request.form()).get(field)
+    return value if isinstance(value, str) else None
+
+
+class RateLimit:
+    """Dependency rejecting requests with 429 once a client or account is over limit.
+
+    Buckets are keyed by client IP and by the submitted username, so a single
+    address cannot spray many accounts and many addresses cannot hammer one
+    account. It runs before the endpoint, i.e. before any hashing or DB work.
+    """
+
+    def __init__(self, scope: str, username_field: str) -> None:
+        self.scope = scope
+        self.username_field = username_field
+
+    async def __call__(
+        self,
+        request: Request,
+        backend: Annotated[RateLimitBackend, Depends(get_rate_limit_backend)],
+    ) -> None:
+        keys = [f"{self.scope}:ip:{request.client.host if request.client else '-'}"]
+        username = await _read_username(request, self.username_field)
+        if username:
+            keys.append(f"{self.scope}:user:{username.lower()}")
+
+        # Backends may block on the network (Redis), so they run off the loop.
+        retry_after = await run_in_threadpool(
+            lambda: max(backend.hit(key) for key in keys)
+        )
+        if retry_after > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
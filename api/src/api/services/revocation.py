@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from api.repositories.token import TokenRepository
+
+logger = logging.getLogger(__name__)
+
+
+class TokenDenylist:
+    """Revoked access-token IDs (``jti``), each kept until the token's ``exp``.
+
+    Entries only live as long as the token would have, so the map holds at
+    most one access-token lifetime of logouts. Lookups are a single dict
+    probe and skip the lock, which only orders writers.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, jti: str, expires_at: int) -> None:
+        with self._lock:
+            self._entries[jti] = expires_at
+
+    def is_revoked(self, jti: str, now: float | None = None) -> bool:
+        expires_at = self._entries.get(jti)
+        return expires_at is not None and expires_at > (now or time.time())
+
+    def expire(self, now: float | None = None) -> int:
+        """Drop entries whose token has expired anyway; returns how many."""
+        now = now or time.time()
+        with self._lock:
+            expired = [jti for jti, exp in self._entries.items() if exp <= now]
+            for jti in expired:
+                del self._entries[jti]
+        return len(expired)
+
+
+class DenylistSync(threading.Thread):
+    """Polls ``revoked_token`` so revocations made by other workers apply here.
+
+    Each poll reads only rows past the last seen ``revocation_id``, so a
+    quiet table costs one index probe. Revocations made by this worker are
+    added to the denylist directly and apply at once.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        denylist: TokenDenylist,
+        poll_seconds: float,
+    ) -> None:
+        super().__init__(name="token-denylist-sync", daemon=True)
+        self.session_factory = session_factory
+        self.denylist = denylist
+        self.poll_seconds = poll_seconds
+        self.cursor = 0
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def poll(self) -> int:
+        with self.session_factory() as db:
+            rows = TokenRepository(db).revocations_since(self.cursor)
+        for row in rows:
+            self.denylist.add(row.jti, row.expires_at)
+        if rows:
+            self.cursor = rows[-1].revocation_id
+        self.denylist.expire()
+        return len(rows)
+
+    def run(self) -> None:
+        while True:
+            try:
+                self.poll()
+            except SQLAlchemyError:
+                logger.warning("Token denylist poll failed", exc_info=True)
+            if self._stop_event.wait(self.poll_seconds):
+                return
+
+
+token_denylist = TokenDenylist()
+
+
+def get_token_denylist() -> TokenDenylist:
+    return token_denylist
@@ -0,0 +1,136 @@
+import json
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import TypeAdapter
+
+from api.settings import Settings
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@dataclass(frozen=True, slots=True)
+class Serializer:
+    media_type: str
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+
+def _json() -> Serializer:
+    return Serializer(
+        JSON_MEDIA_TYPE,
+        lambda value: json.dumps(
+            value, ensure_ascii=False, separators=(",", ":")
+        ).encode(),
+        json.loads,
+    )
+
+
+def _msgpack() -> Serializer:
+    import msgpack  # noqa: PLC0415
+
+    return Serializer("application/msgpack", msgpack.packb, msgpack.unpackb)
+
+
+_FACTORIES: dict[str, Callable[[], Serializer]] = {"msgpack": _msgpack}
+# Media types clients commonly send for a registered format.
+_ALIASES = {"application/x-msgpack": "application/msgpack"}
+
+
+def build_serializers(settings: Settings) -> dict[str, Serializer]:
+    """
+    Serializers by media type, JSON first; formats whose library is not
+    installed are skipped.
+    """
+    serializers = {JSON_MEDIA_TYPE: _json()}
+    for name in settings.serialization_formats:
+        try:
+            serializer = _FACTORIES[name]()
+        except ImportError:
+            continue
+        serializers[serializer.media_type] = serializer
+    for alias, media_type in _ALIASES.items():
+        if media_type in serializers:
+            serializers[alias] = serializers[media_type]
+    return serializers
+
+
+def media_type_of(content_type: str) -> str:
+    return content_type.partition(";")[0].strip().lower()
+
+
+def negotiate_format(
+    accept: str, serializers: dict[str, Serializer]
+) -> Serializer | None:
+    """
+    The serializer to re-encode JSON responses with, or None to keep JSON.
+    JSON wins ties, so ``*/*`` and missing headers never change anything.
+    """
+    weights: dict[str, float] = {}
+    for item in accept.split(","):
+        media_type, _, params = item.partition(";")
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, raw = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    weight = float(raw)
+                except ValueError:
+                    weight = 0.0
+        weights[media_type.strip().lower()] = weight
+
+    best = None
+    best_weight = weights.get(
+        JSON_MEDIA_TYPE, weights.get("application/*", weights.get("*/*", 0.0))
+    )
+    for media_type, serializer in serializers.items():
+        weight = weights.get(media_type, 0.0)
+        if serializer.media_type != JSON_MEDIA_TYPE and weight > best_weight:
+            best, best_weight = serializer, weight
+    return best
+
+
+# The format ContentNegotiationMiddleware picked for the current response;
+# None keeps JSON.
+negotiated_serializer: ContextVar[Serializer | None] = ContextVar(
+    "negotiated_serializer", default=None
+)
+
+
+class NegotiatedResponse(JSONResponse):
+    """
+    Default response class: FastAPI hands it the JSON-mode dump of the
+    route's return value, which is packed in the negotiated format as is.
+    """
+
+    def render(self, content: Any) -> bytes:  # noqa: ANN401
+        serializer = negotiated_serializer.get()
+        if serializer is None:
+            return super().render(content)
+        self.media_type = serializer.media_type
+        return serializer.dumps(content)
+
+
+def encode_response(
+    adapter: TypeAdapter[Any],
+    value: Any,  # noqa: ANN401
+    *,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    Encode a validated value in the negotiated format. JSON comes straight
+    from pydantic-core; other formats pack its JSON-mode Python dump.
+    """
+    serializer = negotiated_serializer.get()
+    if serializer is None:
+        return Response(
+            adapter.dump_json(value), media_type=JSON_MEDIA_TYPE, headers=headers
+        )
+    return Response(
+        serializer.dumps(adapter.dump_python(value, mode="json")),
+        media_type=serializer.media_type,
+        headers=headers,
+    )
@@ -0,0 +1,105 @@
+import threading
+from collections.abc import Callable, Hashable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from sqlalchemy import Row
+
+from api.db.schemes import Base
+
+
+@dataclass
+class FlightStats:
+    calls: int = 0
+    loads: int = 0
+    coalesced: int = 0
+
+
+_stats: dict[str, FlightStats] = {}
+
+
+def single_flight_stats() -> dict[str, dict[str, int]]:
+    """Counters of every flight group; ``coalesced`` calls never hit the loader."""
+    return {name: asdict(stats) for name, stats in _stats.items()}
+
+
+class _Call:
+    __slots__ = ("done", "error", "value")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one run of the loader.
+
+    For the threadpool path: the first caller loads, later callers block
+    until it finishes and receive the same value or exception. Nothing is
+    cached afterwards; the next miss loads again.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.stats = _stats.setdefault(name, FlightStats())
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do[T](self, key: Hashable, load: Callable[[], T]) -> tuple[T, bool]:
+        """Return ``(value, shared)``; ``shared`` is True for coalesced callers."""
+        with self._lock:
+            self.stats.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.stats.loads += 1
+            else:
+                self.stats.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = load()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+
+def _holds_entity(value: object) -> bool:
+    if isinstance(value, Base):
+        return True
+    if isinstance(value, list | tuple | Row):
+        return any(_holds_entity(item) for item in value)
+    return False
+
+
+def _shareable[T](value: T) -> T:
+    if _holds_entity(value):
+        msg = "ORM entities cannot be shared between sessions; load rows instead"
+        raise TypeError(msg)
+    return value
+
+
+def load_coalesced[T](
+    flight: SingleFlight,
+    key: Hashable,
+    load: Callable[[], T],
+) -> T:
+    """
+    Run ``load`` through ``flight``. The value is handed to every waiting
+    thread as is, so it must be immutable: Core rows or plain values, never
+    ORM entities, which belong to the leader's session and thread. The
+    leader checks the loaded value, including list, tuple and row items.
+    """
+    value, _ = flight.do(key, lambda: _shareable(load()))
+    return value
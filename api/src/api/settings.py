@@ -1,4 +1,6 @@
 from functools import cache
+from pathlib import Path
+from typing import Literal
 
 from pydantic import PostgresDsn, SecretStr, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -12,6 +14,77 @@ class Settings(BaseSettings):
     token_secret_key: SecretStr
     token_algorithm: str
 
+    hashing_scheme: Literal["bcrypt", "argon2"] = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2_memory_cost: int = 64 * 1024
+    argon2_time_cost: int = 3
+    argon2_parallelism: int = 4
+
+    db_warmup_connections: int = 1
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 5
+    # Worker threads for sync routes; None sizes it to the whole DB pool so
+    # threads never queue on connection checkout.
+    threadpool_tokens: int | None = None
+
+    admission_auth_limit: int = 6
+    admission_cart_limit: int = 12
+    admission_catalogue_limit: int = 12
+    admission_retry_after_seconds: int = 1
+    db_prepare_threshold: int | None = 2
+
+    auth_rate_limit: int = 10
+    auth_rate_limit_window_seconds: float = 60
+    rate_limit_max_keys: int = 100_000
+    rate_limit_redis_url: str | None = None
+
+    token_denylist_sync: bool = True
+    token_denylist_poll_seconds: float = 1
+
+    idempotency_ttl_seconds: float = 24 * 60 * 60
+    idempotency_max_keys: int = 100_000
+    idempotency_wait_seconds: float = 10
+    # A key left in flight longer than this (a crashed worker) can be reclaimed.
+    idempotency_lease_seconds: float = 60
+
+    compression_encodings: tuple[Literal["br", "zstd", "gzip"], ...] = (
+        "br",
+        "zstd",
+        "gzip",
+    )
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_zstd_level: int = 3
+    compression_cache_entries: int = 256
+
+    serialization_formats: tuple[Literal["msgpack"], ...] = ("msgpack",)
+
+    catalogue_dir: Path | None = None
+    catalogue_max_age_seconds: float = 300
+    feed_max_age_seconds: int = 30
+
+    profiling_dir: Path | None = None
+    profiling_secret: SecretStr | None = None
+    profiling_sample_rate: float = 0
+    profiling_interval_seconds: float = 0.001
+    profiling_max_files: int = 50
+
+    # Minimum time the order worker keeps an order queued and preparing.
+    order_queued_seconds: float = 30
+    order_preparing_seconds: float = 600
+
+    order_events_listen: bool = True
+    order_events_heartbeat_seconds: float = 15
+
+    dispatch_interval_seconds: float = 5
+    dispatch_max_orders: int = 10_000
+    dispatch_batch_size: int = 3
+    dispatch_max_drop_km: float = 2
+    dispatch_max_pickup_km: float = 10
+    dispatch_solver: Literal["greedy", "hungarian"] = "greedy"
+
     @classmethod
     @field_validator("db")
     def check_db_name(cls, value: PostgresDsn) -> PostgresDsn:
@@ -20,6 +93,12 @@ class Settings(BaseSettings):
 
         raise ValueError
 
+    @field_validator("db_prepare_threshold", mode="before")
+    @classmethod
+    def empty_prepare_threshold(cls, value: object) -> object:
+        # ``DB_PREPARE_THRESHOLD=`` turns server-side prepares off.
+        return None if value == "" else value
+
     model_config = SettingsConfigDict(
         frozen=True,
         env_file=".env",
@@ -0,0 +1,159 @@
+import argparse
+import logging
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+
+from anyio import to_thread
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import configure_mappers
+
+from api.db.database import get_engine
+from api.settings import Settings
+
+logger = logging.getLogger(__name__)
+
+_READY_SCRIPT = """
+import asyncio
+import time
+
+started = time.perf_counter()
+from {module} import app
+
+imported = time.perf_counter()
+
+
+async def _ready() -> float:
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+
+ready = asyncio.run(_ready())
+print(imported - started, ready - started)
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+@dataclass(frozen=True, slots=True)
+class StartupReport:
+    imports: list[ImportTiming]
+    import_seconds: float
+    ready_seconds: float
+
+
+def size_threadpool(settings: Settings) -> int:
+    """
+    Match AnyIO's thread limiter for sync routes to the DB pool capacity.
+    Must run on the event loop, e.g. in the lifespan hook.
+    """
+    tokens = settings.threadpool_tokens or (
+        settings.db_pool_size + settings.db_max_overflow
+    )
+    to_thread.current_default_thread_limiter().total_tokens = tokens
+    return tokens
+
+
+def warm_up(settings: Settings) -> None:
+    """Pay one-off startup costs before the worker accepts traffic."""
+    configure_mappers()
+
+    # Hot caches: the password context and the JWT backend are lazily imported.
+    from jose import jwt  # noqa: F401, PLC0415
+
+    from api.repositories.user import get_pwd_context  # noqa: PLC0415
+
+    get_pwd_context()
+
+    if settings.db_warmup_connections <= 0:
+        return
+
+    engine = get_engine(settings)
+    connections = []
+    try:
+        connections.extend(
+            engine.connect() for _ in range(settings.db_warmup_connections)
+        )
+    except SQLAlchemyError:
+        logger.warning("Database pool warm-up failed", exc_info=True)
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """Parse the ``-X importtime`` log into per-module timings."""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue
+        timings.append(
+            ImportTiming(
+                module=module.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    return timings
+
+
+def build_report(module: str = "api.main") -> StartupReport:
+    """Import ``module`` in a fresh interpreter and time it until ready."""
+    imports = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    ready = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", _READY_SCRIPT.format(module=module)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_seconds, ready_seconds = map(float, ready.stdout.split())
+
+    return StartupReport(
+        imports=parse_importtime(imports.stderr),
+        import_seconds=import_seconds,
+        ready_seconds=ready_seconds,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report API worker startup time.")
+    parser.add_argument("--module", default="api.main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = build_report(args.module)
+
+    packages: dict[str, int] = {}
+    for timing in report.imports:
+        package = timing.module.split(".", 1)[0]
+        packages[package] = packages.get(package, 0) + timing.self_us
+
+    print(f"import {args.module}: {report.import_seconds * 1000:.1f} ms")  # noqa: T201
+    print(f"time to ready:      {report.ready_seconds * 1000:.1f} ms")  # noqa: T201
+    print("\nslowest packages (self time):")  # noqa: T201
+    for package, self_us in sorted(packages.items(), key=lambda p: -p[1])[: args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")  # noqa: T201
+    print("\nslowest modules (cumulative):")  # noqa: T201
+    slowest = sorted(report.imports, key=lambda t: -t.cumulative_us)[: args.top]
+    for timing in slowest:
+        print(f"  {timing.cumulative_us / 1000:8.1f} ms  {timing.module}")  # noqa: T201
+    print(f"\nreport took {time.perf_counter() - started:.1f} s")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import logging
+import signal
+import threading
+from types import FrameType
+
+from sqlalchemy.orm import sessionmaker
+
+from api.db.database import get_engine, get_session_local
+from api.models.order import OrderStatus
+from api.repositories.order import OrderRepository
+from api.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(  # noqa: PLR0913
+    session_local: sessionmaker,
+    batch_size: int,
+    poll_interval: float,
+    stop: threading.Event,
+    *,
+    min_seconds: dict[str, float] | None = None,
+    once: bool = False,
+) -> int:
+    """Advance queued orders until stopped; return how many transitions ran.
+
+    Batches are claimed with ``FOR UPDATE SKIP LOCKED``, so any number of
+    workers can run side by side without processing an order twice.
+    ``min_seconds`` holds each order in a status for at least that long.
+    """
+    processed = 0
+    while not stop.is_set():
+        with session_local() as db:
+            advanced = OrderRepository(db).advance_orders(batch_size, min_seconds)
+        processed += len(advanced)
+        if advanced:
+            logger.debug("Advanced %d orders", len(advanced))
+            continue
+        if once:
+            break
+        stop.wait(poll_interval)
+    return processed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process queued orders.")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="exit once the queue is drained",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+
+    def _stop(signum: int, _frame: FrameType | None) -> None:
+        logger.info("Received signal %d, finishing current batch", signum)
+        stop.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    settings = get_settings()
+    session_local = get_session_local(get_engine(settings))
+    processed = run_worker(
+        session_local,
+        args.batch_size,
+        args.poll_interval,
+        stop,
+        min_seconds={
+            OrderStatus.QUEUED: settings.order_queued_seconds,
+            OrderStatus.PREPARING: settings.order_preparing_seconds,
+        },
+        once=args.once,
+    )
+    logger.info("Worker stopped after %d transitions", processed)
+
+
+if __name__ == "__main__":
+    main()
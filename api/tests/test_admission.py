@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+
+from anyio import to_thread
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.middleware.admission import AdmissionControlMiddleware
+from api.routers import metrics
+from api.settings import get_settings
+from api.startup import size_threadpool
+
+
+def test_overloaded_route_class_is_shed_while_others_pass() -> None:
+    entered = threading.Event()
+    release = threading.Event()
+    app = FastAPI()
+
+    @app.post("/order/orders/items")
+    def slow_cart() -> dict:
+        entered.set()
+        release.wait(5)
+        return {"ok": True}
+
+    @app.get("/restaurant/restaurants/")
+    def browse() -> list:
+        return []
+
+    settings = get_settings().model_copy(
+        update={"admission_cart_limit": 1, "admission_retry_after_seconds": 2}
+    )
+    app.add_middleware(AdmissionControlMiddleware, settings=settings)
+    app.include_router(metrics.router, prefix="/metrics")
+
+    with TestClient(app) as client:
+        first = []
+        worker = threading.Thread(
+            target=lambda: first.append(client.post("/order/orders/items"))
+        )
+        worker.start()
+        assert entered.wait(5)
+
+        shed = client.post("/order/orders/items")
+        browse_response = client.get("/restaurant/restaurants/")
+        release.set()
+        worker.join()
+        stats = client.get("/metrics/admission").json()
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "2"
+    assert browse_response.status_code == 200
+    assert first[0].status_code == 200
+    assert stats["cart"] == {
+        "limit": 1,
+        "in_flight": 0,
+        "admitted": 1,
+        "shed": 1,
+    }
+
+
+def test_each_app_reports_its_own_admission_stats() -> None:
+    clients = []
+    for limit in (1, 2):
+        app = FastAPI()
+        settings = get_settings().model_copy(update={"admission_cart_limit": limit})
+        app.add_middleware(AdmissionControlMiddleware, settings=settings)
+        app.include_router(metrics.router, prefix="/metrics")
+        clients.append(TestClient(app))
+
+    clients[0].get("/order/orders/")
+    stats = [client.get("/metrics/admission").json()["cart"] for client in clients]
+
+    assert [s["limit"] for s in stats] == [1, 2]
+    assert [s["admitted"] for s in stats] == [1, 0]
+
+
+async def test_threadpool_matches_db_pool() -> None:
+    settings = get_settings().model_copy(
+        update={"db_pool_size": 7, "db_max_overflow": 3, "threadpool_tokens": None}
+    )
+    assert size_threadpool(settings) == 10
+    assert to_thread.current_default_thread_limiter().total_tokens == 10
@@ -5,6 +5,7 @@ import pytest
 
 from api.dependencies import get_db, get_settings
 from api.routers import auth
+from api.services.revocation import TokenDenylist, get_token_denylist
 
 
 class DummyUser:
@@ -24,6 +25,9 @@ class DummyUserRepo:
     def verify_password(self, plain: str, stored: str) -> bool:
         return plain == stored
 
+    def rehash_password_if_needed(self, user: DummyUser, plain: str) -> None:
+        self.rehashed = user.username
+
 
 class DummyTokenRepo:
     def __init__(self) -> None:
@@ -38,11 +42,17 @@ class DummyTokenRepo:
     def revoke_refresh_token(self, user_id: int, token: str) -> None:
         self.tokens.get(user_id, set()).discard(token)
 
+    def revoke_access_token(self, jti: str, expires_at: int) -> None:
+        self.revoked_access = (jti, expires_at)
+
+
+@pytest.fixture
+def user_repo() -> DummyUserRepo:
+    return DummyUserRepo([DummyUser(1, "alice", "pw")])
+
 
 @pytest.fixture
-def setup_auth(client, monkeypatch: pytest.MonkeyPatch):
-    user = DummyUser(1, "alice", "pw")
-    user_repo = DummyUserRepo([user])
+def setup_auth(client, monkeypatch: pytest.MonkeyPatch, user_repo: DummyUserRepo):
     token_repo = DummyTokenRepo()
 
     monkeypatch.setattr(auth, "UserRepository", lambda db: user_repo)
@@ -52,9 +62,12 @@ def setup_auth(client, monkeypatch: pytest.MonkeyPatch):
     def fake_verify(token: str, settings) -> dict[str, str]:
         if token in {"refresh", "old", "ref"}:
             return {"sub": "1"}
+        if token == "access":
+            return {"sub": "1", "jti": "j1", "exp": 4102444800}
         raise Exception("bad token")
 
     monkeypatch.setattr(auth, "verify_token", fake_verify)
+    monkeypatch.setattr(auth, "access_token_claims", fake_verify)
 
     client.app.dependency_overrides[get_db] = lambda: None
     client.app.dependency_overrides[get_settings] = lambda: SimpleNamespace(access_token_expire_minutes=1)
@@ -69,6 +82,13 @@ def test_login_success(setup_auth) -> None:
     assert token_repo.is_refresh_token_valid(1, "refresh")
 
 
+def test_login_rehashes_password(setup_auth, user_repo: DummyUserRepo) -> None:
+    client, _ = setup_auth
+    response = client.post("/auth/login", data={"username": "alice", "password": "pw"})
+    assert response.status_code == 200
+    assert user_repo.rehashed == "alice"
+
+
 def test_login_invalid_credentials(setup_auth) -> None:
     client, _ = setup_auth
     response = client.post("/auth/login", data={"username": "alice", "password": "wrong"})
@@ -105,3 +125,20 @@ def test_logout_invalid_token(setup_auth, monkeypatch: pytest.MonkeyPatch) -> No
     monkeypatch.setattr(auth, "verify_token", lambda token, settings: (_ for _ in ()).throw(Exception("bad")))
     response = client.post("/auth/logout", json={"refresh_token": "bad"})
     assert response.status_code == 401
+
+
+def test_logout_revokes_the_access_token(setup_auth) -> None:
+    client, token_repo = setup_auth
+    denylist = TokenDenylist()
+    client.app.dependency_overrides[get_token_denylist] = lambda: denylist
+    token_repo.add_refresh_token(1, "ref", 0)
+
+    response = client.post(
+        "/auth/logout",
+        json={"refresh_token": "ref"},
+        headers={"Authorization": "Bearer access"},
+    )
+
+    assert response.status_code == 200
+    assert token_repo.revoked_access == ("j1", 4102444800)
+    assert denylist.is_revoked("j1")
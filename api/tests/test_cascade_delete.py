@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import Engine, create_engine, event, func, select
+from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import Session
+
+from api.db.schemes import (
+    Base,
+    Dish,
+    Order,
+    OrderDish,
+    RefreshToken,
+    Restaurant,
+    User,
+)
+from api.repositories.restaurant import RestaurantRepository
+from api.repositories.user import UserRepository
+
+DISHES = 2000
+CUSTOMERS = 50
+
+
+@pytest.fixture
+def engine(monkeypatch: pytest.MonkeyPatch) -> Iterator[Engine]:
+    engine = create_engine("sqlite://")
+    # SQLite can't autoincrement one column of a composite primary key.
+    monkeypatch.setattr(Dish.__table__.c.dish_id, "autoincrement", False)
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, _record) -> None:  # noqa: ANN001
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine: Engine) -> Iterator[Session]:
+    with Session(engine) as session:
+        session.add(Restaurant(restaurant_id=1, name="R", address="a", phone="p"))
+        session.add_all(
+            Dish(dish_id=i, restaurant_id=1, name=f"d{i}", price_cents=100)
+            for i in range(1, DISHES + 1)
+        )
+        for user_id in range(1, CUSTOMERS + 1):
+            session.add(
+                User(user_id=user_id, name="u", phone="p", address="a", password="x")
+            )
+            session.add(Order(user_id=user_id, status="pending", payment_method="-"))
+            session.add(
+                RefreshToken(
+                    user_id=user_id,
+                    token=f"t{user_id}",
+                    expires_at=datetime.now(UTC) + timedelta(days=1),
+                )
+            )
+            session.add_all(
+                OrderDish(user_id=user_id, restaurant_id=1, dish_id=d, quantity=1)
+                for d in range(1, 21)
+            )
+        session.commit()
+        yield session
+
+
+def record_statements(engine: Engine) -> list[str]:
+    statements: list[str] = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(_conn, _cursor, statement, *_args) -> None:  # noqa: ANN001
+        statements.append(statement)
+
+    return statements
+
+
+def count(db: Session, model: type) -> int:
+    return db.scalar(select(func.count()).select_from(model))
+
+
+def test_delete_restaurant_is_one_delete_plus_its_tombstone(
+    engine: Engine, db: Session
+) -> None:
+    statements = record_statements(engine)
+
+    RestaurantRepository(db).delete_restaurant(1)
+
+    # Plus the tombstone for the catalogue change feed.
+    assert len(statements) == 2
+    assert statements[0].startswith("DELETE FROM restaurant")
+    assert statements[1].startswith("INSERT INTO catalogue_change")
+    assert count(db, Dish) == 0
+    assert count(db, OrderDish) == 0
+
+
+def test_delete_user_is_a_single_statement(engine: Engine, db: Session) -> None:
+    user = db.get(User, 1)
+    db.refresh(user)
+    statements = record_statements(engine)
+
+    UserRepository(db).delete_user(user)
+
+    assert len(statements) == 1
+    assert statements[0].startswith("DELETE FROM user")
+    assert count(db, User) == CUSTOMERS - 1
+    assert count(db, Order) == CUSTOMERS - 1
+    assert count(db, RefreshToken) == CUSTOMERS - 1
+    assert count(db, OrderDish) == (CUSTOMERS - 1) * 20
+
+
+def test_delete_missing_restaurant_raises(db: Session) -> None:
+    with pytest.raises(NoResultFound):
+        RestaurantRepository(db).delete_restaurant(404)
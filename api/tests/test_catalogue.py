@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import os
+import time
+
+import pytest
+
+from api.dependencies import get_restaurant_repo
+from api.services.catalogue import CatalogueFiles, get_catalogue
+
+
+class DummyRestaurant:
+    def __init__(self, restaurant_id: int, name: str) -> None:
+        self.restaurant_id = restaurant_id
+        self.name = name
+        self.description = None
+        self.address = "street"
+        self.phone = "123"
+        self.latitude = None
+        self.longitude = None
+
+
+class DummyDish:
+    def __init__(self, dish_id: int, restaurant_id: int, name: str) -> None:
+        self.dish_id = dish_id
+        self.restaurant_id = restaurant_id
+        self.name = name
+        self.description = None
+        self.price_cents = 950
+
+
+class DummyRestaurantRepo:
+    def __init__(self) -> None:
+        self.restaurants = {1: DummyRestaurant(1, "pizza")}
+        self.dishes = {1: [DummyDish(1, 1, "margherita")]}
+        self.reads = 0
+        self.batches: list[list[tuple[int, int]]] = []
+
+    def list_restaurants(self) -> list[DummyRestaurant]:
+        self.reads += 1
+        return list(self.restaurants.values())
+
+    def get_restaurant(self, restaurant_id: int) -> DummyRestaurant | None:
+        self.reads += 1
+        return self.restaurants.get(restaurant_id)
+
+    def list_menu(self, restaurant_id: int) -> list[DummyDish]:
+        return self.dishes.get(restaurant_id, [])
+
+    def get_dishes(self, keys: list[tuple[int, int]]) -> list[DummyDish]:
+        self.batches.append(keys)
+        return [
+            d
+            for dishes in self.dishes.values()
+            for d in dishes
+            if (d.restaurant_id, d.dish_id) in keys
+        ]
+
+
+@pytest.fixture
+def catalogue_setup(client, tmp_path):
+    repo = DummyRestaurantRepo()
+    catalogue = CatalogueFiles(tmp_path, max_age_seconds=60)
+    client.app.dependency_overrides[get_restaurant_repo] = lambda: repo
+    client.app.dependency_overrides[get_catalogue] = lambda: catalogue
+    return client, repo, catalogue
+
+
+def test_rendered_files_are_served_without_the_database(catalogue_setup) -> None:
+    client, repo, catalogue = catalogue_setup
+    assert catalogue.render_all(repo) == 1
+    repo.reads = 0
+
+    index = client.get("/restaurant/restaurants/")
+    menu = client.get("/restaurant/restaurants/1/menu")
+
+    assert index.json()[0]["name"] == "pizza"
+    assert menu.json()["dishes"][0]["name"] == "margherita"
+    assert "etag" in menu.headers
+    assert repo.reads == 0
+
+
+def test_stale_files_are_re_rendered_on_read(catalogue_setup) -> None:
+    client, repo, catalogue = catalogue_setup
+    catalogue.render_all(repo)
+    old = time.time() - 120
+    os.utime(catalogue.menu_path(1), (old, old))
+    repo.dishes[1].append(DummyDish(2, 1, "diavola"))
+    repo.reads = 0
+
+    menu = client.get("/restaurant/restaurants/1/menu")
+    assert [d["name"] for d in menu.json()["dishes"]] == ["margherita", "diavola"]
+    assert catalogue.fresh(catalogue.menu_path(1))
+    assert repo.reads == 1
+    assert client.get("/restaurant/restaurants/1/menu").status_code == 200
+    assert repo.reads == 1
+
+    assert client.get("/restaurant/restaurants/2/menu").status_code == 404
+    assert not catalogue.menu_path(2).exists()
+
+    catalogue.index_path.unlink()
+    assert client.get("/restaurant/restaurants/").json()[0]["name"] == "pizza"
+    assert catalogue.fresh(catalogue.index_path)
+
+
+def test_refresh_replaces_files_atomically(catalogue_setup) -> None:
+    _, repo, catalogue = catalogue_setup
+    catalogue.render_all(repo)
+    repo.restaurants[2] = DummyRestaurant(2, "sushi")
+    repo.dishes[1].append(DummyDish(2, 1, "diavola"))
+    del repo.restaurants[1]
+
+    catalogue.refresh(repo, 2, index=True)
+    catalogue.refresh(repo, 1)
+
+    assert catalogue.menu_path(2).exists()
+    assert not catalogue.menu_path(1).exists()
+    assert b"sushi" in catalogue.index_path.read_bytes()
+    leftovers = [p for p in catalogue.root.rglob("*") if p.name.endswith(".tmp")]
+    assert leftovers == []
+
+
+def test_dish_batch_uses_menu_files_per_key(catalogue_setup) -> None:
+    client, repo, catalogue = catalogue_setup
+    catalogue.render_all(repo)
+    repo.dishes[3] = [DummyDish(1, 3, "ramen")]
+    keys = [
+        {"restaurant_id": 3, "dish_id": 1},
+        {"restaurant_id": 1, "dish_id": 1},
+        {"restaurant_id": 1, "dish_id": 7},
+        {"restaurant_id": 3, "dish_id": 1},
+    ]
+
+    response = client.post("/restaurant/restaurants/dishes/batch", json={"keys": keys})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(r["restaurant_id"], r["dish_id"]) for r in body] == [
+        (k["restaurant_id"], k["dish_id"]) for k in keys
+    ]
+    assert [r["dish"] and r["dish"]["name"] for r in body] == [
+        "ramen",
+        "margherita",
+        None,
+        "ramen",
+    ]
+    assert body[1]["dish"]["price"] == "9.50"
+    assert repo.batches == [[(3, 1)]]
+
+
+def test_dish_batch_is_capped(catalogue_setup) -> None:
+    client, repo, _ = catalogue_setup
+    keys = [{"restaurant_id": 1, "dish_id": i} for i in range(101)]
+
+    response = client.post("/restaurant/restaurants/dishes/batch", json={"keys": keys})
+
+    assert response.status_code == 422
+    assert repo.batches == []
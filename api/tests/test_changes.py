@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from api.db.schemes import Base, CatalogueChange, Dish
+from api.dependencies import get_restaurant_repo
+from api.repositories.restaurant import RestaurantRepository
+from api.services.catalogue import build_changes
+
+
+@pytest.fixture
+def repo(monkeypatch: pytest.MonkeyPatch) -> Iterator[RestaurantRepository]:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    monkeypatch.setattr(Dish.__table__.c.dish_id, "autoincrement", False)
+
+    @event.listens_for(engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, _record) -> None:  # noqa: ANN001
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield RestaurantRepository(session)
+    engine.dispose()
+
+
+def _summary(page) -> list[tuple]:
+    return [(c.operation, c.restaurant_id, c.dish_id) for c in page.changes]
+
+
+def test_writes_are_logged_and_paged_in_order(repo: RestaurantRepository) -> None:
+    head = build_changes(repo, None, 10).next_since
+    pizza = repo.create_restaurant("pizza", "", "street", "123")
+    repo.create_dish(pizza.restaurant_id, "margherita", "", 950)
+    repo.create_dish(pizza.restaurant_id, "diavola", "", 1050)
+    repo.delete_dish(pizza.restaurant_id, 1)
+
+    first = build_changes(repo, head, 2)
+    second = build_changes(repo, first.next_since, 2)
+
+    assert head == 0
+    # Dish 1 is already deleted; its upsert is skipped, the tombstone follows.
+    assert _summary(first) == [("upsert", 1, None)]
+    assert first.changes[0].restaurant.name == "pizza"
+    assert first.has_more
+    assert _summary(second) == [("upsert", 1, 2), ("delete", 1, 1)]
+    assert second.changes[0].dish.price == 1050
+    assert not second.has_more
+    assert build_changes(repo, None, 10).next_since == second.next_since == 4
+
+
+def test_page_keeps_only_the_newest_change_per_key(repo: RestaurantRepository) -> None:
+    pizza = repo.create_restaurant("pizza", "", "street", "123")
+    repo.create_dish(pizza.restaurant_id, "margherita", "", 950)
+    sushi = repo.create_restaurant("sushi", "", "street", "456")
+    repo.delete_restaurant(pizza.restaurant_id)
+
+    page = build_changes(repo, 0, 10)
+
+    # The dish upsert is dropped: its row is gone with the restaurant.
+    assert _summary(page) == [
+        ("upsert", sushi.restaurant_id, None),
+        ("delete", 1, None),
+    ]
+    assert page.next_since == 4
+    assert repo.db.query(CatalogueChange).count() == 4
+
+
+def test_changes_route(client, repo: RestaurantRepository) -> None:
+    client.app.dependency_overrides[get_restaurant_repo] = lambda: repo
+    repo.create_restaurant("pizza", "", "street", "123")
+
+    head = client.get("/restaurant/restaurants/changes")
+    changes = client.get("/restaurant/restaurants/changes", params={"since": 0})
+    empty = client.get("/restaurant/restaurants/changes", params={"since": 1})
+
+    assert head.json() == {"changes": [], "next_since": 1, "has_more": False}
+    assert changes.json()["changes"][0]["restaurant"]["name"] == "pizza"
+    assert empty.json() == {"changes": [], "next_since": 1, "has_more": False}
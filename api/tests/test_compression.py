@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.middleware.compression import (
+    CompressedBodyCache,
+    CompressionMiddleware,
+    GzipCodec,
+    negotiate,
+)
+from api.settings import get_settings
+
+BIG = {"restaurants": [{"name": f"restaurant {i}"} for i in range(200)]}
+
+
+@pytest.fixture
+def compressed_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/big")
+    def big() -> dict:
+        return BIG
+
+    @app.get("/small")
+    def small() -> dict:
+        return {"ok": True}
+
+    @app.get("/precompressed")
+    def precompressed() -> Response:
+        return Response(
+            gzip.compress(b"x" * 4096),
+            media_type="text/plain",
+            headers={"Content-Encoding": "gzip"},
+        )
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(
+            (f"data: {i}\n\n" for i in range(3)), media_type="text/event-stream"
+        )
+
+    settings = get_settings().model_copy(update={"compression_min_size": 500})
+    app.add_middleware(CompressionMiddleware, settings=settings)
+    return TestClient(app)
+
+
+def test_negotiate_prefers_client_weights_then_server_order() -> None:
+    codecs = [GzipCodec(6)]
+    assert negotiate("gzip;q=0.5, br", codecs).name == "gzip"
+    assert negotiate("br, *;q=0", codecs) is None
+    assert negotiate("gzip;q=0", codecs) is None
+    assert negotiate("*", codecs).name == "gzip"
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br", "zstd"])
+def test_large_body_is_compressed(compressed_client, encoding) -> None:
+    pytest.importorskip({"gzip": "gzip", "br": "brotli", "zstd": "zstandard"}[encoding])
+    response = compressed_client.get("/big", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == BIG
+
+
+def test_small_body_is_not_compressed(compressed_client) -> None:
+    response = compressed_client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+
+
+def test_precompressed_body_passes_through(compressed_client) -> None:
+    response = compressed_client.get(
+        "/precompressed", headers={"Accept-Encoding": "br, gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == b"x" * 4096
+
+
+async def test_stream_chunks_are_flushed_individually() -> None:
+    async def app(scope, receive, send) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream")],
+            }
+        )
+        for i in range(3):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b"data: %d\n\n" % i,
+                    "more_body": True,
+                }
+            )
+        await send({"type": "http.response.body", "body": b""})
+
+    messages = []
+
+    async def send(message) -> None:
+        messages.append(message)
+
+    middleware = CompressionMiddleware(app, settings=get_settings())
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    middleware.codecs = [GzipCodec(6)]
+    await middleware(scope, None, send)
+
+    headers = dict(messages[0]["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    events = [decoder.decompress(m["body"]) for m in messages[1:]]
+    assert events == [b"data: 0\n\n", b"data: 1\n\n", b"data: 2\n\n", b""]
+    assert decoder.eof
+
+
+def test_identical_bodies_are_compressed_once() -> None:
+    calls = []
+
+    class CountingCodec(GzipCodec):
+        def compress(self, body: bytes) -> bytes:
+            calls.append(body)
+            return super().compress(body)
+
+    cache = CompressedBodyCache(max_entries=4)
+    codec = CountingCodec(6)
+    first = cache.compress(codec, b"menu" * 500, None)
+    second = cache.compress(codec, b"menu" * 500, None)
+    cache.compress(codec, b"menu" * 500, '"v2"')
+    assert first == second
+    assert len(calls) == 2
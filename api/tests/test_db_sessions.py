@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+from typing import Annotated
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from api.db import database
+from api.db.database import get_db, get_session_local
+from api.middleware.db_sessions import ReleaseSessionsMiddleware
+from api.settings import Settings
+
+
+class FakeSession:
+    def __init__(self) -> None:
+        self.closed = 0
+        self.closed_on: list[str] = []
+
+    def close(self) -> None:
+        self.closed += 1
+        self.closed_on.append(threading.current_thread().name)
+
+
+def test_session_is_released_before_the_body_streams() -> None:
+    session = FakeSession()
+    seen_while_streaming = []
+
+    app = FastAPI()
+    app.add_middleware(ReleaseSessionsMiddleware)
+    app.dependency_overrides[get_session_local] = lambda: lambda: session
+
+    @app.get("/stream")
+    def stream(db: Annotated[FakeSession, Depends(get_db)]) -> StreamingResponse:
+        def body():
+            seen_while_streaming.append(db.closed)
+            yield b"chunk"
+
+        return StreamingResponse(body())
+
+    with TestClient(app) as client:
+        assert client.get("/stream").content == b"chunk"
+
+    assert seen_while_streaming == [1]
+
+
+def test_session_is_released_for_plain_responses() -> None:
+    session = FakeSession()
+    app = FastAPI()
+    app.add_middleware(ReleaseSessionsMiddleware)
+    app.dependency_overrides[get_session_local] = lambda: lambda: session
+
+    @app.get("/")
+    def index(db: Annotated[FakeSession, Depends(get_db)]) -> dict:
+        assert db.closed == 0
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        assert client.get("/").json() == {"ok": True}
+
+    assert session.closed >= 1
+
+
+def test_session_is_closed_off_the_event_loop() -> None:
+    session = FakeSession()
+    app = FastAPI()
+    app.add_middleware(ReleaseSessionsMiddleware)
+    app.dependency_overrides[get_session_local] = lambda: lambda: session
+
+    @app.get("/")
+    async def index(db: Annotated[FakeSession, Depends(get_db)]) -> dict:
+        return {"loop": threading.current_thread().name}
+
+    with TestClient(app) as client:
+        loop_thread = client.get("/").json()["loop"]
+
+    assert session.closed_on
+    assert session.closed_on[0] != loop_thread
+
+
+@pytest.mark.parametrize(("env", "expected"), [("", None), ("5", 5)])
+def test_prepare_threshold_reaches_psycopg(
+    monkeypatch: pytest.MonkeyPatch, env: str, expected: int | None
+) -> None:
+    monkeypatch.setenv("DB_PREPARE_THRESHOLD", env)
+    calls: list[dict] = []
+    monkeypatch.setattr(database, "create_engine", lambda url, **kw: calls.append(kw))
+    settings = Settings(database_url="postgresql+psycopg://u:p@localhost/db")
+
+    database._create_engine.__wrapped__(
+        str(settings.database_url),
+        prepare_threshold=settings.db_prepare_threshold,
+    )
+
+    assert settings.db_prepare_threshold == expected
+    assert calls[0]["connect_args"] == {"prepare_threshold": expected}
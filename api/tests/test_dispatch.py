@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from collections.abc import Iterator  # noqa: E402
+from datetime import UTC, datetime  # noqa: E402
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from api.db.schemes import (  # noqa: E402
+    Base,
+    Courier,
+    Dish,
+    Order,
+    OrderDish,
+    Restaurant,
+    User,
+)
+from api.dispatcher import record_delivery  # noqa: E402
+from api.repositories.courier import CourierRepository  # noqa: E402
+from api.repositories.order import OrderRepository  # noqa: E402
+from api.services.dispatch import (  # noqa: E402
+    AvailableCouriers,
+    PendingDeliveries,
+    batch_deliveries,
+    plan_dispatch,
+)
+
+
+def make_deliveries(
+    restaurant_ids: list[int],
+    pickups: list[tuple[float, float]],
+    dropoffs: list[tuple[float, float]],
+) -> PendingDeliveries:
+    return PendingDeliveries(
+        user_ids=np.arange(1, len(restaurant_ids) + 1),
+        restaurant_ids=np.array(restaurant_ids),
+        pickups=np.array(pickups, dtype=float),
+        dropoffs=np.array(dropoffs, dtype=float),
+    )
+
+
+def test_batches_share_restaurant_and_respect_size() -> None:
+    deliveries = make_deliveries(
+        [1, 1, 1, 1, 2],
+        [(55.75, 37.62)] * 4 + [(55.80, 37.70)],
+        [(55.751, 37.621)] * 4 + [(55.751, 37.621)],
+    )
+
+    batches = batch_deliveries(deliveries, max_batch_size=3, max_drop_km=2)
+
+    assert sorted(len(batch) for batch in batches) == [1, 1, 3]
+    for batch in batches:
+        assert len(set(deliveries.restaurant_ids[batch])) == 1
+    assert [0, 1, 2] in [batch.tolist() for batch in batches]
+
+
+def test_distant_dropoffs_are_not_batched() -> None:
+    deliveries = make_deliveries(
+        [1, 1],
+        [(55.75, 37.62)] * 2,
+        [(55.70, 37.62), (55.80, 37.62)],
+    )
+
+    batches = batch_deliveries(deliveries, max_batch_size=3, max_drop_km=2)
+
+    assert len(batches) == 2
+
+
+@pytest.mark.parametrize("solver", ["greedy", "hungarian"])
+def test_plan_assigns_each_batch_to_one_courier(solver: str) -> None:
+    if solver == "hungarian":
+        pytest.importorskip("scipy")
+    deliveries = make_deliveries(
+        [1, 1, 2, 3],
+        [(55.75, 37.62)] * 2 + [(55.76, 37.63), (56.50, 38.50)],
+        [(55.751, 37.621), (55.70, 37.50), (55.761, 37.631), (56.50, 38.50)],
+    )
+    couriers = AvailableCouriers(
+        courier_ids=np.array([10, 20, 30]),
+        positions=np.array([(55.75, 37.62), (55.76, 37.63), (55.75, 37.62)]),
+    )
+
+    plan = plan_dispatch(
+        deliveries,
+        couriers,
+        max_batch_size=3,
+        max_drop_km=2,
+        max_pickup_km=10,
+        solver=solver,
+    )
+
+    assigned = [user_id for _, user_ids in plan for user_id in user_ids]
+    assert sorted(assigned) == [1, 2, 3]
+    assert len({courier_id for courier_id, _ in plan}) == len(plan) == 3
+    assert (20, [3]) in plan
+
+
+def test_plan_without_couriers_is_empty() -> None:
+    deliveries = make_deliveries([1], [(55.75, 37.62)], [(55.75, 37.62)])
+    couriers = AvailableCouriers(
+        courier_ids=np.empty(0, dtype=int), positions=np.empty((0, 2))
+    )
+
+    assert (
+        plan_dispatch(
+            deliveries, couriers, max_batch_size=3, max_drop_km=2, max_pickup_km=10
+        )
+        == []
+    )
+
+
+@pytest.fixture
+def courier_db(monkeypatch: pytest.MonkeyPatch) -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(Dish.__table__.c.dish_id, "autoincrement", False)
+    Base.metadata.create_all(engine)
+    here = {"latitude": 55.75, "longitude": 37.62}
+    with Session(engine) as db:
+        db.add(Restaurant(restaurant_id=1, name="R", address="a", phone="p", **here))
+        db.add(Courier(courier_id=10, name="c", phone="p", **here))
+        db.add_all(
+            User(user_id=u, name="u", phone="p", address="a", password="x", **here)
+            for u in (1, 2, 3)
+        )
+        db.flush()
+        db.add(Dish(dish_id=1, restaurant_id=1, name="soup", price_cents=350))
+        db.add_all(
+            Order(
+                user_id=u,
+                status="delivering",
+                payment_method="cash",
+                created_at=datetime.now(UTC),
+            )
+            for u in (1, 2, 3)
+        )
+        db.flush()
+        db.add_all(
+            OrderDish(user_id=u, restaurant_id=1, dish_id=1, quantity=1)
+            for u in (1, 2, 3)
+        )
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def test_courier_is_reassigned_after_completing_its_batch(
+    courier_db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    notified: list[tuple[int, str]] = []
+    monkeypatch.setattr(
+        OrderRepository, "notify_status", lambda _, changes: notified.extend(changes)
+    )
+    repo = CourierRepository(courier_db)
+
+    repo.assign([(10, [1, 2])])
+    assert repo.available_couriers().courier_ids.tolist() == []
+    repo.complete_delivery(10, 1)
+    assert repo.available_couriers().courier_ids.tolist() == []
+    repo.complete_delivery(10, 2)
+    assert repo.available_couriers().courier_ids.tolist() == [10]
+    assert repo.pending_deliveries(10).user_ids.tolist() == [3]
+    repo.assign([(10, [3])])
+
+    assert courier_db.get(Order, 3).courier_id == 10
+    assert courier_db.get(Order, 1).status == "pending"
+    assert courier_db.get(Order, 1).courier_id is None
+    assert courier_db.query(OrderDish).filter_by(user_id=1).count() == 0
+    assert notified == [(1, "delivered"), (2, "delivered")]
+    with pytest.raises(ValueError, match="not out for delivery"):
+        repo.complete_delivery(10, 1)
+
+
+def test_record_delivery_completes_the_order(
+    courier_db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(OrderRepository, "notify_status", lambda _, changes: None)
+    engine = courier_db.get_bind()
+    CourierRepository(courier_db).assign([(10, [1])])
+
+    record_delivery(lambda: Session(engine), 10, 1)
+
+    courier_db.expire_all()
+    assert courier_db.get(Order, 1).status == "pending"
+    assert courier_db.get(Courier, 10).available
+    with pytest.raises(ValueError, match="not out for delivery"):
+        record_delivery(lambda: Session(engine), 10, 1)
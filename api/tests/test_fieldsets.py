@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from api.db.schemes import Base, Dish, Restaurant
+from api.dependencies import get_restaurant_repo
+from api.repositories.restaurant import RestaurantRepository
+from api.services.catalogue import get_catalogue
+
+
+@pytest.fixture
+def fields_setup(client, monkeypatch: pytest.MonkeyPatch) -> Iterator:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    monkeypatch.setattr(Dish.__table__.c.dish_id, "autoincrement", False)
+    Base.metadata.create_all(engine)
+    statements: list[str] = []
+    event.listen(
+        engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    with Session(engine) as session:
+        session.add(
+            Restaurant(
+                restaurant_id=1, name="A", address="a", phone="p", description="d"
+            )
+        )
+        session.flush()
+        session.add(
+            Dish(
+                dish_id=1,
+                restaurant_id=1,
+                name="soup",
+                description="hot",
+                price_cents=350,
+            )
+        )
+        session.commit()
+        statements.clear()
+        client.app.dependency_overrides[get_restaurant_repo] = lambda: (
+            RestaurantRepository(session)
+        )
+        client.app.dependency_overrides[get_catalogue] = lambda: None
+        yield client, statements
+    engine.dispose()
+
+
+def test_list_selects_and_returns_only_requested_fields(fields_setup) -> None:
+    client, statements = fields_setup
+
+    response = client.get(
+        "/restaurant/restaurants/", params={"fields": "name,restaurant_id"}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [{"restaurant_id": 1, "name": "A"}]
+    assert "address" not in statements[-1]
+    assert "description" not in statements[-1]
+
+
+def test_menu_and_dish_projections(fields_setup) -> None:
+    client, statements = fields_setup
+
+    menu = client.get(
+        "/restaurant/restaurants/1/menu", params={"fields": "dish_id,price"}
+    )
+    dish = client.get(
+        "/restaurant/restaurants/1/dishes/1", params={"fields": "name, price"}
+    )
+
+    assert menu.status_code == 200
+    assert menu.json()["restaurant"]["address"] == "a"
+    assert menu.json()["dishes"] == [{"dish_id": 1, "price": "3.50"}]
+    assert dish.json() == {"name": "soup", "price": "3.50"}
+    assert not [s for s in statements if "dish.description" in s]
+
+
+def test_full_representation_without_fields(fields_setup) -> None:
+    client, _ = fields_setup
+
+    response = client.get("/restaurant/restaurants/1/dishes/1")
+
+    assert response.json() == {
+        "dish_id": 1,
+        "restaurant_id": 1,
+        "name": "soup",
+        "description": "hot",
+        "price": "3.50",
+    }
+
+
+@pytest.mark.parametrize("fields", ["name,secret", "", " , "])
+def test_unknown_or_empty_fields_are_rejected(fields_setup, fields: str) -> None:
+    client, statements = fields_setup
+
+    response = client.get("/restaurant/restaurants/", params={"fields": fields})
+
+    assert response.status_code == 422
+    assert "allowed: restaurant_id, name" in response.json()["detail"]
+    assert statements == []
+
+
+def test_unknown_dish_projection_is_404(fields_setup) -> None:
+    client, _ = fields_setup
+
+    response = client.get(
+        "/restaurant/restaurants/1/dishes/9", params={"fields": "name"}
+    )
+
+    assert response.status_code == 404
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import math
+import random
+
+import pytest
+
+from api.services.geo import (
+    EARTH_RADIUS_KM,
+    covering_cells,
+    encode_geohash,
+    haversine_km,
+)
+
+
+def destination(
+    lat: float, lon: float, bearing: float, distance_km: float
+) -> tuple[float, float]:
+    """Point ``distance_km`` from ``(lat, lon)`` along ``bearing`` degrees."""
+    phi, lam, theta = map(math.radians, (lat, lon, bearing))
+    delta = distance_km / EARTH_RADIUS_KM
+    phi2 = math.asin(
+        math.sin(phi) * math.cos(delta)
+        + math.cos(phi) * math.sin(delta) * math.cos(theta)
+    )
+    lam2 = lam + math.atan2(
+        math.sin(theta) * math.sin(delta) * math.cos(phi),
+        math.cos(delta) - math.sin(phi) * math.sin(phi2),
+    )
+    return math.degrees(phi2), (math.degrees(lam2) + 180) % 360 - 180
+
+
+def test_encode_geohash_known_value() -> None:
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_covering_cells_contain_every_point_in_radius() -> None:
+    rng = random.Random(7)
+    for _ in range(200):
+        lat, lon = rng.uniform(-60, 60), rng.uniform(-179, 179)
+        radius_km = rng.uniform(0.1, 50)
+        cells = covering_cells(lat, lon, radius_km)
+        precision = len(cells[0])
+        for _ in range(20):
+            p_lat = lat + rng.uniform(-1, 1) * radius_km / 111
+            p_lon = lon + rng.uniform(-1, 1) * radius_km / 111
+            if haversine_km(lat, lon, p_lat, p_lon) <= radius_km:
+                assert encode_geohash(p_lat, p_lon, precision) in cells
+
+
+@pytest.mark.parametrize("lat", [70.0, 85.0, 89.9, -89.99])
+def test_covering_cells_reach_around_the_poles(lat: float) -> None:
+    rng = random.Random(11)
+    for radius_km in (1, 50, 500):
+        lon = rng.uniform(-180, 180)
+        cells = covering_cells(lat, lon, radius_km)
+        assert cells
+        precision = len(cells[0])
+        for _ in range(200):
+            point = destination(
+                lat, lon, rng.uniform(0, 360), rng.uniform(0, radius_km)
+            )
+            assert encode_geohash(*point, precision) in cells
+
+
+def test_covering_cells_give_up_for_huge_radius() -> None:
+    assert covering_cells(55.75, 37.62, 6000) == []
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+
+from api.db.schemes import IdempotencyKey, User
+from api.repositories.idempotency import IdempotencyRepository
+from api.services.idempotency import Idempotency, IdempotencyCache
+
+
+class _Result(BaseModel):
+    ok: bool
+
+
+@pytest.fixture
+def db() -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    IdempotencyKey.__table__.create(engine)
+    with Session(engine) as session:
+        session.add(User(user_id=1, name="u", phone="p", address="a", password="x"))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+class _ClaimingSession:
+    def __init__(self) -> None:
+        self.statements: list = []
+
+    def execute(self, statement, params=None):  # noqa: ANN001, ANN202
+        self.statements.append(statement)
+        return self
+
+    def first(self) -> tuple[int]:
+        return (1,)
+
+    def commit(self) -> None:
+        pass
+
+
+def test_idempotency_expiry_is_naive_utc(db: Session) -> None:
+    now = datetime.now(UTC).replace(tzinfo=None)
+    session = _ClaimingSession()
+
+    IdempotencyRepository(session).claim(
+        1, "k", "f", datetime.now(timezone(timedelta(hours=3))) + timedelta(hours=1)
+    )
+    params = session.statements[0].compile(dialect=postgresql.dialect()).params
+    stamps = [v for v in params.values() if isinstance(v, datetime)]
+
+    assert stamps
+    assert all(v.tzinfo is None for v in stamps)
+    assert timedelta(minutes=59) < params["expires_at"] - now < timedelta(minutes=61)
+
+    db.add_all(
+        IdempotencyKey(user_id=1, key=key, fingerprint="f", expires_at=now + minutes)
+        for key, minutes in (
+            ("old", -timedelta(minutes=1)),
+            ("new", timedelta(minutes=1)),
+        )
+    )
+    db.commit()
+    assert IdempotencyRepository(db).purge_expired() == 1
+    assert db.get(IdempotencyKey, {"user_id": 1, "key": "new"}) is not None
+
+
+def test_stale_in_flight_claim_is_taken_over(db: Session) -> None:
+    repo = IdempotencyRepository(db)
+    now = datetime.now(UTC)
+
+    assert repo.claim(1, "k", "f", now - timedelta(seconds=1)) is None
+    assert repo.claim(1, "k", "f", now + timedelta(minutes=1)) is None
+    assert repo.claim(1, "k", "f", now + timedelta(minutes=1)).status_code is None
+
+    repo.complete(1, "k", 200, "{}", now + timedelta(hours=24))
+    row = db.get(IdempotencyKey, {"user_id": 1, "key": "k"})
+    db.refresh(row)
+    assert row.status_code == 200
+    assert row.expires_at > now.replace(tzinfo=None) + timedelta(hours=23)
+
+
+def test_failed_complete_releases_the_key(db: Session) -> None:
+    repo = IdempotencyRepository(db)
+
+    def fail(*_: object) -> None:
+        raise OSError
+
+    repo.complete = fail
+    idempotency = Idempotency(
+        IdempotencyCache(ttl_seconds=60),
+        repo,
+        user_id=1,
+        key="k",
+        fingerprint="f",
+        wait_seconds=0,
+        lease_seconds=60,
+    )
+
+    with pytest.raises(OSError):
+        idempotency.run(lambda: _Result(ok=True))
+    assert db.get(IdempotencyKey, {"user_id": 1, "key": "k"}) is None
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+from pydantic import ValidationError
+
+from api.models.money import format_cents
+from api.models.restaurant import DishCreate
+
+
+@pytest.mark.parametrize(
+    ("cents", "text"),
+    [(0, "0.00"), (5, "0.05"), (1250, "12.50"), (-199, "-1.99")],
+)
+def test_format_cents(cents: int, text: str) -> None:
+    assert format_cents(cents) == text
+
+
+@pytest.mark.parametrize("price", ["12.5", 12.5, Decimal("12.50"), "12.50"])
+def test_prices_are_parsed_into_cents(price) -> None:
+    dish = DishCreate(name="soup", description=None, price=price)
+    assert dish.price == 1250
+    assert (
+        dish.model_dump_json() == '{"name":"soup","description":null,"price":"12.50"}'
+    )
+
+
+@pytest.mark.parametrize("price", ["1.001", "abc", "-1", "NaN", True, 10**8])
+def test_invalid_prices_are_rejected(price) -> None:
+    with pytest.raises(ValidationError):
+        DishCreate(name="soup", description=None, price=price)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, TypeAdapter
+
+from api.middleware.negotiation import ContentNegotiationMiddleware
+from api.models.money import DishPrice
+from api.services.serialization import (
+    NegotiatedResponse,
+    build_serializers,
+    encode_response,
+    negotiate_format,
+)
+from api.settings import get_settings
+
+msgpack = pytest.importorskip("msgpack")
+
+MENU = {
+    "dishes": [{"dish_id": i, "name": f"dish {i}", "price": "9.50"} for i in range(50)]
+}
+
+
+class Price(BaseModel):
+    price: DishPrice
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI(default_response_class=NegotiatedResponse)
+
+    @app.get("/menu")
+    def menu() -> dict:
+        return MENU
+
+    @app.get("/price")
+    def price() -> Response:
+        return encode_response(TypeAdapter(Price), Price(price=950))
+
+    @app.get("/raw")
+    def raw() -> Response:
+        return Response(b'{"a":1}', media_type="application/json")
+
+    @app.post("/echo")
+    def echo(payload: dict) -> dict:
+        return payload
+
+    app.add_middleware(ContentNegotiationMiddleware, settings=get_settings())
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("", None),
+        ("*/*", None),
+        ("application/msgpack", "application/msgpack"),
+        ("application/x-msgpack", "application/msgpack"),
+        ("application/json, application/msgpack", None),
+        ("application/json;q=0.5, application/msgpack", "application/msgpack"),
+        ("application/msgpack;q=0, */*", None),
+    ],
+)
+def test_negotiate_format(accept: str, expected: str | None) -> None:
+    serializer = negotiate_format(accept, build_serializers(get_settings()))
+    assert (serializer.media_type if serializer else None) == expected
+
+
+def test_json_stays_the_default(client: TestClient) -> None:
+    response = client.get("/menu")
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["vary"] == "Accept"
+    assert response.json() == MENU
+
+
+def test_msgpack_response_is_smaller(client: TestClient) -> None:
+    json_size = len(client.get("/menu").content)
+    response = client.get("/menu", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"] == "application/msgpack"
+    assert int(response.headers["content-length"]) == len(response.content) < json_size
+    assert msgpack.unpackb(response.content) == MENU
+
+
+def test_encoded_responses_use_the_json_mode_dump(client: TestClient) -> None:
+    as_json = client.get("/price")
+    as_msgpack = client.get("/price", headers={"Accept": "application/msgpack"})
+
+    assert as_json.json() == {"price": "9.50"}
+    assert as_msgpack.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.content) == {"price": "9.50"}
+
+
+def test_prerendered_json_is_not_reencoded(client: TestClient) -> None:
+    response = client.get("/raw", headers={"Accept": "application/msgpack"})
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.headers["vary"] == "Accept"
+    assert response.json() == {"a": 1}
+
+
+def test_msgpack_request_body(client: TestClient) -> None:
+    response = client.post(
+        "/echo",
+        content=msgpack.packb({"a": [1, 2]}),
+        headers={"Content-Type": "application/msgpack"},
+    )
+    assert response.json() == {"a": [1, 2]}
+
+
+def test_malformed_msgpack_body(client: TestClient) -> None:
+    response = client.post(
+        "/echo", content=b"\xc1", headers={"Content-Type": "application/msgpack"}
+    )
+    assert response.status_code == 400
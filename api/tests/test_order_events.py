@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+
+from api.routers.order import _order_events
+from api.services.order_events import OrderEventHub, OrderStatusListener
+
+
+async def test_hub_fans_out_to_all_subscribers() -> None:
+    hub = OrderEventHub()
+    hub.bind(asyncio.get_running_loop())
+    with (
+        hub.subscribe(1) as first,
+        hub.subscribe(1) as second,
+        hub.subscribe(2) as other,
+    ):
+        hub.publish(1, "preparing")
+        assert await first.next(1) == "preparing"
+        assert await second.next(1) == "preparing"
+        assert await other.next(0.01) is None
+        assert hub.connections == 3
+    assert hub.connections == 0
+
+
+async def test_order_events_stream_sends_heartbeats() -> None:
+    hub = OrderEventHub()
+    hub.bind(asyncio.get_running_loop())
+    events = _order_events(hub, 1, lambda: "queued", heartbeat_seconds=0.01)
+
+    assert await anext(events) == 'event: status\ndata: {"status": "queued"}\n\n'
+    assert await anext(events) == ": heartbeat\n\n"
+    hub.publish(1, "delivering")
+    assert await anext(events) == 'event: status\ndata: {"status": "delivering"}\n\n'
+
+    await events.aclose()
+    assert hub.connections == 0
+
+
+async def test_change_during_the_initial_read_is_not_lost() -> None:
+    hub = OrderEventHub()
+    hub.bind(asyncio.get_running_loop())
+
+    def read_status() -> str:
+        # The worker commits "preparing" right after the stream read "queued".
+        hub.publish(1, "preparing")
+        return "queued"
+
+    events = _order_events(hub, 1, read_status, heartbeat_seconds=1)
+
+    assert await anext(events) == 'event: status\ndata: {"status": "queued"}\n\n'
+    assert await anext(events) == 'event: status\ndata: {"status": "preparing"}\n\n'
+    await events.aclose()
+
+
+async def test_listener_skips_malformed_payloads() -> None:
+    hub = OrderEventHub()
+    hub.bind(asyncio.get_running_loop())
+    listener = OrderStatusListener(None, hub)
+
+    with hub.subscribe(1) as subscription:
+        listener._relay("oops:queued")
+        listener._relay("1:preparing")
+        assert await subscription.next(1) == "preparing"
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.orm import Session
+
+from api.db.schemes import Base, Courier, Dish, Order, Restaurant, User
+from api.repositories.order import OrderNotPendingError, OrderRepository
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(Dish.__table__.c.dish_id, "autoincrement", False)
+    monkeypatch.setattr(OrderRepository, "notify_status", lambda _, changes: None)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Restaurant(restaurant_id=1, name="A", address="a", phone="p"),
+                User(user_id=1, name="u", phone="p", address="a", password="x"),
+                Courier(courier_id=10, name="c", phone="p"),
+            ]
+        )
+        session.flush()
+        session.add_all(
+            [
+                Dish(dish_id=1, restaurant_id=1, name="bread", price_cents=125),
+                Order(
+                    user_id=1,
+                    status="pending",
+                    payment_method="not_selected",
+                    created_at=datetime.now(UTC),
+                ),
+            ]
+        )
+        session.commit()
+        session.expunge_all()
+        yield session
+    engine.dispose()
+
+
+def test_user_can_order_again_after_delivery(db: Session) -> None:
+    pytest.importorskip("numpy")
+    from api.repositories.courier import CourierRepository  # noqa: PLC0415
+
+    orders = OrderRepository(db)
+    couriers = CourierRepository(db)
+
+    for _ in range(2):
+        orders.add_item(1, 1, 1)
+        assert orders.checkout(1, "cash").status == "queued"
+        assert orders.advance_orders(10) == [(1, "preparing")]
+        assert orders.advance_orders(10) == [(1, "delivering")]
+        couriers.assign([(10, [1])])
+        couriers.complete_delivery(10, 1)
+
+        order, items = orders.view_order(1)
+        assert order.status == "pending"
+        assert items == []
+        assert db.get(Courier, 10).available
+
+
+def test_worker_holds_orders_in_each_status(db: Session) -> None:
+    orders = OrderRepository(db)
+    orders.add_item(1, 1, 1)
+    orders.checkout(1, "cash")
+
+    assert orders.advance_orders(10, {"queued": 60}) == []
+    assert orders.advance_orders(10, {"queued": 0, "preparing": 60}) == [
+        (1, "preparing")
+    ]
+    assert orders.advance_orders(10, {"queued": 0, "preparing": 60}) == []
+
+
+def test_cart_writes_require_a_pending_order(db: Session) -> None:
+    repo = OrderRepository(db)
+    repo.add_item(1, 1, 1, quantity=3)
+    repo.get_current_order(1).status = "queued"
+    db.commit()
+
+    with pytest.raises(OrderNotPendingError):
+        repo.add_item(1, 1, 1)
+    with pytest.raises(OrderNotPendingError):
+        repo.remove_item(1, 1, 1)
+    with pytest.raises(OrderNotPendingError):
+        repo.apply_batch(1, add=[(1, 1, 1)], remove=[])
+    with pytest.raises(ValueError, match="does not exist"):
+        repo.add_item(2, 1, 1)
+    assert repo.get_item(1, 1, 1).quantity == 3
+
+
+def test_get_item_reuses_the_compiled_statement(db: Session) -> None:
+    hits: list[CacheStats] = []
+    event.listen(
+        db.get_bind(),
+        "after_cursor_execute",
+        lambda conn, cursor, statement, params, context, many: hits.append(
+            context.cache_hit
+        ),
+    )
+    repo = OrderRepository(db)
+
+    repo.add_item(1, 1, 1, quantity=3)
+    hits.clear()
+
+    assert repo.get_item(1, 1, 1).quantity == 3
+    assert repo.get_item(1, 2, 1) is None
+    assert hits[-1] is CacheStats.CACHE_HIT
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+
 import pytest
 
-from api.dependencies import get_current_user, get_order_repo, get_restaurant_repo
+from api.dependencies import (
+    get_current_user,
+    get_idempotency_repo,
+    get_order_repo,
+    get_restaurant_repo,
+)
+from api.repositories.order import OrderNotPendingError
+from api.services.idempotency import IdempotencyCache, get_idempotency_cache
 
 
 class DummyUser:
@@ -11,10 +22,10 @@ class DummyUser:
 
 
 class DummyDish:
-    def __init__(self, name: str, description: str, price: float) -> None:
+    def __init__(self, name: str, description: str, price_cents: int) -> None:
         self.name = name
         self.description = description
-        self.price = price
+        self.price_cents = price_cents
 
 
 class DummyOrderItem:
@@ -37,7 +48,7 @@ class DummyOrder:
 class DummyRestaurantRepo:
     def __init__(self) -> None:
         self.dishes: dict[tuple[int, int], DummyDish] = {
-            (1, 1): DummyDish("pizza", "cheese", 10.0)
+            (1, 1): DummyDish("pizza", "cheese", 1050)
         }
 
     def get_dish(self, restaurant_id: int, dish_id: int) -> DummyDish | None:
@@ -48,6 +59,11 @@ class DummyOrderRepo:
     def __init__(self, restaurant_repo: DummyRestaurantRepo) -> None:
         self.restaurant_repo = restaurant_repo
         self.items: list[DummyOrderItem] = []
+        self.checked_out = False
+
+    def _check_pending(self) -> None:
+        if self.checked_out:
+            raise OrderNotPendingError("Order is queued")
 
     def create_order(self, user: DummyUser) -> None:  # pragma: no cover - simple placeholder
         self.user_id = user.user_id
@@ -55,6 +71,7 @@ class DummyOrderRepo:
     def add_item(
         self, *, user_id: int, restaurant_id: int, dish_id: int, quantity: int
     ) -> DummyOrderItem:
+        self._check_pending()
         dish = self.restaurant_repo.get_dish(restaurant_id, dish_id)
         if not dish:
             raise ValueError("dish not found")
@@ -62,12 +79,46 @@ class DummyOrderRepo:
         self.items.append(item)
         return item
 
-    def view_order(self, user_id: int) -> DummyOrder:
+    def apply_batch(self, user_id: int, add: list, remove: list) -> None:
+        self._check_pending()
+        for restaurant_id, dish_id, quantity in add:
+            dish = self.restaurant_repo.get_dish(restaurant_id, dish_id)
+            if not dish:
+                raise LookupError("dish not found")
+            self.items.append(DummyOrderItem(restaurant_id, dish_id, quantity, dish))
+        self.items = [
+            it for it in self.items if (it.restaurant_id, it.dish_id) not in remove
+        ]
+
+    def view_order(self, user_id: int) -> tuple[DummyOrder, list[SimpleNamespace]]:
         if not self.items:
             raise ValueError("no order")
-        return DummyOrder(user_id, self.items)
+        order = DummyOrder(user_id, self.items)
+        order.created_at = datetime(2024, 1, 1)
+        rows = [
+            SimpleNamespace(
+                restaurant_id=it.restaurant_id,
+                dish_id=it.dish_id,
+                quantity=it.quantity,
+                name=it.dish.name,
+                description=it.dish.description,
+                price=it.dish.price_cents,
+            )
+            for it in self.items
+        ]
+        return order, rows
+
+    def checkout(self, user_id: int, payment_method: str) -> DummyOrder:
+        if not self.items:
+            raise ValueError("Cart is empty or already checked out.")
+        self.checked_out = True
+        order = DummyOrder(user_id, self.items)
+        order.status = "queued"
+        order.payment_method = payment_method
+        return order
 
     def remove_item(self, *, user_id: int, restaurant_id: int, dish_id: int) -> None:
+        self._check_pending()
         for idx, it in enumerate(self.items):
             if it.restaurant_id == restaurant_id and it.dish_id == dish_id:
                 self.items.pop(idx)
@@ -75,14 +126,46 @@ class DummyOrderRepo:
         raise ValueError("not found")
 
 
+class DummyIdempotencyRepo:
+    def __init__(self) -> None:
+        self.rows: dict[tuple[int, str], SimpleNamespace] = {}
+
+    def claim(
+        self, user_id: int, key: str, fingerprint: str, expires_at: datetime
+    ) -> SimpleNamespace | None:
+        if (user_id, key) in self.rows:
+            return self.rows[user_id, key]
+        self.rows[user_id, key] = SimpleNamespace(
+            fingerprint=fingerprint, status_code=None, body=None, expires_at=expires_at
+        )
+        return None
+
+    def complete(
+        self, user_id: int, key: str, status_code: int, body: str, expires_at: datetime
+    ) -> None:
+        self.rows[user_id, key].status_code = status_code
+        self.rows[user_id, key].body = body
+        self.rows[user_id, key].expires_at = expires_at
+
+    def release(self, user_id: int, key: str) -> None:
+        del self.rows[user_id, key]
+
+    def purge_expired(self) -> int:
+        return 0
+
+
 @pytest.fixture
 def order_setup(client):
     restaurant_repo = DummyRestaurantRepo()
     order_repo = DummyOrderRepo(restaurant_repo)
+    idempotency_repo = DummyIdempotencyRepo()
+    idempotency_cache = IdempotencyCache(ttl_seconds=60)
     user = DummyUser(1)
     client.app.dependency_overrides[get_current_user] = lambda: user
     client.app.dependency_overrides[get_order_repo] = lambda: order_repo
     client.app.dependency_overrides[get_restaurant_repo] = lambda: restaurant_repo
+    client.app.dependency_overrides[get_idempotency_repo] = lambda: idempotency_repo
+    client.app.dependency_overrides[get_idempotency_cache] = lambda: idempotency_cache
     return client, order_repo, restaurant_repo, user
 
 
@@ -105,9 +188,12 @@ def test_add_dish_to_order_dish_not_found(order_setup) -> None:
 def test_view_current_order_success(order_setup) -> None:
     client, order_repo, _, user = order_setup
     order_repo.add_item(user_id=user.user_id, restaurant_id=1, dish_id=1, quantity=1)
+    order_repo.add_item(user_id=user.user_id, restaurant_id=1, dish_id=1, quantity=2)
     response = client.get("/order/orders/")
     assert response.status_code == 200
     assert response.json()["items"][0]["dish_id"] == 1
+    assert response.json()["items"][0]["price"] == "10.50"
+    assert response.json()["total"] == "31.50"
 
 
 def test_remove_dish_success(order_setup) -> None:
@@ -122,3 +208,164 @@ def test_remove_dish_not_found(order_setup) -> None:
     client, _, _, _ = order_setup
     response = client.delete("/order/orders/items/1/1")
     assert response.status_code == 404
+
+
+def test_checkout_queues_order(order_setup) -> None:
+    client, order_repo, _, user = order_setup
+    order_repo.add_item(user_id=user.user_id, restaurant_id=1, dish_id=1, quantity=1)
+    response = client.post("/order/orders/checkout", json={"payment_method": "card"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "queued"
+    assert response.json()["payment_method"] == "card"
+
+
+def test_checkout_empty_cart(order_setup) -> None:
+    client, _, _, _ = order_setup
+    response = client.post("/order/orders/checkout", json={"payment_method": "card"})
+    assert response.status_code == 409
+
+
+def test_cart_is_read_only_after_checkout(order_setup) -> None:
+    client, order_repo, _, user = order_setup
+    order_repo.add_item(user_id=user.user_id, restaurant_id=1, dish_id=1, quantity=1)
+    client.post("/order/orders/checkout", json={"payment_method": "card"})
+
+    line = {"restaurant_id": 1, "dish_id": 1}
+    add = client.post("/order/orders/items", json=line)
+    batch = client.post("/order/orders/items/batch", json={"remove": [line]})
+    remove = client.delete("/order/orders/items/1/1")
+
+    assert [add.status_code, batch.status_code, remove.status_code] == [409, 409, 409]
+    assert len(order_repo.items) == 1
+
+
+def test_add_dish_replays_response_for_same_idempotency_key(order_setup) -> None:
+    client, order_repo, _, _ = order_setup
+    payload = {"restaurant_id": 1, "dish_id": 1, "quantity": 2}
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = client.post("/order/orders/items", json=payload, headers=headers)
+    second = client.post("/order/orders/items", json=payload, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert len(order_repo.items) == 1
+
+
+def test_replay_survives_a_cold_cache(order_setup) -> None:
+    client, order_repo, _, _ = order_setup
+    payload = {"restaurant_id": 1, "dish_id": 1, "quantity": 1}
+    headers = {"Idempotency-Key": "retry-2"}
+
+    client.post("/order/orders/items", json=payload, headers=headers)
+    client.app.dependency_overrides[get_idempotency_cache] = lambda: IdempotencyCache(60)
+    replay = client.post("/order/orders/items", json=payload, headers=headers)
+
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert len(order_repo.items) == 1
+
+
+def test_idempotency_key_reused_for_other_payload(order_setup) -> None:
+    client, _, _, _ = order_setup
+    headers = {"Idempotency-Key": "retry-3"}
+    client.post(
+        "/order/orders/items",
+        json={"restaurant_id": 1, "dish_id": 1, "quantity": 1},
+        headers=headers,
+    )
+    response = client.post(
+        "/order/orders/items",
+        json={"restaurant_id": 1, "dish_id": 1, "quantity": 5},
+        headers=headers,
+    )
+    assert response.status_code == 422
+
+
+def test_failed_request_releases_idempotency_key(order_setup) -> None:
+    client, order_repo, _, user = order_setup
+    headers = {"Idempotency-Key": "checkout-1"}
+    assert (
+        client.post(
+            "/order/orders/checkout", json={"payment_method": "card"}, headers=headers
+        ).status_code
+        == 409
+    )
+
+    order_repo.add_item(user_id=user.user_id, restaurant_id=1, dish_id=1, quantity=1)
+    response = client.post(
+        "/order/orders/checkout", json={"payment_method": "card"}, headers=headers
+    )
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_concurrent_requests_with_same_key_run_once(order_setup) -> None:
+    client, order_repo, _, _ = order_setup
+    entered = threading.Event()
+    release = threading.Event()
+    add_item = order_repo.add_item
+
+    def slow_add_item(**kwargs):
+        entered.set()
+        release.wait(5)
+        return add_item(**kwargs)
+
+    order_repo.add_item = slow_add_item
+    payload = {"restaurant_id": 1, "dish_id": 1, "quantity": 1}
+    headers = {"Idempotency-Key": "retry-4"}
+    responses = []
+
+    def post() -> None:
+        responses.append(
+            client.post("/order/orders/items", json=payload, headers=headers)
+        )
+
+    first = threading.Thread(target=post)
+    first.start()
+    assert entered.wait(5)
+    second = threading.Thread(target=post)
+    second.start()
+    release.set()
+    first.join()
+    second.join()
+
+    assert [r.status_code for r in responses] == [200, 200]
+    assert len(order_repo.items) == 1
+
+
+def test_batch_update_returns_the_new_cart(order_setup) -> None:
+    client, order_repo, restaurant_repo, _ = order_setup
+    restaurant_repo.dishes[1, 2] = DummyDish("soup", "hot", 300)
+    payload = {
+        "add": [
+            {"restaurant_id": 1, "dish_id": 1, "quantity": 2},
+            {"restaurant_id": 1, "dish_id": 2, "quantity": 1},
+        ],
+        "remove": [{"restaurant_id": 1, "dish_id": 1}],
+    }
+    response = client.post("/order/orders/items/batch", json=payload)
+    assert response.status_code == 200
+    assert [it["dish_id"] for it in response.json()["items"]] == [2]
+    assert response.json()["total"] == "3.00"
+
+
+def test_batch_update_accepts_msgpack(order_setup) -> None:
+    msgpack = pytest.importorskip("msgpack")
+    client, _, _, _ = order_setup
+    body = msgpack.packb({"add": [{"restaurant_id": 1, "dish_id": 1, "quantity": 1}]})
+    response = client.post(
+        "/order/orders/items/batch",
+        content=body,
+        headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content)["total"] == "10.50"
+
+
+def test_batch_update_unknown_dish(order_setup) -> None:
+    client, _, _, _ = order_setup
+    payload = {"add": [{"restaurant_id": 9, "dish_id": 9, "quantity": 1}]}
+    response = client.post("/order/orders/items/batch", json=payload)
+    assert response.status_code == 404
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import threading
+
+from sqlalchemy.dialects import postgresql
+
+from api.repositories.order import OrderRepository
+from api.worker import run_worker
+
+
+class RecordingSession:
+    def __init__(self, claimed: list[tuple[int, str]]) -> None:
+        self.claimed = claimed
+        self.statements: list = []
+        self.committed = False
+
+    def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        return self
+
+    def all(self) -> list[tuple[int, str]]:
+        return self.claimed
+
+    def commit(self) -> None:
+        self.committed = True
+
+    def rollback(self) -> None:
+        pass
+
+    def __enter__(self) -> RecordingSession:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+def test_advance_orders_claims_with_skip_locked() -> None:
+    db = RecordingSession([(1, "queued"), (2, "preparing")])
+    advanced = OrderRepository(db).advance_orders(
+        batch_size=10, min_seconds={"queued": 30, "preparing": 600}
+    )
+
+    claim, _ = db.statements[0]
+    sql = str(claim.compile(dialect=postgresql.dialect()))
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert sql.count('"order".status_changed_at <=') == 2
+    assert advanced == [(1, "preparing"), (2, "delivering")]
+
+    _, params = db.statements[1]
+    assert [(p["user_id"], p["status"]) for p in params] == advanced
+    assert params[0]["status_changed_at"] == params[1]["status_changed_at"]
+    assert db.committed
+
+
+def test_run_worker_drains_queue_once() -> None:
+    batches = [[(1, "queued")], [(1, "preparing")], []]
+    processed = run_worker(
+        lambda: RecordingSession(batches.pop(0)),
+        batch_size=10,
+        poll_interval=0,
+        stop=threading.Event(),
+        once=True,
+    )
+    assert processed == 2
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import pytest
+
+from api.services.passwords import build_pwd_context, calibrate_bcrypt
+from api.settings import get_settings
+
+
+def settings_with(**update):
+    return get_settings().model_copy(update=update)
+
+
+def test_lower_bcrypt_cost_needs_update() -> None:
+    old = build_pwd_context(settings_with(bcrypt_rounds=4)).hash("pw")
+    context = build_pwd_context(settings_with(bcrypt_rounds=5))
+
+    assert context.verify("pw", old)
+    assert context.needs_update(old)
+    assert not context.needs_update(context.hash("pw"))
+
+
+def test_switching_to_argon2_keeps_bcrypt_hashes_valid() -> None:
+    pytest.importorskip("argon2")
+    old = build_pwd_context(settings_with(bcrypt_rounds=4)).hash("pw")
+    context = build_pwd_context(
+        settings_with(
+            hashing_scheme="argon2", argon2_memory_cost=1024, argon2_time_cost=1
+        )
+    )
+
+    assert context.verify("pw", old)
+    assert context.needs_update(old)
+    assert context.hash("pw").startswith("$argon2id$")
+
+
+def test_calibration_respects_target() -> None:
+    rounds, seconds = calibrate_bcrypt(get_settings(), target_seconds=0.05)
+    assert 4 <= rounds
+    assert seconds <= 0.05
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from api.dependencies import get_settings
+from api.middleware.profiling import (
+    PROFILE_HEADER,
+    profiling_middleware,
+    sign_profile_token,
+    verify_profile_token,
+)
+
+
+def _profiling_settings(tmp_path, **update):
+    return get_settings().model_copy(
+        update={
+            "profiling_dir": tmp_path,
+            "profiling_secret": get_settings().token_secret_key,
+            **update,
+        }
+    )
+
+
+def _header(secret: str = "test-secret", ttl: int = 60) -> dict[str, str]:
+    return {PROFILE_HEADER: sign_profile_token(secret, int(time.time()) + ttl)}
+
+
+def test_signed_token_expires_and_rejects_other_secrets() -> None:
+    token = sign_profile_token("key", int(time.time()) + 60)
+    assert verify_profile_token("key", token)
+    assert not verify_profile_token("other", token)
+    assert not verify_profile_token(
+        "key", sign_profile_token("key", int(time.time()) - 1)
+    )
+    assert not verify_profile_token(None, token)
+
+
+def test_disabled_profiler_adds_no_layer(tmp_path) -> None:
+    app = FastAPI()
+    assert profiling_middleware(app, get_settings()) is app
+    settings = get_settings().model_copy(update={"profiling_dir": tmp_path})
+    assert profiling_middleware(app, settings) is app
+
+
+def test_signed_request_is_profiled_with_route_and_statements(tmp_path) -> None:
+    engine = create_engine("sqlite://")
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    def slow_item(item_id: int) -> dict:
+        with engine.connect() as conn:
+            conn.execute(text("select 1"))
+            conn.execute(text("select 2"))
+        time.sleep(0.05)
+        return {"item_id": item_id}
+
+    settings = _profiling_settings(tmp_path)
+    with TestClient(profiling_middleware(app, settings)) as client:
+        assert client.get("/items/1").status_code == 200
+        assert list(tmp_path.iterdir()) == []
+        assert client.get("/items/1", headers=_header()).status_code == 200
+        assert client.get("/items/1", headers=_header("forged")).status_code == 200
+
+    [path] = tmp_path.iterdir()
+    profile = json.loads(path.read_text())
+    assert profile["metadata"]["route"] == "/items/{item_id}"
+    assert profile["metadata"]["sql_statements"] == 2
+    assert profile["metadata"]["status"] == 200
+    sampled = profile["profiles"][0]
+    assert sampled["type"] == "sampled"
+    assert sampled["samples"]
+    names = {frame["name"] for frame in profile["shared"]["frames"]}
+    assert any(name.endswith("slow_item") for name in names)
+
+
+def test_profile_directory_is_bounded(tmp_path) -> None:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {}
+
+    settings = _profiling_settings(
+        tmp_path,
+        profiling_secret=None,
+        profiling_sample_rate=1.0,
+        profiling_max_files=3,
+    )
+    with TestClient(profiling_middleware(app, settings)) as client:
+        for _ in range(5):
+            client.get("/ping")
+
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_profiles_endpoint_lists_and_fetches(client, tmp_path) -> None:
+    settings = _profiling_settings(tmp_path)
+    client.app.dependency_overrides[get_settings] = lambda: settings
+    (tmp_path / "p1.speedscope.json").write_text(
+        json.dumps({"metadata": {"route": "/ping"}, "profiles": []})
+    )
+
+    assert client.get("/admin/profiles/").status_code == 403
+    listed = client.get("/admin/profiles/", headers=_header())
+    assert listed.json() == [{"name": "p1", "route": "/ping"}]
+    fetched = client.get("/admin/profiles/p1", headers=_header())
+    assert fetched.json()["metadata"]["route"] == "/ping"
+    assert client.get("/admin/profiles/missing", headers=_header()).status_code == 404
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from api.services.rate_limit import (
+    MemoryRateLimiter,
+    RedisRateLimiter,
+    get_rate_limit_backend,
+)
+from api.routers import auth
+
+
+class FakeScript:
+    """Python twin of the sliding-window Lua script."""
+
+    def __init__(self, store: dict[str, int]) -> None:
+        self.store = store
+
+    def __call__(self, keys: list[str], args: list) -> int:
+        current, previous = (self.store.get(key, 0) for key in keys)
+        limit, overlap, _ = args
+        if previous * float(overlap) + current + 1 > limit:
+            return 0
+        self.store[keys[0]] = current + 1
+        return 1
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, int] = {}
+
+    def register_script(self, script: str) -> FakeScript:
+        assert "INCR" in script
+        return FakeScript(self.store)
+
+
+def test_memory_limiter_rejects_over_limit() -> None:
+    limiter = MemoryRateLimiter(limit=3, window_seconds=60)
+    assert [limiter.hit("ip:1") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit("ip:1") > 0
+    assert limiter.hit("ip:2") == 0.0
+
+
+def test_memory_limiter_is_bounded() -> None:
+    limiter = MemoryRateLimiter(limit=1, window_seconds=60, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.hit(key)
+    assert list(limiter._buckets) == ["b", "c"]
+
+
+def test_redis_limiter_shares_counters() -> None:
+    client = FakeRedis()
+    first = RedisRateLimiter(client, limit=2, window_seconds=60)
+    second = RedisRateLimiter(client, limit=2, window_seconds=60)
+    assert first.hit("user:alice") == 0.0
+    assert second.hit("user:alice") == 0.0
+    assert first.hit("user:alice") > 0
+
+
+def test_redis_limiter_counts_only_admitted_hits() -> None:
+    client = FakeRedis()
+    limiter = RedisRateLimiter(client, limit=2, window_seconds=60)
+    results = [limiter.hit("ip:1") for _ in range(5)]
+    assert results[:2] == [0.0, 0.0]
+    assert all(wait > 0 for wait in results[2:])
+    assert list(client.store.values()) == [2]
+
+
+def test_sliding_window_script_runs_on_fakeredis() -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    client = fakeredis.FakeRedis()
+    limiter = RedisRateLimiter(client, limit=2, window_seconds=60)
+
+    results = [limiter.hit("ip:1") for _ in range(4)]
+
+    assert results[:2] == [0.0, 0.0]
+    assert all(wait > 0 for wait in results[2:])
+    (key,) = client.keys()
+    assert int(client.get(key)) == 2
+    assert 0 < client.pttl(key) <= 120_000
+
+
+def test_backend_runs_off_the_event_loop(client) -> None:
+    on_loop = []
+
+    class RecordingBackend:
+        def hit(self, key: str) -> float:
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return 1.0
+
+    client.app.dependency_overrides[get_rate_limit_backend] = RecordingBackend
+    response = client.post("/auth/login", data={"username": "bob", "password": "pw"})
+    assert response.status_code == 429
+    assert on_loop == [False, False]
+
+
+def test_login_rejected_before_repository(
+    client, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls = []
+    monkeypatch.setattr(auth, "UserRepository", lambda db: calls.append(db))
+    limiter = MemoryRateLimiter(limit=1, window_seconds=60)
+    limiter.hit("login:ip:testclient")
+    client.app.dependency_overrides[get_rate_limit_backend] = lambda: limiter
+    response = client.post("/auth/login", data={"username": "alice", "password": "pw"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    assert calls == []
+
+
+def test_registration_rate_limited_by_username(client) -> None:
+    limiter = MemoryRateLimiter(limit=1, window_seconds=60)
+    limiter.hit("register:user:mallory")
+    client.app.dependency_overrides[get_rate_limit_backend] = lambda: limiter
+    payload = {"name": "Mallory", "password": "secretpw", "phone": "1", "address": "x"}
+    response = client.post("/user/users/", json=payload)
+    assert response.status_code == 429
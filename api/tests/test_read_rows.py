@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from api.db.schemes import (
+    Base,
+    Dish,
+    Order,
+    OrderDish,
+    Restaurant,
+    User,
+)
+from api.models.order import OrderItemRead
+from api.models.restaurant import DishRead, RestaurantRead
+from api.repositories.order import OrderRepository
+from api.repositories.restaurant import RestaurantRepository
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(Dish.__table__.c.dish_id, "autoincrement", False)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Restaurant(restaurant_id=2, name="B", address="a", phone="p"),
+                Restaurant(restaurant_id=1, name="A", address="a", phone="p"),
+                User(user_id=1, name="u", phone="p", address="a", password="x"),
+            ]
+        )
+        session.flush()
+        session.add_all(
+            [
+                Dish(dish_id=2, restaurant_id=1, name="soup", price_cents=350),
+                Dish(dish_id=1, restaurant_id=1, name="bread", price_cents=125),
+                Order(
+                    user_id=1,
+                    status="pending",
+                    payment_method="cash",
+                    created_at=datetime.now(UTC),
+                ),
+            ]
+        )
+        session.flush()
+        session.add(OrderDish(user_id=1, restaurant_id=1, dish_id=2, quantity=3))
+        session.commit()
+        session.expunge_all()
+        yield session
+    engine.dispose()
+
+
+def test_list_reads_skip_the_identity_map(db: Session) -> None:
+    repo = RestaurantRepository(db)
+
+    restaurants = [RestaurantRead.model_validate(r) for r in repo.list_restaurants()]
+    dishes = [DishRead.model_validate(d) for d in repo.list_menu(1)]
+
+    assert [r.name for r in restaurants] == ["A", "B"]
+    assert [(d.name, d.price) for d in dishes] == [
+        ("bread", 125),
+        ("soup", 350),
+    ]
+    assert len(db.identity_map) == 0
+
+
+def test_view_order_joins_dish_columns(db: Session) -> None:
+    order, items = OrderRepository(db).view_order(1)
+
+    assert order.status == "pending"
+    assert [OrderItemRead.model_validate(i) for i in items] == [
+        OrderItemRead(
+            restaurant_id=1,
+            dish_id=2,
+            quantity=3,
+            name="soup",
+            description=None,
+            price=350,
+        )
+    ]
+    assert len(db.identity_map) == 0
+    with pytest.raises(ValueError, match="does not exist"):
+        OrderRepository(db).view_order(2)
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from api.db.schemes import Base, Dish, Restaurant
+from api.repositories.restaurant import RestaurantRepository
+
+
+@pytest.fixture
+def db(monkeypatch: pytest.MonkeyPatch) -> Iterator[Session]:
+    engine = create_engine("sqlite://")
+    monkeypatch.setattr(Dish.__table__.c.dish_id, "autoincrement", False)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(
+            [
+                Restaurant(restaurant_id=1, name="A", address="a", phone="p"),
+                Restaurant(restaurant_id=2, name="B", address="a", phone="p"),
+            ]
+        )
+        session.flush()
+        session.add_all(
+            [
+                Dish(dish_id=2, restaurant_id=1, name="soup", price_cents=350),
+                Dish(dish_id=1, restaurant_id=1, name="bread", price_cents=125),
+            ]
+        )
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+def test_get_dishes_fetches_many_keys_in_one_query(db: Session) -> None:
+    rows = RestaurantRepository(db).get_dishes([(1, 2), (2, 1), (1, 1), (1, 2)])
+
+    assert [(r.restaurant_id, r.dish_id, r.name) for r in rows] == [
+        (1, 1, "bread"),
+        (1, 2, "soup"),
+    ]
+    assert RestaurantRepository(db).get_dishes([]) == []
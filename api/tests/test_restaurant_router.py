@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from api.dependencies import get_restaurant_repo
+
+
+class DummyRestaurant:
+    def __init__(self, restaurant_id: int, name: str) -> None:
+        self.restaurant_id = restaurant_id
+        self.name = name
+        self.description = None
+        self.address = "street"
+        self.phone = "123"
+        self.latitude = 55.75
+        self.longitude = 37.62
+
+
+class DummyRestaurantRepo:
+    def __init__(self) -> None:
+        self.restaurants = [DummyRestaurant(1, "near"), DummyRestaurant(2, "far")]
+        self.nearby_calls: list[tuple] = []
+        self.feed_calls: list[tuple] = []
+
+    def home_feed(self, after, limit, dishes):
+        self.feed_calls.append((after, limit, dishes))
+        rows = []
+        for r in self.restaurants:
+            if r.restaurant_id <= after:
+                continue
+            menu = [(1, "soup"), (2, "bread")][:dishes] or [(None, None)]
+            rows += [
+                SimpleNamespace(
+                    **vars(r),
+                    dish_id=dish_id,
+                    dish_name=name,
+                    dish_description=None,
+                    price_cents=350,
+                )
+                for dish_id, name in menu
+            ]
+        return rows
+
+    def nearest_restaurants(self, latitude, longitude, radius_km, *, limit, offset):
+        self.nearby_calls.append((latitude, longitude, radius_km, limit, offset))
+        return [
+            SimpleNamespace(**vars(self.restaurants[0]), distance_km=0.4),
+            SimpleNamespace(**vars(self.restaurants[1]), distance_km=1.5),
+        ]
+
+
+@pytest.fixture
+def restaurant_setup(client):
+    repo = DummyRestaurantRepo()
+    client.app.dependency_overrides[get_restaurant_repo] = lambda: repo
+    return client, repo
+
+
+def test_nearby_restaurants(restaurant_setup) -> None:
+    client, repo = restaurant_setup
+    response = client.get(
+        "/restaurant/restaurants/nearby",
+        params={"latitude": 55.75, "longitude": 37.62, "radius_km": 2, "limit": 2},
+    )
+    assert response.status_code == 200
+    assert [r["distance_km"] for r in response.json()] == [0.4, 1.5]
+    assert repo.nearby_calls == [(55.75, 37.62, 2.0, 2, 0)]
+
+
+def test_nearby_restaurants_validates_coordinates(restaurant_setup) -> None:
+    client, _ = restaurant_setup
+    response = client.get(
+        "/restaurant/restaurants/nearby",
+        params={"latitude": 91, "longitude": 37.62},
+    )
+    assert response.status_code == 422
+
+
+def test_feed_pages_restaurants_with_dish_previews(restaurant_setup) -> None:
+    client, repo = restaurant_setup
+
+    first = client.get("/restaurant/restaurants/feed", params={"limit": 1, "dishes": 2})
+    last = client.get("/restaurant/restaurants/feed", params={"after": 1, "dishes": 0})
+
+    assert first.status_code == 200
+    page = first.json()
+    assert [r["name"] for r in page["restaurants"]] == ["near"]
+    assert [d["name"] for d in page["restaurants"][0]["dishes"]] == ["soup", "bread"]
+    assert page["restaurants"][0]["dishes"][0]["price"] == "3.50"
+    assert page["next_after"] == 1
+    assert last.json() == {
+        "restaurants": [
+            {
+                "restaurant_id": 2,
+                "name": "far",
+                "description": None,
+                "address": "street",
+                "phone": "123",
+                "latitude": 55.75,
+                "longitude": 37.62,
+                "dishes": [],
+            }
+        ],
+        "next_after": None,
+    }
+    assert repo.feed_calls == [(0, 2, 2), (1, 21, 0)]
+
+
+def test_feed_page_is_cacheable(restaurant_setup) -> None:
+    client, _ = restaurant_setup
+
+    response = client.get("/restaurant/restaurants/feed")
+    etag = response.headers["etag"]
+    cached = client.get("/restaurant/restaurants/feed", headers={"If-None-Match": etag})
+
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "status_code"),
+    [
+        ('"other", {etag}', 304),
+        ("W/{etag}", 304),
+        ("*", 304),
+        ("x{etag}", 200),
+        ('"other"', 200),
+    ],
+)
+def test_feed_if_none_match_compares_whole_tags(
+    restaurant_setup, if_none_match: str, status_code: int
+) -> None:
+    client, _ = restaurant_setup
+    etag = client.get("/restaurant/restaurants/feed").headers["etag"]
+
+    header = if_none_match.format(etag=etag)
+    response = client.get(
+        "/restaurant/restaurants/feed", headers={"If-None-Match": header}
+    )
+
+    assert response.status_code == status_code
+
+
+def test_feed_in_msgpack_has_its_own_etag(restaurant_setup) -> None:
+    msgpack = pytest.importorskip("msgpack")
+    client, _ = restaurant_setup
+
+    as_json = client.get("/restaurant/restaurants/feed")
+    response = client.get(
+        "/restaurant/restaurants/feed", headers={"Accept": "application/msgpack"}
+    )
+
+    assert response.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(response.content) == as_json.json()
+    assert response.headers["etag"] != as_json.headers["etag"]
+
+
+def test_feed_is_one_lateral_query() -> None:
+    from api.repositories.restaurant import _FEED_ROWS
+
+    sql = str(_FEED_ROWS.compile(dialect=postgresql.dialect()))
+
+    assert sql.count("LEFT OUTER JOIN LATERAL") == 1
+    assert "ORDER BY dish.dish_id" in sql
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from api.db.schemes import RevokedToken
+from api.dependencies import get_current_user
+from api.repositories.token import TokenRepository
+from api.services.auth import create_tokens, verify_token
+from api.services.revocation import DenylistSync, TokenDenylist
+from api.settings import get_settings
+
+
+def test_denylist_entries_expire_with_the_token() -> None:
+    denylist = TokenDenylist()
+    now = time.time()
+    denylist.add("a", int(now) + 60)
+    denylist.add("b", int(now) - 1)
+    denylist.add("c", int(now) + 60)
+
+    assert denylist.is_revoked("a")
+    assert not denylist.is_revoked("b")
+    assert not denylist.is_revoked("unknown")
+    assert denylist.expire() == 1
+    assert len(denylist) == 2
+    assert denylist.is_revoked("c")
+    assert not denylist.is_revoked("a", now=now + 61)
+
+
+def test_sync_picks_up_revocations_from_other_workers() -> None:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    RevokedToken.__table__.create(engine)
+    session_factory = sessionmaker(engine)
+    denylist = TokenDenylist()
+    sync = DenylistSync(session_factory, denylist, poll_seconds=60)
+    exp = int(time.time()) + 60
+
+    with session_factory() as db:
+        TokenRepository(db).revoke_access_token("old", int(time.time()) - 1)
+        TokenRepository(db).revoke_access_token("first", exp)
+    assert sync.poll() == 1
+    with session_factory() as db:
+        TokenRepository(db).revoke_access_token("second", exp)
+    assert sync.poll() == 1
+    assert sync.poll() == 0
+
+    assert denylist.is_revoked("first")
+    assert denylist.is_revoked("second")
+    assert not denylist.is_revoked("old")
+
+    sync.start()
+    sync.stop()
+    sync.join(timeout=5)
+    assert not sync.is_alive()
+    engine.dispose()
+
+
+def test_revoked_access_token_is_rejected() -> None:
+    settings = get_settings()
+    access, refresh, _ = create_tokens(1, settings)
+    claims = verify_token(access, settings)
+    users = SimpleNamespace(get_by_id=lambda user_id: SimpleNamespace(user_id=user_id))
+    denylist = TokenDenylist()
+
+    assert claims["jti"] != verify_token(refresh, settings)["jti"]
+    assert get_current_user(access, users, settings, denylist).user_id == 1
+
+    denylist.add(claims["jti"], claims["exp"])
+    with pytest.raises(HTTPException) as e:
+        get_current_user(access, users, settings, denylist)
+    assert e.value.detail == "Token revoked"
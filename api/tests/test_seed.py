@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+
+from api import seed
+from api.seed import (
+    COLUMNS,
+    SeedPlan,
+    copy_text,
+    customer_rows,
+    menu_size,
+    restaurant_rows,
+)
+
+
+@pytest.fixture
+def plan() -> SeedPlan:
+    return SeedPlan(
+        seed=7,
+        users=2000,
+        restaurants=50,
+        menu_mean=20,
+        menu_max=60,
+        cart_share=0.5,
+        cart_lines_mean=3,
+        zipf_s=1.1,
+        tokens_per_user=2,
+        password_hashes=("hash-a", "hash-b"),
+        epoch=datetime(2024, 1, 1),
+        user_base=100,
+    )
+
+
+def test_rows_do_not_depend_on_chunking(plan: SeedPlan) -> None:
+    whole = customer_rows(plan, 0, 300)
+    halves = [customer_rows(plan, 0, 120), customer_rows(plan, 120, 300)]
+    for table in whole:
+        assert whole[table] == halves[0][table] + halves[1][table]
+    assert restaurant_rows(plan, 0, 50) == restaurant_rows(plan, 0, 50)
+
+
+def test_rows_match_the_columns_and_id_bases(plan: SeedPlan) -> None:
+    rows = customer_rows(plan, 0, 10) | restaurant_rows(plan, 0, 5)
+    for table, table_rows in rows.items():
+        assert all(len(row) == len(COLUMNS[table]) for row in table_rows)
+    assert [row[0] for row in rows["user"]] == list(range(101, 111))
+    assert len({row[0] for row in rows["refresh_tokens"]}) == 20
+
+
+def test_carts_reference_existing_dishes_once(plan: SeedPlan) -> None:
+    menus = {
+        (restaurant_id, dish_id)
+        for dish_id, restaurant_id, *_ in restaurant_rows(plan, 0, 50)["dish"]
+    }
+    lines = customer_rows(plan, 0, plan.users)["order_dish"]
+
+    assert {(restaurant_id, dish_id) for dish_id, restaurant_id, *_ in lines} <= menus
+    assert len({(user, r, d) for d, r, user, _ in lines}) == len(lines)
+
+
+def test_popularity_is_zipf_skewed(plan: SeedPlan) -> None:
+    lines = customer_rows(plan, 0, plan.users)["order_dish"]
+    by_restaurant = Counter(restaurant_id for _, restaurant_id, _, _ in lines)
+    by_dish = Counter(dish_id for dish_id, *_ in lines)
+
+    assert by_restaurant[1] > 5 * by_restaurant.get(50, 0)
+    assert by_dish[1] == max(by_dish.values())
+    assert all(1 <= menu_size(plan, r) <= plan.menu_max for r in range(50))
+
+
+def test_copy_text_escapes_values() -> None:
+    rows = [(1, None, "a\tb\\c\nd", datetime(2024, 1, 2, 3, 4, 5))]
+    assert copy_text(rows) == "1\t\\N\ta\\tb\\\\c\\nd\t2024-01-02 03:04:05\n"
+
+
+def test_dropped_ddl_is_restored_when_the_load_fails(
+    plan: SeedPlan, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    restored: list[tuple[list[str], list[str]]] = []
+
+    def fail(*_args: object) -> int:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(seed, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(
+        seed, "_next_ids", lambda _: {"user": 0, "restaurant": 0, "token": 0}
+    )
+    monkeypatch.setattr(
+        seed, "_drop_secondary_ddl", lambda _: (["ADD fk"], ["CREATE ix"])
+    )
+    monkeypatch.setattr(seed, "load_chunk", fail)
+    monkeypatch.setattr(
+        seed,
+        "_restore_secondary_ddl",
+        lambda _engine, fks, ixs, _workers: restored.append((fks, ixs)) or [],
+    )
+
+    with pytest.raises(OSError, match="disk full"):
+        seed.seed_database(create_engine("sqlite://"), plan, workers=1, chunk_size=1000)
+
+    assert restored == [(["ADD fk"], ["CREATE ix"])]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from api.db.schemes import User
+from api.repositories.user import UserRepository, _user_lookups
+from api.services.single_flight import (
+    SingleFlight,
+    load_coalesced,
+    single_flight_stats,
+)
+
+
+def test_concurrent_calls_share_one_load() -> None:
+    flight = SingleFlight("test_threads")
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def load() -> str:
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return "menu"
+
+    results = []
+
+    def call() -> None:
+        results.append(flight.do(("menu", 1), load))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=call) for _ in range(5)]
+    for thread in followers:
+        thread.start()
+    while flight.stats.coalesced < 5:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(loads) == 1
+    assert sorted(results) == [("menu", False)] + [("menu", True)] * 5
+    assert single_flight_stats()["test_threads"] == {
+        "calls": 6,
+        "loads": 1,
+        "coalesced": 5,
+    }
+
+
+def test_errors_reach_every_waiter_and_are_not_cached() -> None:
+    flight = SingleFlight("test_errors")
+
+    def fail() -> None:
+        raise LookupError
+
+    with pytest.raises(LookupError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: 1) == (1, False)
+
+
+def test_orm_entities_are_never_shared() -> None:
+    flight = SingleFlight("test_entities")
+
+    assert load_coalesced(flight, "rows", lambda: [(1, "menu")]) == [(1, "menu")]
+    with pytest.raises(TypeError, match="ORM entities"):
+        load_coalesced(flight, "user", lambda: User(user_id=1))
+    with pytest.raises(TypeError, match="ORM entities"):
+        load_coalesced(flight, "users", lambda: [User(user_id=1)])
+
+
+def test_user_lookups_share_a_row_but_not_the_entity() -> None:
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    User.__table__.create(engine)
+    with Session(engine) as db:
+        db.add(User(user_id=1, name="u", phone="p", address="a", password="x"))
+        db.commit()
+
+    coalesced = _user_lookups.stats.coalesced
+    started = threading.Event()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def hold_leader(*_: object) -> None:
+        started.set()
+        while _user_lookups.stats.coalesced == coalesced:
+            threading.Event().wait(0.01)
+
+    sessions = [Session(engine), Session(engine)]
+    users: list[User | None] = [None, None]
+
+    def lookup(i: int) -> None:
+        users[i] = UserRepository(sessions[i]).get_by_id(1)
+
+    leader = threading.Thread(target=lookup, args=(0,))
+    leader.start()
+    assert started.wait(5)
+    lookup(1)
+    leader.join()
+    event.remove(engine, "before_cursor_execute", hold_leader)
+
+    first, second = users
+    assert first is not second
+    assert first in sessions[0]
+    assert second in sessions[1]
+    UserRepository(sessions[1]).update_user(second, phone="new")
+    assert sessions[0].get(User, 1).phone == "p"
+    assert UserRepository(sessions[0]).get_by_id(2) is None
+    for db in sessions:
+        db.close()
+    engine.dispose()
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from api.startup import parse_importtime
+
+IMPORTTIME_LOG = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      3502 |     143804 |       sqlalchemy.engine.interfaces
+import time:      1049 |     797269 | api.main
+"""
+
+
+def test_parse_importtime_skips_header() -> None:
+    timings = parse_importtime(IMPORTTIME_LOG)
+    assert [t.module for t in timings] == [
+        "_io",
+        "sqlalchemy.engine.interfaces",
+        "api.main",
+    ]
+    assert timings[-1].self_us == 1049
+    assert timings[-1].cumulative_us == 797269
+
+
+def test_lifespan_records_warm_up(client) -> None:
+    assert client.app.state.warm_up_seconds >= 0
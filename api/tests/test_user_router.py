@@ -27,7 +27,16 @@ class DummyUserRepo:
     def get_by_username(self, username: str) -> DummyUser | None:
         return self.users.get(username)
 
-    def create_user(self, username: str, password: str, phone: str, address: str) -> DummyUser:
+    def create_user(
+        self,
+        username: str,
+        password: str,
+        phone: str,
+        address: str,
+        *,
+        latitude: float | None = None,
+        longitude: float | None = None,
+    ) -> DummyUser:
         user_id = len(self.users) + 1
         user = DummyUser(user_id, username, phone, address, password)
         self.users[username] = user
@@ -70,6 +79,8 @@ def test_create_user_success(client_and_repo: tuple[TestClient, DummyUserRepo])
         "name": "alice",
         "phone": "123",
         "address": "street",
+        "latitude": None,
+        "longitude": None,
     }
 
 
@@ -93,6 +104,8 @@ def test_read_own_profile(client_and_repo: tuple[TestClient, DummyUserRepo]) ->
         "name": "carol",
         "phone": "789",
         "address": "main",
+        "latitude": None,
+        "longitude": None,
     }
     client.app.dependency_overrides.pop(get_current_user, None)
 
@@ -109,6 +122,8 @@ def test_update_profile(client_and_repo: tuple[TestClient, DummyUserRepo]) -> No
         "name": "dave",
         "phone": "222",
         "address": "new",
+        "latitude": None,
+        "longitude": None,
     }
     client.app.dependency_overrides.pop(get_current_user, None)
 
@@ -4,18 +4,26 @@ import { useState, useEffect } from 'react'
 import Link from 'next/link'
 import { apiFetch } from '@/lib/api'
 
+// One request returns a page of restaurants together with their first dishes.
+async function fetchFeed(after) {
+  const res = await apiFetch(`/restaurant/restaurants/feed?after=${after}`)
+  if (!res.ok) throw new Error(res.statusText)
+  return res.json()
+}
+
 export default function HomePage() {
   const [restaurants, setRestaurants] = useState([])
+  const [nextAfter, setNextAfter] = useState(null)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState(null)
 
   useEffect(() => {
     async function load() {
       try {
-        const res = await apiFetch('/restaurant/restaurants/')
-        if (!res.ok) throw new Error(res.statusText)
-        const data = await res.json()
-        setRestaurants(data)
+        const page = await fetchFeed(0)
+        setRestaurants(page.restaurants)
+        setNextAfter(page.next_after)
       } catch (err) {
         setError(err.message)
       } finally {
@@ -25,6 +33,19 @@ export default function HomePage() {
     load()
   }, [])
 
+  const loadMore = async () => {
+    setLoadingMore(true)
+    try {
+      const page = await fetchFeed(nextAfter)
+      setRestaurants(prev => [...prev, ...page.restaurants])
+      setNextAfter(page.next_after)
+    } catch (err) {
+      setError(err.message)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center bg-beige-100">
@@ -57,9 +78,31 @@ export default function HomePage() {
             <button className="w-full text-left text-brown-700 font-medium">
               {r.name}
             </button>
+            {r.dishes.length > 0 && (
+              <ul className="mt-2 text-sm text-brown-600">
+                {r.dishes.map(dish => (
+                  <li key={dish.dish_id} className="flex justify-between">
+                    <span className="truncate">{dish.name}</span>
+                    <span className="ml-2">{dish.price}</span>
+                  </li>
+                ))}
+              </ul>
+            )}
           </Link>
         ))}
       </div>
+
+      {nextAfter !== null && (
+        <div className="mt-6 flex justify-center">
+          <button
+            onClick={loadMore}
+            disabled={loadingMore}
+            className="px-4 py-2 rounded-lg bg-white shadow text-brown-700 hover:shadow-md disabled:opacity-50"
+          >
+            {loadingMore ? 'Loading…' : 'Show more'}
+          </button>
+        </div>
+      )}
     </div>
   )
 }